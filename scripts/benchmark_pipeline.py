@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de preparación sobre corpus sintéticos.
+
+PROPÓSITO:
+    Mide cada fase del pipeline (generación de manifest, regeneración incremental,
+    resolución de dependencias, actualización de progreso) a distintas escalas,
+    registrando tiempo, throughput (objetos/s) y memoria pico. Permite detectar
+    regresiones comparando contra un resultado anterior.
+
+FASES MEDIDAS:
+    1. generate_corpus       - generate_synthetic_corpus.py (sql/extracted/)
+    2. prepare_migration     - prepare_migration.py --force
+    3. prepare_incremental   - prepare_migration.py --force --incremental (sin cambios)
+    4. generate_knowledge    - generate_synthetic_corpus.py --knowledge
+    5. build_dependency_graph
+    6. update_progress       - update_progress.py batch_001
+
+    Cada fase corre en un subproceso propio para que la memoria pico (ru_maxrss)
+    sea la de esa fase y no la acumulada del benchmark. El throughput se calcula
+    sobre los objetos del manifest (o la escala pedida, antes de generarlo).
+    Sin el módulo resource (Windows) la memoria queda en null y con --baseline
+    solo se comparan tiempos.
+
+USO:
+    python scripts/benchmark_pipeline.py
+    python scripts/benchmark_pipeline.py --scales 1000,10000,100000
+    python scripts/benchmark_pipeline.py --baseline benchmark_results.json
+
+Opciones:
+    --scales N,N,...    Escalas en objetos (default: 1000,10000,100000)
+    --workdir DIR       Directorio de trabajo para los corpus (default: /tmp/plsql_benchmark)
+    --output FILE       Archivo de resultados (default: benchmark_results.json)
+    --baseline FILE     Resultados anteriores para comparar (exit 1 si hay regresión)
+    --threshold X       Tolerancia de regresión en tiempo (default: 0.25 = +25%)
+    --jobs N            Pasar --jobs N a prepare_migration.py
+    --sharded           Pasar --sharded a prepare_migration.py (índice + shards)
+    --sqlite            Pasar --sqlite a prepare_migration.py (manifest.db)
+    --help              Mostrar esta ayuda
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+DEFAULT_SCALES = [1000, 10000, 100000]
+DEFAULT_WORKDIR = Path("/tmp/plsql_benchmark")
+DEFAULT_OUTPUT = Path("benchmark_results.json")
+DEFAULT_THRESHOLD = 0.25
+
+# Opciones de la línea de comandos (las demás se rechazan antes de correr fases)
+VALUE_OPTIONS = (
+    "--scales",
+    "--workdir",
+    "--output",
+    "--baseline",
+    "--threshold",
+    "--jobs",
+)
+FLAG_OPTIONS = ("--sharded", "--sqlite")
+
+
+def children_peak_rss_mb() -> Optional[float]:
+    """Pico de RSS de los procesos hijos terminados, en MB (None si no disponible)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss está en bytes en macOS y en KB en Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_phase_in_process(metrics_file: Path, script: str, args: List[str]):
+    """
+    Ejecuta un script como proceso hijo y guarda tiempo y memoria pico.
+
+    Se invoca vía "--run-phase" desde run_phase(), de modo que cada fase
+    tenga su propio proceso padre: RUSAGE_CHILDREN solo ve los procesos de
+    esa fase (incluidos los workers de --jobs).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, script] + args, stdout=subprocess.DEVNULL)
+    seconds = time.perf_counter() - start
+
+    with open(metrics_file, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "seconds": seconds,
+                "peak_memory_mb": children_peak_rss_mb(),
+                "exit_code": result.returncode,
+            },
+            f,
+        )
+
+
+def run_phase(cwd: Path, script: Path, args: List[str]) -> Dict:
+    """Corre una fase en un subproceso y retorna sus métricas."""
+    metrics_file = cwd / ".benchmark_phase.json"
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--run-phase",
+        str(metrics_file),
+        str(script),
+    ] + args
+
+    result = subprocess.run(command, cwd=cwd, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0 or not metrics_file.exists():
+        return {"exit_code": result.returncode, "error": result.stderr[-2000:]}
+
+    with open(metrics_file, "r", encoding="utf-8") as f:
+        metrics = json.load(f)
+    metrics_file.unlink()
+    return metrics
+
+
+def count_manifest_objects(corpus_dir: Path) -> int:
+    """Cantidad de objetos del manifest según progress.json (cualquier layout)."""
+    progress_file = corpus_dir / "sql" / "extracted" / "progress.json"
+    if not progress_file.exists():
+        return 0
+    with open(progress_file, "r", encoding="utf-8") as f:
+        return json.load(f).get("total_objects", 0)
+
+
+def benchmark_scale(
+    scale: int, workdir: Path, jobs: Optional[int], layout_args: List[str]
+) -> Dict:
+    """
+    Corre todas las fases del pipeline para una escala.
+
+    Returns:
+        Dict con objetos del manifest y métricas por fase
+    """
+    corpus_dir = workdir / f"corpus_{scale}"
+    if corpus_dir.exists():
+        shutil.rmtree(corpus_dir)
+    corpus_dir.mkdir(parents=True)
+
+    generator = SCRIPTS_DIR / "generate_synthetic_corpus.py"
+    prepare_args = ["--force"] + (["--jobs", str(jobs)] if jobs else [])
+    prepare_args += layout_args
+
+    phases = [
+        ("generate_corpus", generator, [str(corpus_dir), "--objects", str(scale)]),
+        ("prepare_migration", SCRIPTS_DIR / "prepare_migration.py", prepare_args),
+        (
+            "prepare_incremental",
+            SCRIPTS_DIR / "prepare_migration.py",
+            prepare_args + ["--incremental"],
+        ),
+        ("generate_knowledge", generator, [str(corpus_dir), "--knowledge"]),
+        ("build_dependency_graph", SCRIPTS_DIR / "build_dependency_graph.py", []),
+        ("update_progress", SCRIPTS_DIR / "update_progress.py", ["batch_001"]),
+    ]
+
+    results = {"requested_objects": scale, "phases": {}}
+
+    for phase_name, script, args in phases:
+        print(f"   ⏱️  {phase_name}...", end=" ", flush=True)
+        metrics = run_phase(corpus_dir, script, args)
+
+        if metrics.get("exit_code") != 0:
+            print(f"❌ exit {metrics.get('exit_code')}")
+            if metrics.get("error"):
+                print(metrics["error"])
+            results["phases"][phase_name] = metrics
+            results["failed"] = True
+            break
+
+        if phase_name == "prepare_migration":
+            results["manifest_objects"] = count_manifest_objects(corpus_dir)
+
+        objects = results.get("manifest_objects") or scale
+        metrics["objects_per_second"] = round(
+            objects / max(metrics["seconds"], 1e-9), 1
+        )
+        metrics["seconds"] = round(metrics["seconds"], 3)
+        results["phases"][phase_name] = metrics
+
+        peak = metrics["peak_memory_mb"]
+        print(
+            f"{metrics['seconds']:.2f}s  "
+            f"{metrics['objects_per_second']:,.0f} obj/s  "
+            + (f"{peak:.0f} MB" if peak is not None else "memoria n/d")
+        )
+
+    return results
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compara tiempos y memoria contra un benchmark anterior.
+
+    Returns:
+        Lista de regresiones (vacía si no hay)
+    """
+    regressions = []
+
+    for scale, scale_results in results["scales"].items():
+        baseline_scale = baseline.get("scales", {}).get(scale)
+        if not baseline_scale:
+            continue
+
+        for phase_name, metrics in scale_results["phases"].items():
+            previous = baseline_scale["phases"].get(phase_name)
+            if not previous or "seconds" not in previous or "seconds" not in metrics:
+                continue
+
+            for metric in ("seconds", "peak_memory_mb"):
+                before = previous.get(metric)
+                after = metrics.get(metric)
+                # Memoria en null: resultado de una plataforma sin resource
+                if before is None or after is None:
+                    continue
+                if before > 0 and after > before * (1 + threshold):
+                    regressions.append(
+                        f"{scale} objetos / {phase_name}: {metric} "
+                        f"{before} → {after} (+{(after / before - 1) * 100:.0f}%)"
+                    )
+
+    return regressions
+
+
+def get_option(name: str) -> Optional[str]:
+    """Lee el valor de una opción --nombre VALOR de sys.argv."""
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return None
+
+
+def invalid_arguments(args: List[str]) -> List[str]:
+    """Argumentos que no son opciones conocidas (o VALUE_OPTIONS sin valor)."""
+    invalid = []
+    i = 0
+    while i < len(args):
+        if args[i] in VALUE_OPTIONS:
+            if i + 1 >= len(args) or args[i + 1].startswith("--"):
+                invalid.append(f"{args[i]} (falta el valor)")
+            else:
+                i += 1
+        elif args[i] not in FLAG_OPTIONS:
+            invalid.append(args[i])
+        i += 1
+    return invalid
+
+
+def main():
+    """Función principal"""
+    if len(sys.argv) > 3 and sys.argv[1] == "--run-phase":
+        run_phase_in_process(Path(sys.argv[2]), sys.argv[3], sys.argv[4:])
+        return
+
+    if "--help" in sys.argv or "-h" in sys.argv:
+        print(__doc__)
+        return
+
+    invalid = invalid_arguments(sys.argv[1:])
+    if invalid:
+        print(f"❌ Error: argumentos no válidos: {', '.join(invalid)}")
+        print("   Ver: python scripts/benchmark_pipeline.py --help")
+        sys.exit(1)
+
+    scales_option = get_option("--scales")
+    scales = (
+        [int(scale) for scale in scales_option.split(",")]
+        if scales_option
+        else DEFAULT_SCALES
+    )
+    workdir = Path(get_option("--workdir") or DEFAULT_WORKDIR)
+    output_file = Path(get_option("--output") or DEFAULT_OUTPUT)
+    baseline_option = get_option("--baseline")
+    threshold = float(get_option("--threshold") or DEFAULT_THRESHOLD)
+    jobs = int(get_option("--jobs")) if get_option("--jobs") else None
+    layout_args = [flag for flag in ("--sharded", "--sqlite") if flag in sys.argv]
+
+    print("=" * 80)
+    print("BENCHMARK DEL PIPELINE DE PREPARACIÓN")
+    print("=" * 80)
+    print(f"\n📁 Directorio de trabajo: {workdir}")
+    print(f"📏 Escalas: {', '.join(f'{scale:,}' for scale in scales)}\n")
+
+    results = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": jobs,
+        "layout": layout_args[0].lstrip("-") if layout_args else "monolithic",
+        "scales": {},
+    }
+
+    failed = False
+    for scale in scales:
+        print(f"🔄 Escala {scale:,} objetos")
+        scale_results = benchmark_scale(scale, workdir, jobs, layout_args)
+        results["scales"][str(scale)] = scale_results
+        failed = failed or scale_results.get("failed", False)
+        print()
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"✅ Resultados: {output_file}")
+
+    if failed:
+        print("\n❌ Al menos una fase falló")
+        sys.exit(1)
+
+    if baseline_option:
+        with open(baseline_option, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, threshold)
+
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresiones (tolerancia +{threshold:.0%}):")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones respecto a {baseline_option}")
+
+
+if __name__ == "__main__":
+    main()
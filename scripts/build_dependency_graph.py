@@ -4,7 +4,7 @@ Script para construir dependency graph y migration order óptimo (Topological So
 
 PROPÓSITO:
     Analiza dependencias entre 8,122 objetos PL/SQL extraídos por plsql-analyzer (Fase 1)
-    y genera un orden de conversión óptimo usando Kahn's algorithm con detección de niveles.
+    y genera un orden de conversión óptimo por niveles de dependencia (SCCs + condensación).
 
 BENEFICIOS:
     ✅ Compilación en orden correcto (reduce errores de dependencia)
@@ -13,148 +13,312 @@ BENEFICIOS:
     ✅ Forward declaration strategy automática para circular deps
 
 ENTRADA:
-    - knowledge/json/batch_XXX/*.json (todos los análisis de plsql-analyzer)
-    - sql/extracted/manifest.json (manifest actual)
+    - knowledge/json/batch_XXX/*.json (todos los análisis de plsql-analyzer; solo se leen
+      los nuevos o modificados, el resto sale de sql/extracted/dependency_cache.json)
+    - sql/extracted/manifest.json (manifest actual, o manifest/index.json si es sharded)
+    - sql/extracted/synonyms.json (opcional: sinónimos y esquemas, ver name_resolution.py)
 
 SALIDA:
     - dependency_graph.json (grafo completo con adjacency list)
     - migration_order.json (orden topológico por niveles)
     - manifest.json actualizado (nuevos campos: migration_order, dependency_level, depends_on, depended_by)
+      En layout sharded se actualizan el índice y los shards (ver manifest_store.py)
 
 USO:
     cd /path/to/phantomx-nexus
-    python scripts/build_dependency_graph.py [--dry-run]
+    python scripts/build_dependency_graph.py [--dry-run] [--incremental] [--static]
+
+    --incremental: Compara con dependency_graph.json/migration_order.json de la ejecución
+    anterior, recalcula niveles solo aguas abajo de los objetos cambiados y escribe en el
+    manifest solo los objetos cuyos campos cambiaron (recálculo completo si no hay estado
+    previo válido)
+
+    --static: Los objetos que plsql-analyzer todavía no procesó toman sus dependencias de
+    sql/extracted/static_dependencies.json (extract_static_dependencies.py). Permite
+    un primer orden de migración antes de la Fase 1
 
 ALGORITMO:
-    Kahn's Topological Sort O(V + E) con detección de niveles
+    Tarjan iterativo (SCCs exactas) + niveles sobre el grafo de condensación, O(V + E)
+    Cada ciclo queda en un nivel como unidad; lo que depende de él sigue en niveles posteriores
     V = 8,122 objetos
     E = ~20,000 dependencias (estimado)
 
-VERSIÓN: 1.0.0
-FECHA: 2026-01-31
+VERSIÓN: 2.1.0
+FECHA: 2026-10-18
 """
 
 import json
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
-from collections import defaultdict, deque
+from collections import defaultdict
+
+from manifest_store import (EXTRACTED_DIR, load_manifest_index, manifest_exists, manifest_location,
+                            update_manifest_objects, write_json_atomic)
+from extract_static_dependencies import STATIC_DEPENDENCIES_FILE
+from name_resolution import (RESOLUTION_CONFIDENCE, build_resolution_index, load_synonyms, normalize_name,
+                             object_package, resolve_reference)
+from progress_journal import journal_lock
 
 
 # Configuración
 BASE_DIR = Path.cwd()
 KNOWLEDGE_DIR = BASE_DIR / "knowledge"
 JSON_DIR = KNOWLEDGE_DIR / "json"
-MANIFEST_FILE = BASE_DIR / "sql" / "extracted" / "manifest.json"
 DEPENDENCY_GRAPH_FILE = BASE_DIR / "dependency_graph.json"
 MIGRATION_ORDER_FILE = BASE_DIR / "migration_order.json"
 
+# Dependencias extraídas por archivo de knowledge/json (ruta + mtime + tamaño)
+DEPENDENCY_CACHE_FILE = EXTRACTED_DIR / "dependency_cache.json"
+DEPENDENCY_CACHE_VERSION = 1
+
+# Hilos para listar batches y leer outputs nuevos
+LOAD_WORKERS = 8
+
+
+def list_batch_files(batch_dir: Path) -> List[Tuple[str, int, int]]:
+    """(ruta relativa a knowledge/json, mtime_ns, tamaño) de los .json de un batch."""
+    files = []
+    with os.scandir(batch_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                stat = entry.stat()
+                files.append((f"{batch_dir.name}/{entry.name}", stat.st_mtime_ns, stat.st_size))
+    return sorted(files)
 
-def load_all_dependencies() -> Dict[str, Dict]:
+
+def read_dependency_record(relative: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Lee un output de plsql-analyzer y extrae lo que usa el grafo.
+
+    Returns:
+        Tupla (record, error)
+        - record: {object_id, object_name, object_type, depends_on} o None si no tiene object_id
+        - error: Mensaje si el archivo no se pudo leer (no se cachea: se reintenta en la próxima ejecución)
+    """
+    try:
+        with open(JSON_DIR / relative, 'r', encoding='utf-8') as f:
+            obj_data = json.load(f)
+    except Exception as e:
+        return None, str(e)
+
+    object_id = obj_data.get("object_id")
+    if not object_id:
+        return None, None
+
+    # Extraer dependencias de executable_objects
+    dependencies = obj_data.get("dependencies", {})
+    executable_deps = dependencies.get("executable_objects", [])
+
+    return {
+        "object_id": object_id,
+        "object_name": obj_data.get("object_name", "UNKNOWN"),
+        "object_type": obj_data.get("object_type", "UNKNOWN"),
+        "depends_on": executable_deps  # Lista de nombres de objetos (no IDs)
+    }, None
+
+
+def load_dependency_cache() -> Dict[str, Dict]:
+    """Entradas de dependency_cache.json (vacío si no existe, está dañado o es de otra versión)."""
+    if not DEPENDENCY_CACHE_FILE.exists():
+        return {}
+
+    try:
+        with open(DEPENDENCY_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+    if cache.get("version") != DEPENDENCY_CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def load_all_dependencies(save_cache: bool = True, required: bool = True) -> Dict[str, Dict]:
     """
     Lee dependencies de todos los JSONs en knowledge/json/batch_XXX/*.
 
+    Solo se leen los archivos nuevos o modificados (ruta + mtime + tamaño distintos a
+    dependency_cache.json); el listado de directorios y la lectura se hacen en
+    paralelo (LOAD_WORKERS hilos).
+
+    Args:
+        save_cache: Guardar dependency_cache.json actualizado (False en --dry-run)
+        required: Sin outputs de la Fase 1 termina con error (False con --static)
+
     Returns:
         Dict mapeando object_id -> objeto completo con dependencies
     """
     print("\n📖 Cargando dependencias desde knowledge/json/...\n")
 
+    batch_dirs = []
+    if JSON_DIR.exists():
+        batch_dirs = sorted([d for d in JSON_DIR.iterdir() if d.is_dir() and d.name.startswith("batch_")])
+
+    if not batch_dirs and not required:
+        print("   Sin outputs de plsql-analyzer todavía\n")
+        return {}
+
     if not JSON_DIR.exists():
         print(f"❌ Error: {JSON_DIR} no existe")
         print("   Ejecuta Fase 1 (plsql-analyzer) primero")
         sys.exit(1)
 
-    all_objects = {}
-    batch_dirs = sorted([d for d in JSON_DIR.iterdir() if d.is_dir() and d.name.startswith("batch_")])
-
     if not batch_dirs:
         print(f"❌ Error: No se encontraron directorios batch_XXX en {JSON_DIR}")
         sys.exit(1)
 
     print(f"   Encontrados {len(batch_dirs)} batches")
 
-    for batch_dir in batch_dirs:
-        json_files = list(batch_dir.glob("*.json"))
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    obj_data = json.load(f)
+    cached_files = load_dependency_cache()
 
-                object_id = obj_data.get("object_id")
-                if not object_id:
-                    print(f"   ⚠️  {json_file.name}: Sin object_id, skip")
-                    continue
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+        listed = [file for files in pool.map(list_batch_files, batch_dirs) for file in files]
+        changed = [relative for relative, mtime_ns, size in listed
+                   if cached_files.get(relative, {}).get("mtime_ns") != mtime_ns
+                   or cached_files[relative].get("size") != size]
+        results = dict(zip(changed, pool.map(read_dependency_record, changed)))
 
-                # Extraer dependencias de executable_objects
-                dependencies = obj_data.get("dependencies", {})
-                executable_deps = dependencies.get("executable_objects", [])
+    all_objects = {}
+    cache_entries = {}
+
+    # Mismo orden que los directorios: si un objeto está en dos batches gana el último
+    for relative, mtime_ns, size in listed:
+        file_name = relative.split("/", 1)[1]
+        if relative in results:
+            record, error = results[relative]
+            if error:
+                print(f"   ⚠️  Error leyendo {file_name}: {error}")
+                continue
+            cache_entries[relative] = {"mtime_ns": mtime_ns, "size": size, "record": record}
+        else:
+            record = cached_files[relative]["record"]
+            cache_entries[relative] = cached_files[relative]
 
-                all_objects[object_id] = {
-                    "object_id": object_id,
-                    "object_name": obj_data.get("object_name", "UNKNOWN"),
-                    "object_type": obj_data.get("object_type", "UNKNOWN"),
-                    "depends_on": executable_deps  # Lista de nombres de objetos (no IDs)
-                }
+        if record is None:
+            print(f"   ⚠️  {file_name}: Sin object_id, skip")
+            continue
 
-            except Exception as e:
-                print(f"   ⚠️  Error leyendo {json_file.name}: {e}")
-                continue
+        all_objects[record["object_id"]] = record
+
+    print(f"   📦 {len(listed) - len(changed)} archivos desde cache, {len(changed)} leídos")
+
+    if save_cache and (results or len(cache_entries) != len(cached_files)):
+        write_json_atomic(DEPENDENCY_CACHE_FILE, {
+            "version": DEPENDENCY_CACHE_VERSION,
+            "generated_at": datetime.now().isoformat(),
+            "files": cache_entries
+        })
 
     print(f"   ✅ Cargados {len(all_objects)} objetos con dependencias\n")
     return all_objects
 
 
-def resolve_dependency_names_to_ids(objects: Dict[str, Dict], manifest_objects: List[Dict]) -> Dict[str, List[str]]:
+def load_static_dependencies(objects: Dict[str, Dict]) -> int:
+    """
+    Completa objects con las dependencias de static_dependencies.json (--static).
+
+    Solo para objetos que plsql-analyzer todavía no procesó: su análisis siempre
+    tiene prioridad sobre el escaneo estático.
+
+    Returns:
+        Cantidad de objetos agregados desde el escaneo estático
+    """
+    if not STATIC_DEPENDENCIES_FILE.exists():
+        print(f"❌ Error: {STATIC_DEPENDENCIES_FILE} no existe")
+        print("   Ejecuta extract_static_dependencies.py primero")
+        sys.exit(1)
+
+    with open(STATIC_DEPENDENCIES_FILE, 'r', encoding='utf-8') as f:
+        static = json.load(f)
+
+    added = 0
+    for object_id, result in static["objects"].items():
+        if object_id in objects:
+            continue
+        objects[object_id] = {
+            "object_id": object_id,
+            "object_name": result["object_name"],
+            "object_type": result["object_type"],
+            "depends_on": result["dependencies"].get("executable_objects", []),
+            "source": "static"
+        }
+        added += 1
+
+    print(f"📖 Escaneo estático: {added} objetos sin análisis de plsql-analyzer "
+          f"({len(objects) - added} con análisis)\n")
+    return added
+
+
+def resolve_dependency_names_to_ids(objects: Dict[str, Dict],
+                                    manifest_objects: List[Dict]) -> Tuple[Dict[str, List[str]], Dict[str, Dict]]:
     """
     Resuelve nombres de dependencias a object_ids usando el manifest.
 
+    Usa el índice de name_resolution.py: nombre calificado exacto (con overloads),
+    llamadas sin calificar dentro del mismo package, sinónimos y prefijos de esquema
+    (sql/extracted/synonyms.json, opcional).
+
     Args:
         objects: Dict de objetos cargados (object_id -> data)
-        manifest_objects: Lista de objetos del manifest con object_id y object_name
+        manifest_objects: Lista de objetos del manifest con object_id, object_name y parent_package
 
     Returns:
-        Dict mapeando object_id -> [lista de object_ids que depende]
+        Tupla (resolved_dependencies, resolution)
+        - resolved_dependencies: object_id -> [lista de object_ids que depende] (sin repetidos)
+        - resolution: object_id -> {dep_id: {name, method, confidence}} (una entrada por arista)
     """
     print("🔗 Resolviendo nombres de dependencias a object_ids...\n")
 
-    # Crear índice: object_name -> object_id
-    name_to_id = {}
-    for obj in manifest_objects:
-        obj_name = obj["object_name"].upper()
-        obj_id = obj["object_id"]
-        name_to_id[obj_name] = obj_id
+    index = build_resolution_index(manifest_objects, load_synonyms())
+    manifest_by_id = {obj["object_id"]: obj for obj in manifest_objects}
 
     resolved_dependencies = {}
+    resolution = {}
+    method_counts = defaultdict(int)
     unresolved_count = 0
     external_deps = set()
 
     for object_id, obj_data in objects.items():
-        dep_names = obj_data.get("depends_on", [])
-        resolved_deps = []
-
-        for dep_name in dep_names:
-            dep_name_upper = dep_name.upper()
+        caller_package = object_package(manifest_by_id.get(object_id, obj_data))
+        edges = {}
 
-            # Intentar resolver el nombre a un ID
-            if dep_name_upper in name_to_id:
-                resolved_deps.append(name_to_id[dep_name_upper])
-            else:
+        for dep_name in obj_data.get("depends_on", []):
+            resolved = resolve_reference(index, dep_name, object_id, caller_package)
+            if resolved is None:
                 # Dependencia externa (no en nuestro manifest)
-                external_deps.add(dep_name_upper)
+                external_deps.add(normalize_name(dep_name))
                 unresolved_count += 1
+                continue
+
+            method_counts[resolved["method"]] += 1
+            for dep_id in resolved["object_ids"]:
+                # Si varios nombres llevan al mismo objeto queda la resolución más confiable
+                if dep_id not in edges or edges[dep_id]["confidence"] < resolved["confidence"]:
+                    edges[dep_id] = {
+                        "name": dep_name,
+                        "method": resolved["method"],
+                        "confidence": resolved["confidence"]
+                    }
 
-        resolved_dependencies[object_id] = resolved_deps
+        resolved_dependencies[object_id] = list(edges)
+        resolution[object_id] = edges
 
     print(f"   ✅ Dependencias resueltas")
+    for method in RESOLUTION_CONFIDENCE:
+        if method_counts[method]:
+            print(f"   📊 {method}: {method_counts[method]} referencias (confianza {RESOLUTION_CONFIDENCE[method]})")
     print(f"   📊 {unresolved_count} dependencias externas (no en manifest)")
     if external_deps:
-        print(f"      Ejemplos: {', '.join(list(external_deps)[:5])}")
+        print(f"      Ejemplos: {', '.join(sorted(external_deps)[:5])}")
         if len(external_deps) > 5:
             print(f"      ... y {len(external_deps) - 5} más")
     print()
 
-    return resolved_dependencies
+    return resolved_dependencies, resolution
 
 
 def build_adjacency_list(objects: Dict[str, Dict], resolved_deps: Dict[str, List[str]]) -> Tuple[Dict, Dict]:
@@ -191,128 +355,332 @@ def build_adjacency_list(objects: Dict[str, Dict], resolved_deps: Dict[str, List
     return dict(adj_list), dict(reverse_adj_list)
 
 
-def topological_sort_with_levels(nodes: List[str], adj_list: Dict[str, List[str]]) -> Tuple[List[List[str]], List[str]]:
+def find_strongly_connected_components(nodes: List[str], adj_list: Dict[str, List[str]]) -> List[List[str]]:
     """
-    Kahn's algorithm adaptado para retornar niveles de dependencia.
+    Componentes fuertemente conexas (algoritmo de Tarjan, iterativo).
+
+    Sin recursión: cadenas de dependencias de cualquier largo no chocan con el
+    límite de recursión de Python. O(V + E).
 
     Args:
         nodes: Lista de object_ids
-        adj_list: Adjacency list (object_id -> [dep_ids])
+        adj_list: Adjacency list (object_id -> [dep_ids]); deps fuera de nodes se ignoran
 
     Returns:
-        Tupla (levels, circular)
-        - levels: Lista de niveles [[obj_0001, obj_0005], [obj_0010], ...]
-        - circular: Lista de object_ids en dependencias circulares
+        Componentes en orden de dependencias: cada una aparece después de todas
+        las componentes de las que depende
+    """
+    node_set = set(nodes)
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adj_list.get(root, [])))]
+
+        while work:
+            node, deps = work[-1]
+            for dep in deps:
+                if dep not in node_set:
+                    continue
+                if dep not in index:
+                    index[dep] = low[dep] = len(index)
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(adj_list.get(dep, []))))
+                    break
+                if dep in on_stack:
+                    low[node] = min(low[node], index[dep])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def condensation_levels(components: List[List[str]], adj_list: Dict[str, List[str]],
+                        outer_level: Optional[Dict[str, int]] = None) -> List[int]:
     """
-    print("🔄 Aplicando Kahn's Topological Sort...\n")
+    Nivel de cada componente: 1 + el mayor nivel de las componentes de las que depende.
 
-    # 1. Construir in-degree map (cuántas dependencias tiene cada nodo)
-    in_degree = {node: 0 for node in nodes}
-    reverse_adj = defaultdict(list)
+    Args:
+        components: SCCs en orden de dependencias (de find_strongly_connected_components)
+        adj_list: Adjacency list (object_id -> [dep_ids])
+        outer_level: Niveles ya conocidos de objetos fuera de components (modo incremental)
 
+    Returns:
+        Lista de niveles, uno por componente
+    """
+    outer_level = outer_level or {}
+    component_of = {}
+    for component_id, component in enumerate(components):
+        for node in component:
+            component_of[node] = component_id
+
+    # Las componentes salen en orden de dependencias: una sola pasada alcanza
+    component_level = []
+    for component_id, component in enumerate(components):
+        level = 0
+        for node in component:
+            for dep in adj_list.get(node, []):
+                dep_component = component_of.get(dep)
+                if dep_component is not None:
+                    if dep_component != component_id:
+                        level = max(level, component_level[dep_component] + 1)
+                elif dep in outer_level:
+                    level = max(level, outer_level[dep] + 1)
+        component_level.append(level)
+
+    return component_level
+
+
+def group_by_level(nodes: List[str], level_of: Dict[str, int]) -> List[List[str]]:
+    """Agrupa nodes por nivel, conservando el orden de nodes dentro de cada nivel."""
+    total_levels = max(level_of.values(), default=-1) + 1
+    levels = [[] for _ in range(total_levels)]
     for node in nodes:
-        deps = adj_list.get(node, [])
-        for dep in deps:
-            if dep in in_degree:  # Solo contar deps dentro del manifest
-                reverse_adj[dep].append(node)
-                in_degree[node] += 1
-
-    # 2. Cola con nodos sin dependencias (in-degree = 0)
-    queue = deque([node for node in nodes if in_degree[node] == 0])
-    levels = []
-    processed = set()
-
-    print(f"   🎯 Nivel 0 (sin dependencias): {len(queue)} objetos")
-
-    # 3. Procesar por niveles
-    level_num = 0
-    while queue:
-        current_level = list(queue)
-        levels.append(current_level)
-        queue.clear()
-
-        for node in current_level:
-            processed.add(node)
-
-            # Reducir in-degree de vecinos
-            for neighbor in reverse_adj[node]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
-
-        if queue:
-            level_num += 1
-            print(f"   🎯 Nivel {level_num}: {len(queue)} objetos")
-
-    # 4. Detectar circular dependencies (nodos no procesados)
-    circular = [node for node in nodes if node not in processed]
-
-    print(f"\n   ✅ Topological sort completado")
+        levels[level_of[node]].append(node)
+    return levels
+
+
+def circular_components(components: List[List[str]], adj_list: Dict[str, List[str]],
+                        nodes: List[str]) -> List[List[str]]:
+    """
+    SCCs con dependencias circulares (más de un objeto, o que dependen de sí mismos).
+
+    Los objetos de cada ciclo y los ciclos entre sí quedan en el orden de nodes, así el
+    resultado no depende del orden en que Tarjan recorrió el grafo.
+    """
+    position = {node: i for i, node in enumerate(nodes)}
+    cycles = [
+        sorted(component, key=position.get)
+        for component in components
+        if len(component) > 1 or component[0] in adj_list.get(component[0], [])
+    ]
+    return sorted(cycles, key=lambda cycle: position[cycle[0]])
+
+
+def topological_sort_with_levels(nodes: List[str], adj_list: Dict[str, List[str]]) -> Tuple[List[List[str]], List[List[str]]]:
+    """
+    Niveles de dependencia sobre el DAG de condensación (cada SCC es un nodo).
+
+    Nivel de una componente = 1 + el mayor nivel de las componentes de las que
+    depende (0 si no depende de ninguna). Los objetos de un ciclo quedan juntos en
+    su nivel y los que solo dependen del ciclo siguen en niveles paralelos
+    posteriores (antes todos iban a un único nivel final).
+
+    Args:
+        nodes: Lista de object_ids
+        adj_list: Adjacency list (object_id -> [dep_ids])
+
+    Returns:
+        Tupla (levels, cycles)
+        - levels: Lista de niveles [[obj_0001, obj_0005], [obj_0010], ...] (orden de nodes)
+        - cycles: SCCs con dependencias circulares (más de un objeto, o que dependen de sí mismos)
+    """
+    print("🔄 Calculando SCCs (Tarjan) y niveles del grafo de condensación...\n")
+
+    components = find_strongly_connected_components(nodes, adj_list)
+
+    component_of = {}
+    for component_id, component in enumerate(components):
+        for node in component:
+            component_of[node] = component_id
+
+    component_level = condensation_levels(components, adj_list)
+    levels = group_by_level(nodes, {node: component_level[component_id]
+                                    for component_id, component in enumerate(components)
+                                    for node in component})
+    cycles = circular_components(components, adj_list, nodes)
+
+    for level_num, level_objects in enumerate(levels):
+        print(f"   🎯 Nivel {level_num}: {len(level_objects)} objetos")
+
+    print(f"\n   ✅ Niveles calculados")
     print(f"   📊 Total niveles: {len(levels)}")
-    print(f"   📊 Objetos procesados: {len(processed)}")
-    print(f"   ⚠️  Circular dependencies: {len(circular)}\n")
+    print(f"   📊 Componentes (SCC): {len(components)}")
+    print(f"   ⚠️  Circular dependencies: {sum(len(cycle) for cycle in cycles)} objetos en {len(cycles)} ciclos\n")
+
+    return levels, cycles
+
 
-    return levels, circular
+def load_previous_graph(manifest: Dict) -> Optional[Dict]:
+    """
+    Grafo y niveles de la ejecución anterior, para --incremental.
 
+    Solo sirven si el manifest sigue teniendo los campos que escribió esa ejecución
+    (dependency_resolution apunta al mismo dependency_graph.json); si no, None y se
+    recalcula todo.
 
-def detect_circular_groups(circular_nodes: List[str], adj_list: Dict[str, List[str]], objects: Dict[str, Dict]) -> List[Dict]:
+    Returns:
+        Dict con graph, levels y circular_groups, o None
     """
-    Detecta grupos de dependencias circulares usando DFS.
+    if not DEPENDENCY_GRAPH_FILE.exists() or not MIGRATION_ORDER_FILE.exists():
+        print("   ⚠️  Sin dependency_graph.json/migration_order.json previos: recálculo completo\n")
+        return None
+
+    with open(DEPENDENCY_GRAPH_FILE, 'r', encoding='utf-8') as f:
+        dependency_graph = json.load(f)
+    with open(MIGRATION_ORDER_FILE, 'r', encoding='utf-8') as f:
+        migration_order = json.load(f)
+
+    resolution = manifest.get("dependency_resolution", {})
+    if (migration_order.get("version") != "2.0.0"
+            or resolution.get("dependency_graph_generated_at") != dependency_graph.get("generated_at")):
+        print("   ⚠️  El manifest no corresponde al dependency_graph.json guardado: recálculo completo\n")
+        return None
+
+    return {
+        "graph": dependency_graph["graph"],
+        "levels": [level["objects"] for level in migration_order["levels"]],
+        "circular_groups": dependency_graph.get("circular_groups", [])
+    }
+
+
+def diff_dependency_graph(nodes: List[str], adj_list: Dict[str, List[str]],
+                          previous_graph: Dict[str, Dict]) -> Tuple[Set[str], Set[str]]:
+    """
+    Compara las dependencias actuales con las del grafo guardado.
+
+    Returns:
+        Tupla (changed, removed)
+        - changed: Objetos nuevos o cuyas depends_on cambiaron
+        - removed: Objetos del grafo guardado que ya no tienen análisis
+    """
+    changed = {node for node in nodes
+               if node not in previous_graph or previous_graph[node]["depends_on"] != adj_list.get(node, [])}
+    removed = set(previous_graph) - set(nodes)
+    return changed, removed
+
+
+def incremental_levels(nodes: List[str], adj_list: Dict[str, List[str]], reverse_adj_list: Dict[str, List[str]],
+                       previous: Dict, changed: Set[str], removed: Set[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    """
+    Niveles recalculando solo el cono aguas abajo de los objetos cambiados.
+
+    El nivel de un objeto depende solo de lo que está aguas arriba: fuera del cono
+    (cambiados, dependientes de objetos eliminados y todo lo que depende de ellos)
+    los niveles y los ciclos guardados siguen valiendo. Un ciclo nuevo o roto queda
+    entero dentro del cono. Mismo resultado que topological_sort_with_levels.
 
     Args:
-        circular_nodes: Lista de object_ids en dependencias circulares
-        adj_list: Adjacency list
+        previous: Estado de la ejecución anterior (load_previous_graph)
+        changed, removed: De diff_dependency_graph
+
+    Returns:
+        Tupla (levels, cycles), igual que topological_sort_with_levels
+    """
+    print("🔄 Recalculando niveles del cono de objetos cambiados...\n")
+
+    node_set = set(nodes)
+    previous_graph = previous["graph"]
+
+    seeds = set(changed)
+    for obj_id in removed:
+        seeds.update(dep for dep in previous_graph[obj_id]["depended_by"] if dep in node_set)
+
+    cone = set(seeds)
+    pending = list(seeds)
+    while pending:
+        for dependent in reverse_adj_list.get(pending.pop(), []):
+            if dependent in node_set and dependent not in cone:
+                cone.add(dependent)
+                pending.append(dependent)
+
+    level_of = {obj_id: level_num
+                for level_num, level_objects in enumerate(previous["levels"])
+                for obj_id in level_objects
+                if obj_id in node_set and obj_id not in cone}
+
+    cone_nodes = [node for node in nodes if node in cone]
+    components = find_strongly_connected_components(cone_nodes, adj_list)
+    component_level = condensation_levels(components, adj_list, level_of)
+    for component_id, component in enumerate(components):
+        for node in component:
+            level_of[node] = component_level[component_id]
+
+    levels = group_by_level(nodes, level_of)
+
+    position = {node: i for i, node in enumerate(nodes)}
+    kept_cycles = [group["objects"] for group in previous["circular_groups"]
+                   if not cone.intersection(group["objects"]) and not removed.intersection(group["objects"])]
+    cycles = sorted(kept_cycles + circular_components(components, adj_list, nodes),
+                    key=lambda cycle: position[cycle[0]])
+
+    print(f"   📊 Objetos cambiados: {len(changed)} (nuevos o con otras dependencias)")
+    print(f"   📊 Objetos eliminados: {len(removed)}")
+    print(f"   📊 Cono recalculado: {len(cone)} de {len(nodes)} objetos ({len(components)} componentes)")
+    print(f"\n   ✅ Niveles calculados")
+    print(f"   📊 Total niveles: {len(levels)}")
+    print(f"   ⚠️  Circular dependencies: {sum(len(cycle) for cycle in cycles)} objetos en {len(cycles)} ciclos\n")
+
+    return levels, cycles
+
+
+def detect_circular_groups(cycles: List[List[str]], objects: Dict[str, Dict]) -> List[Dict]:
+    """
+    Describe cada ciclo (SCC) como grupo de dependencias circulares.
+
+    Args:
+        cycles: SCCs con dependencias circulares (de topological_sort_with_levels)
         objects: Dict de objetos
 
     Returns:
         Lista de grupos de dependencias circulares con descripción
     """
-    if not circular_nodes:
+    if not cycles:
         return []
 
     print("🔍 Detectando grupos de circular dependencies...\n")
 
-    visited = set()
     groups = []
-
-    def dfs(node, current_group):
-        if node in visited:
-            return
-        visited.add(node)
-        current_group.append(node)
-
-        # Visitar dependencias
-        for dep in adj_list.get(node, []):
-            if dep in circular_nodes:
-                dfs(dep, current_group)
-
-    for node in circular_nodes:
-        if node not in visited:
-            current_group = []
-            dfs(node, current_group)
-            if current_group:
-                # Generar descripción
-                obj_names = [objects[obj_id]["object_name"] for obj_id in current_group[:3]]
-                description = f"{', '.join(obj_names)}"
-                if len(current_group) > 3:
-                    description += f" (y {len(current_group) - 3} más)"
-
-                groups.append({
-                    "group_id": len(groups) + 1,
-                    "size": len(current_group),
-                    "objects": current_group,
-                    "description": description
-                })
+    for cycle in cycles:
+        # Generar descripción
+        obj_names = [objects[obj_id]["object_name"] for obj_id in cycle[:3]]
+        description = f"{', '.join(obj_names)}"
+        if len(cycle) > 3:
+            description += f" (y {len(cycle) - 3} más)"
+
+        groups.append({
+            "group_id": len(groups) + 1,
+            "size": len(cycle),
+            "objects": cycle,
+            "description": description
+        })
 
     print(f"   ✅ Detectados {len(groups)} grupos circulares\n")
     return groups
 
 
 def generate_dependency_graph(objects: Dict[str, Dict], adj_list: Dict[str, List[str]],
-                               reverse_adj_list: Dict[str, List[str]], circular_groups: List[Dict]) -> Dict:
+                               reverse_adj_list: Dict[str, List[str]], circular_groups: List[Dict],
+                               resolution: Dict[str, Dict]) -> Dict:
     """
     Genera dependency_graph.json (grafo completo).
 
+    Cada nodo lleva en resolution cómo se resolvió cada arista de depends_on
+    (nombre referenciado, method y confidence).
+
     Returns:
         Dict con estructura completa del grafo
     """
@@ -324,18 +692,26 @@ def generate_dependency_graph(objects: Dict[str, Dict], adj_list: Dict[str, List
             "object_name": obj_data["object_name"],
             "object_type": obj_data["object_type"],
             "depends_on": adj_list.get(object_id, []),
-            "depended_by": reverse_adj_list.get(object_id, [])
+            "depended_by": reverse_adj_list.get(object_id, []),
+            "resolution": resolution.get(object_id, {}),
+            "source": obj_data.get("source", "plsql-analyzer")
         }
 
     total_deps = sum(len(v["depends_on"]) for v in graph.values())
 
+    resolution_summary = defaultdict(int)
+    for edges in resolution.values():
+        for edge in edges.values():
+            resolution_summary[edge["method"]] += 1
+
     dependency_graph = {
         "generated_at": datetime.now().isoformat(),
-        "version": "1.0.0",
+        "version": "1.1.0",
         "total_objects": len(objects),
         "total_dependencies": total_deps,
         "circular_dependencies_detected": sum(g["size"] for g in circular_groups),
         "circular_groups_count": len(circular_groups),
+        "resolution_summary": dict(resolution_summary),
         "graph": graph,
         "circular_groups": circular_groups
     }
@@ -349,11 +725,20 @@ def generate_migration_order(levels: List[List[str]], circular_nodes: List[str],
     """
     Genera migration_order.json (orden topológico por niveles).
 
+    Los ciclos van en el nivel que les toca en el grafo de condensación; un nivel
+    con objetos circulares lleva is_circular y circular_count.
+
     Returns:
         Dict con orden de migración óptimo
     """
     print("📝 Generando migration_order.json...\n")
 
+    # Índice: object_id -> grupo circular (O(1) por objeto)
+    group_of = {}
+    for group in circular_groups:
+        for obj_id in group["objects"]:
+            group_of[obj_id] = group["group_id"]
+
     levels_info = []
     total_in_levels = 0
 
@@ -362,45 +747,36 @@ def generate_migration_order(levels: List[List[str]], circular_nodes: List[str],
         description = "Sin dependencias - pueden convertirse en paralelo" if level_num == 0 else \
                       f"Dependen solo de niveles 0-{level_num - 1}"
 
-        levels_info.append({
+        level_info = {
             "level": level_num,
             "count": len(level_objects),
             "description": description,
             "objects": level_objects
-        })
+        }
 
-    # Agregar circular dependencies como último nivel especial
-    if circular_nodes:
-        levels_info.append({
-            "level": len(levels),
-            "count": len(circular_nodes),
-            "description": "Circular dependencies - requieren forward declarations",
-            "objects": circular_nodes,
-            "is_circular": True
-        })
+        circular_count = sum(1 for obj_id in level_objects if obj_id in group_of)
+        if circular_count:
+            level_info["description"] += " (incluye circular dependencies - requieren forward declarations)"
+            level_info["is_circular"] = True
+            level_info["circular_count"] = circular_count
+
+        levels_info.append(level_info)
 
     # Generar lista de circular dependencies con resolución
     circular_deps_info = []
     for node in circular_nodes:
         obj_data = objects[node]
-        # Encontrar grupo al que pertenece
-        group_id = None
-        for group in circular_groups:
-            if node in group["objects"]:
-                group_id = group["group_id"]
-                break
-
         circular_deps_info.append({
             "object_id": node,
             "object_name": obj_data["object_name"],
             "object_type": obj_data["object_type"],
-            "circular_group": group_id,
+            "circular_group": group_of[node],
             "resolution_strategy": "forward_declaration_required"
         })
 
     migration_order = {
         "generated_at": datetime.now().isoformat(),
-        "version": "1.0.0",
+        "version": "2.0.0",
         "total_levels": len(levels_info),
         "total_objects": len(objects),
         "objects_in_topological_order": total_in_levels,
@@ -413,31 +789,19 @@ def generate_migration_order(levels: List[List[str]], circular_nodes: List[str],
     return migration_order
 
 
-def update_manifest(manifest_path: Path, objects: Dict[str, Dict], adj_list: Dict[str, List[str]],
-                    reverse_adj_list: Dict[str, List[str]], levels: List[List[str]],
-                    circular_nodes: List[str], dry_run: bool = False) -> None:
+def manifest_dependency_fields(manifest_objects: List[Dict], adj_list: Dict[str, List[str]],
+                               reverse_adj_list: Dict[str, List[str]], levels: List[List[str]]) -> Dict[str, Dict]:
     """
-    Actualiza manifest.json con campos nuevos de dependency resolution.
+    Campos de dependency resolution de cada objeto del manifest.
 
-    Nuevos campos agregados a cada objeto:
-        - migration_order: Orden topológico (1, 2, 3, ...)
-        - dependency_level: Nivel en el grafo (0=sin deps, 1=depende de nivel 0, ...)
-        - depends_on: [object_ids] que este objeto depende
-        - depended_by: [object_ids] que dependen de este objeto
+    Returns:
+        Dict object_id -> {migration_order, dependency_level, depends_on, depended_by}
     """
-    print("📝 Actualizando manifest.json...\n")
-
-    if not manifest_path.exists():
-        print(f"❌ Error: {manifest_path} no existe")
-        sys.exit(1)
-
-    with open(manifest_path, 'r', encoding='utf-8') as f:
-        manifest = json.load(f)
-
     # Crear mapeo: object_id -> migration_order
     migration_order_map = {}
     order_counter = 1
 
+    # Los objetos circulares ya están en su nivel (grafo de condensación)
     for level_num, level_objects in enumerate(levels):
         for obj_id in level_objects:
             migration_order_map[obj_id] = {
@@ -446,53 +810,87 @@ def update_manifest(manifest_path: Path, objects: Dict[str, Dict], adj_list: Dic
             }
             order_counter += 1
 
-    # Circular dependencies en último nivel
-    circular_level = len(levels)
-    for obj_id in circular_nodes:
-        migration_order_map[obj_id] = {
-            "migration_order": order_counter,
-            "dependency_level": circular_level
-        }
-        order_counter += 1
-
-    # Actualizar objetos del manifest
-    updated_count = 0
-    not_found_count = 0
-
-    for obj in manifest["objects"]:
+    fields = {}
+    for obj in manifest_objects:
         obj_id = obj["object_id"]
 
         if obj_id in migration_order_map:
-            # Agregar campos nuevos
-            obj["migration_order"] = migration_order_map[obj_id]["migration_order"]
-            obj["dependency_level"] = migration_order_map[obj_id]["dependency_level"]
-            obj["depends_on"] = adj_list.get(obj_id, [])
-            obj["depended_by"] = reverse_adj_list.get(obj_id, [])
-            updated_count += 1
+            fields[obj_id] = {
+                "migration_order": migration_order_map[obj_id]["migration_order"],
+                "dependency_level": migration_order_map[obj_id]["dependency_level"],
+                "depends_on": adj_list.get(obj_id, []),
+                "depended_by": reverse_adj_list.get(obj_id, [])
+            }
         else:
             # Objeto no encontrado en análisis (posiblemente REFERENCE)
-            obj["migration_order"] = obj.get("processing_order", 9999)
-            obj["dependency_level"] = -1  # No aplica
-            obj["depends_on"] = []
-            obj["depended_by"] = []
-            not_found_count += 1
+            fields[obj_id] = {
+                "migration_order": obj.get("processing_order", 9999),
+                "dependency_level": -1,  # No aplica
+                "depends_on": [],
+                "depended_by": []
+            }
+
+    return fields
+
+
+def update_manifest(manifest: Dict, objects: Dict[str, Dict], adj_list: Dict[str, List[str]],
+                    reverse_adj_list: Dict[str, List[str]], levels: List[List[str]],
+                    circular_nodes: List[str], dry_run: bool = False,
+                    graph_generated_at: Optional[str] = None, previous: Optional[Dict] = None) -> None:
+    """
+    Actualiza manifest.json con campos nuevos de dependency resolution.
+
+    Args:
+        manifest: Manifest (o índice, si es sharded) cargado con load_manifest_index()
+        graph_generated_at: generated_at del dependency_graph.json escrito (para --incremental)
+        previous: Estado de la ejecución anterior (--incremental): solo se escriben los
+            objetos cuyos campos cambiaron
+
+    Nuevos campos agregados a cada objeto:
+        - migration_order: Orden topológico (1, 2, 3, ...)
+        - dependency_level: Nivel en el grafo (0=sin deps, 1=depende de nivel 0, ...)
+        - depends_on: [object_ids] que este objeto depende
+        - depended_by: [object_ids] que dependen de este objeto
+    """
+    print("📝 Actualizando manifest.json...\n")
+
+    manifest_objects = manifest["objects"]
+    updates = manifest_dependency_fields(manifest_objects, adj_list, reverse_adj_list, levels)
+    updated_count = sum(1 for fields in updates.values() if fields["dependency_level"] >= 0)
+    not_found_count = len(updates) - updated_count
+
+    if previous is not None:
+        # Lo que escribió la ejecución anterior (el manifest no cambió desde entonces)
+        previous_graph = previous["graph"]
+        previous_fields = manifest_dependency_fields(
+            manifest_objects,
+            {obj_id: node["depends_on"] for obj_id, node in previous_graph.items()},
+            {obj_id: node["depended_by"] for obj_id, node in previous_graph.items()},
+            previous["levels"]
+        )
+        updates = {obj_id: fields for obj_id, fields in updates.items() if previous_fields.get(obj_id) != fields}
 
     # Actualizar metadata del manifest
-    manifest["dependency_resolution"] = {
+    dependency_resolution = {
         "generated_at": datetime.now().isoformat(),
         "version": "1.0.0",
-        "total_levels": len(levels) + (1 if circular_nodes else 0),
+        "total_levels": len(levels),
         "circular_dependencies_count": len(circular_nodes),
         "objects_with_dependencies": updated_count,
-        "objects_without_analysis": not_found_count
+        "objects_without_analysis": not_found_count,
+        "dependency_graph_generated_at": graph_generated_at
     }
 
     if not dry_run:
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        # Mismo lock que la compactación del journal de progreso (ambos reescriben el manifest)
+        with journal_lock():
+            update_manifest_objects(updates, metadata={"dependency_resolution": dependency_resolution})
 
-        print(f"   ✅ Manifest actualizado: {manifest_path}")
-        print(f"   📊 {updated_count} objetos actualizados con dependency info")
+        print(f"   ✅ Manifest actualizado: {manifest_location()}")
+        if previous is not None:
+            print(f"   📊 {len(updates)} de {len(manifest_objects)} objetos con cambios de dependency info")
+        else:
+            print(f"   📊 {updated_count} objetos actualizados con dependency info")
         if not_found_count > 0:
             print(f"   ⚠️  {not_found_count} objetos sin análisis (posiblemente REFERENCE)\n")
     else:
@@ -502,44 +900,58 @@ def update_manifest(manifest_path: Path, objects: Dict[str, Dict], adj_list: Dic
 def main():
     """Función principal"""
     dry_run = '--dry-run' in sys.argv
+    incremental = '--incremental' in sys.argv
+    use_static = '--static' in sys.argv
 
     print("=" * 80)
     print("DEPENDENCY RESOLUTION & TOPOLOGICAL SORT")
     print("=" * 80)
     print(f"Directorio: {BASE_DIR}")
-    print(f"Modo: {'DRY-RUN (sin guardar archivos)' if dry_run else 'PRODUCCIÓN'}")
+    print(f"Modo: {'DRY-RUN (sin guardar archivos)' if dry_run else 'PRODUCCIÓN'}"
+          f"{' (incremental)' if incremental else ''}{' (con escaneo estático)' if use_static else ''}")
     print("=" * 80)
 
     # 1. Cargar todas las dependencias de knowledge/json/
-    objects = load_all_dependencies()
+    objects = load_all_dependencies(save_cache=not dry_run, required=not use_static)
+
+    # 1b. Objetos sin análisis todavía: dependencias del escaneo estático (--static)
+    if use_static:
+        load_static_dependencies(objects)
 
-    # 2. Cargar manifest para resolver nombres a IDs
-    if not MANIFEST_FILE.exists():
-        print(f"❌ Error: {MANIFEST_FILE} no existe")
+    # 2. Cargar manifest para resolver nombres a IDs (layout sharded: solo el índice)
+    if not manifest_exists():
+        print(f"❌ Error: {manifest_location()} no existe")
         print("   Ejecuta prepare_migration.py primero")
         sys.exit(1)
 
-    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
-        manifest = json.load(f)
+    manifest = load_manifest_index()
 
     manifest_objects = manifest.get("objects", [])
     print(f"📖 Manifest cargado: {len(manifest_objects)} objetos\n")
 
+    # Grafo y niveles de la ejecución anterior (--incremental)
+    previous = load_previous_graph(manifest) if incremental else None
+
     # 3. Resolver nombres de dependencias a object_ids
-    resolved_deps = resolve_dependency_names_to_ids(objects, manifest_objects)
+    resolved_deps, resolution = resolve_dependency_names_to_ids(objects, manifest_objects)
 
     # 4. Construir adjacency list
     adj_list, reverse_adj_list = build_adjacency_list(objects, resolved_deps)
 
-    # 5. Aplicar topological sort con niveles
+    # 5. SCCs (Tarjan) y niveles sobre el grafo de condensación (--incremental: solo el cono de los cambios)
     nodes = list(objects.keys())
-    levels, circular_nodes = topological_sort_with_levels(nodes, adj_list)
+    if previous is not None:
+        changed, removed = diff_dependency_graph(nodes, adj_list, previous["graph"])
+        levels, cycles = incremental_levels(nodes, adj_list, reverse_adj_list, previous, changed, removed)
+    else:
+        levels, cycles = topological_sort_with_levels(nodes, adj_list)
+    circular_nodes = [obj_id for cycle in cycles for obj_id in cycle]
 
     # 6. Detectar grupos de circular dependencies
-    circular_groups = detect_circular_groups(circular_nodes, adj_list, objects)
+    circular_groups = detect_circular_groups(cycles, objects)
 
     # 7. Generar dependency_graph.json
-    dependency_graph = generate_dependency_graph(objects, adj_list, reverse_adj_list, circular_groups)
+    dependency_graph = generate_dependency_graph(objects, adj_list, reverse_adj_list, circular_groups, resolution)
 
     if not dry_run:
         with open(DEPENDENCY_GRAPH_FILE, 'w', encoding='utf-8') as f:
@@ -559,7 +971,8 @@ def main():
         print(f"🔍 DRY-RUN: {MIGRATION_ORDER_FILE} NO guardado\n")
 
     # 9. Actualizar manifest.json
-    update_manifest(MANIFEST_FILE, objects, adj_list, reverse_adj_list, levels, circular_nodes, dry_run)
+    update_manifest(manifest, objects, adj_list, reverse_adj_list, levels, circular_nodes, dry_run,
+                    dependency_graph["generated_at"], previous)
 
     # 10. Resumen final
     print("=" * 80)
@@ -586,7 +999,7 @@ def main():
         print("\nArchivos generados:")
         print(f"  - {DEPENDENCY_GRAPH_FILE}")
         print(f"  - {MIGRATION_ORDER_FILE}")
-        print(f"  - {MANIFEST_FILE} (actualizado)")
+        print(f"  - {manifest_location()} (actualizado)")
 
 
 if __name__ == "__main__":
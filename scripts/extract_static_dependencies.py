@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Extractor estático de dependencias (sin agentes, sin tokens).
+
+PROPÓSITO:
+    Las dependencias existen recién cuando plsql-analyzer leyó cada objeto y
+    escribió dependencies.executable_objects: hasta terminar la Fase 1 no hay
+    grafo, ni orden de migración, ni schedule. Este script recorre una vez el
+    código de cada objeto (sin comentarios ni literales) y busca los nombres del
+    manifest, así build_dependency_graph.py --static puede armar un primer grafo
+    en segundos, antes de gastar tokens.
+
+ALGORITMO:
+    - Índice de nombres del manifest (name_resolution.py): object_name, nombres
+      de package y "PKG.PROC" de los hijos, más sinónimos/esquemas opcionales
+    - Por objeto: vista "code" del lexer de prepare_migration (comentarios e
+      interior de literales en blanco) y una sola pasada de una regex sobre las
+      cadenas de identificadores (A, A.B, A.B.C...). Las cadenas cuya primera
+      parte no puede empezar ningún nombre se descartan con un set; el resto se
+      busca en el índice del prefijo más largo al más corto. Equivale a un
+      autómata de patrones múltiples (Aho-Corasick) restringido a límites de
+      identificador, con búsquedas O(1) por cadena en lugar de un recorrido
+      carácter a carácter en Python
+    - Las llamadas sin calificar dentro de un package se resuelven primero al
+      propio package (package_local). Los prefijos desconocidos no se recortan
+      (en el código, "rec.campo" no es "esquema.objeto")
+    - El nombre del propio objeto en su cabecera y en su END no cuenta: la
+      cabecera de un overload no es una llamada a sus hermanos
+    - El destino decide la clave: TABLE → tables, VIEW/MVIEW → views,
+      TYPE → types, SEQUENCE → sequences, resto → executable_objects (mismas
+      claves que el JSON de plsql-analyzer)
+
+    Son dependencias candidatas: un nombre en SQL dinámico (dentro de un literal)
+    no se ve, y una variable con el nombre de un objeto cuenta como referencia.
+    plsql-analyzer las reemplaza objeto por objeto.
+
+ENTRADA:
+    - Manifest (cualquier layout; solo el índice)
+    - sql/extracted/objects/objects.pack (prepare_migration.py --extract-objects)
+    - sql/extracted/synonyms.json (opcional)
+
+SALIDA:
+    sql/extracted/static_dependencies.json ← object_id → dependencies
+
+USO:
+    python scripts/extract_static_dependencies.py
+    python scripts/build_dependency_graph.py --static
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene sql/extracted/
+"""
+
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Set
+
+from manifest_store import (
+    EXTRACTED_DIR,
+    load_manifest_index,
+    manifest_exists,
+    manifest_location,
+    write_json_atomic,
+)
+from name_resolution import (
+    build_resolution_index,
+    load_synonyms,
+    normalize_name,
+    object_package,
+    resolve_reference,
+)
+from object_source import object_source_reader, object_sources_exist
+from prepare_migration import tokenize_sql
+
+STATIC_DEPENDENCIES_FILE = EXTRACTED_DIR / "static_dependencies.json"
+
+# Cadena de identificadores: A, A.B, A . B . C (sobre el código en mayúsculas)
+IDENTIFIER_CHAIN_PATTERN = re.compile(
+    r"(?<![\w$#])[A-Z_][\w$#]*(?:\s*\.\s*[A-Z_][\w$#]*)*"
+)
+MAX_CHAIN_PARTS = 4  # esquema.package.proc.campo
+
+# Tipo del objeto referenciado → clave de dependencies (como plsql-analyzer)
+REFERENCE_DEPENDENCY_KEYS = {
+    "TABLE": "tables",
+    "VIEW": "views",
+    "MVIEW": "views",
+    "TYPE": "types",
+    "SEQUENCE": "sequences",
+    "DIRECTORY": "directories",
+}
+DEPENDENCY_KEYS = (
+    "executable_objects",
+    "tables",
+    "types",
+    "views",
+    "sequences",
+    "directories",
+)
+
+# Nombre del propio subprograma en su cabecera y en su END (no es una llamada)
+OWN_HEADER_PATTERN = (
+    r"(?<![\w$#])(?:PROCEDURE|FUNCTION)\s+((?:[\w$#]+\s*\.\s*)*{name})(?![\w$#])"
+)
+OWN_END_PATTERN = r"(?<![\w$#])END\s+({name})\s*;"
+
+
+def leading_tokens(index: Dict) -> Set[str]:
+    """
+    Primeras partes con las que puede empezar una referencia resoluble.
+
+    Nombres ("PKG" de "PKG.PROC", "FN"), nombre corto de los hijos (llamadas
+    package_local), sinónimos y esquemas. Una cadena que empieza con otra cosa
+    (variables, columnas, palabras clave: la gran mayoría) se descarta con una
+    sola búsqueda en el set, como las transiciones desde la raíz de un autómata.
+    """
+    tokens = set(index["schemas"])
+    for name in list(index["by_name"]) + list(index["synonyms"]):
+        tokens.add(name.split(".", 1)[0])
+        tokens.add(name.rsplit(".", 1)[-1])
+    return tokens
+
+
+def blank_own_declaration(text: str, object_name: str) -> str:
+    """
+    Blanquea el nombre del objeto en su cabecera (primer PROCEDURE/FUNCTION) y
+    en su último END.
+
+    Sin esto, la cabecera de cada overload ("PROCEDURE P" en PKG.P) se resuelve
+    por package_local a sus hermanos: un ciclo falso por cada grupo de overloads.
+    Las llamadas reales entre overloads del cuerpo se siguen reportando.
+    """
+    name = re.escape(normalize_name(object_name).rsplit(".", 1)[-1])
+    spans = []
+    header = re.search(OWN_HEADER_PATTERN.format(name=name), text)
+    if header:
+        spans.append(header.span(1))
+    ends = list(re.finditer(OWN_END_PATTERN.format(name=name), text))
+    end = ends[-1] if ends else None
+    if end and (not header or end.start() > header.end()):
+        spans.append(end.span(1))
+
+    for start, stop in reversed(spans):
+        text = text[:start] + " " * (stop - start) + text[stop:]
+    return text
+
+
+def extract_object_dependencies(
+    code: str,
+    obj: Dict,
+    index: Dict,
+    by_id: Dict[str, Dict],
+    tokens: Set[str],
+    method_counts: Dict,
+) -> Dict[str, List[str]]:
+    """
+    Dependencias candidatas de un objeto a partir de su código.
+
+    Args:
+        code: Código del objeto (del pack)
+        obj: Entrada del manifest (object_id, object_name, object_type, parent_package)
+        index: De build_resolution_index()
+        by_id: object_id → entrada del manifest
+        tokens: De leading_tokens()
+        method_counts: Acumulador de referencias por método de resolución
+
+    Returns:
+        Dict con las claves de DEPENDENCY_KEYS → object_names referenciados
+    """
+    object_id = obj["object_id"]
+    caller_package = object_package(obj)
+    # Un PACKAGE_BODY contiene el código de sus hijos: no depende de ellos
+    own_package = (
+        caller_package
+        if obj["object_type"] in ("PACKAGE_BODY", "PACKAGE_SPEC")
+        else None
+    )
+
+    text = tokenize_sql(code)["code"].upper().replace('"', "")
+    text = blank_own_declaration(text, obj["object_name"])
+    dependencies = {key: {} for key in DEPENDENCY_KEYS}
+    seen = {object_id}
+
+    # Cada cadena distinta una vez, en orden de aparición
+    for chain in dict.fromkeys(IDENTIFIER_CHAIN_PATTERN.findall(text)):
+        parts = "".join(chain.split()).split(".")[:MAX_CHAIN_PARTS]
+        if parts[0] not in tokens:
+            continue
+
+        for size in range(len(parts), 0, -1):
+            resolved = resolve_reference(
+                index, ".".join(parts[:size]), object_id, caller_package
+            )
+            if resolved:
+                break
+        else:
+            continue
+
+        for target_id in resolved["object_ids"]:
+            if target_id in seen:
+                continue
+            seen.add(target_id)
+            target = by_id[target_id]
+            if own_package and object_package(target) == own_package:
+                continue
+            method_counts[resolved["method"]] += 1
+            key = REFERENCE_DEPENDENCY_KEYS.get(
+                target["object_type"], "executable_objects"
+            )
+            dependencies[key][target["object_name"]] = None
+
+    return {key: list(names) for key, names in dependencies.items()}
+
+
+def extract_static_dependencies(manifest_objects: List[Dict]) -> Dict:
+    """
+    Escanea el código de todos los objetos no REFERENCE (los que analiza la Fase 1).
+
+    Returns:
+        Contenido de static_dependencies.json
+    """
+    index = build_resolution_index(manifest_objects, load_synonyms())
+    by_id = {obj["object_id"]: obj for obj in manifest_objects}
+    tokens = leading_tokens(index)
+    method_counts = defaultdict(int)
+    results = {}
+    without_source = []
+
+    with object_source_reader() as read_source:
+        for obj in manifest_objects:
+            if obj.get("category") == "REFERENCE":
+                continue
+            code = read_source(obj["object_id"])
+            if code is None:
+                without_source.append(obj["object_id"])
+                continue
+            results[obj["object_id"]] = {
+                "object_name": obj["object_name"],
+                "object_type": obj["object_type"],
+                "dependencies": extract_object_dependencies(
+                    code, obj, index, by_id, tokens, method_counts
+                ),
+            }
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "version": "1.0.0",
+        "total_objects": len(results),
+        "objects_without_source": without_source,
+        "resolution_summary": dict(method_counts),
+        "objects": results,
+    }
+
+
+def main():
+    """Función principal"""
+    print("=" * 80)
+    print("EXTRACCIÓN ESTÁTICA DE DEPENDENCIAS")
+    print("=" * 80)
+
+    if not manifest_exists():
+        print(f"❌ Error: {manifest_location()} no existe")
+        print("   Ejecuta prepare_migration.py primero")
+        sys.exit(1)
+
+    if not object_sources_exist():
+        print("❌ Error: No existe sql/extracted/objects/objects.pack")
+        print("   Ejecuta prepare_migration.py --extract-objects primero")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    manifest_objects = load_manifest_index()["objects"]
+    print(f"📖 Manifest cargado: {len(manifest_objects)} objetos\n")
+
+    static = extract_static_dependencies(manifest_objects)
+    write_json_atomic(STATIC_DEPENDENCIES_FILE, static)
+
+    totals = defaultdict(int)
+    for result in static["objects"].values():
+        for key, names in result["dependencies"].items():
+            totals[key] += len(names)
+
+    print(f"🔎 Objetos escaneados: {static['total_objects']}")
+    for key in DEPENDENCY_KEYS:
+        if totals[key]:
+            print(f"   📊 {key}: {totals[key]}")
+    for method, count in static["resolution_summary"].items():
+        print(f"   🔗 {method}: {count}")
+    without_source = static["objects_without_source"]
+    if without_source:
+        print(f"   ⚠️  {len(without_source)} objetos sin código en el pack")
+    print(f"\n⏱️  {time.perf_counter() - started:.1f}s")
+    print(f"✅ Guardado: {STATIC_DEPENDENCIES_FILE}")
+    print("\nSiguiente paso: python scripts/build_dependency_graph.py --static")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Generador de corpus PL/SQL sintético para medir el pipeline de preparación.
+
+PROPÓSITO:
+    Permite medir prepare_migration.py, build_dependency_graph.py y update_progress.py
+    sin acceso al schema privado. Genera un árbol sql/extracted/ con el mismo formato
+    que produce extract_all_objects.sql (ALL_SOURCE con delimitador / y DDL de
+    DBMS_METADATA terminado en ;) y, opcionalmente, los outputs de plsql-analyzer
+    en knowledge/json/batch_XXX/.
+
+CASOS DIFÍCILES INCLUIDOS:
+    ✅ Packages con cientos de procedures/functions (--package-size)
+    ✅ Java Stored Functions (standalone y dentro de packages)
+    ✅ Nombres entre comillas y con esquema ("SCH"."NOMBRE")
+    ✅ Procedures/functions anidados
+    ✅ Bloques de comentarios grandes con palabras clave (PROCEDURE, END;, /)
+    ✅ Literales con END; y -- dentro
+    ✅ Dependencias entre objetos (con algunos ciclos) en los outputs de knowledge/
+
+USO:
+    # 1. Generar sql/extracted/ con ~10,000 objetos en el manifest
+    python scripts/generate_synthetic_corpus.py /tmp/corpus --objects 10000
+
+    # 2. Generar manifest
+    cd /tmp/corpus && python /path/to/scripts/prepare_migration.py
+
+    # 3. Generar outputs de plsql-analyzer a partir del manifest
+    python scripts/generate_synthetic_corpus.py /tmp/corpus --knowledge
+
+Opciones:
+    --objects N         Objetos aproximados en el manifest (default: 1000)
+    --package-size N    Procedures/functions por package (default: 100)
+    --seed N            Semilla para que el corpus sea reproducible (default: 42)
+    --knowledge         Generar knowledge/json/batch_XXX/ desde el manifest
+                        (cualquier layout: manifest.json, sharded o SQLite)
+    --batch-size N      Objetos por batch en knowledge/json/ (default: 200)
+"""
+
+import json
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Proporción de cada tipo en el manifest (el resto son objetos internos de packages)
+TYPE_RATIOS = {
+    "TYPE": 0.02,
+    "SEQUENCE": 0.04,
+    "TABLE": 0.08,
+    "PRIMARY_KEY": 0.06,
+    "FOREIGN_KEY": 0.04,
+    "VIEW": 0.04,
+    "MVIEW": 0.01,
+    "FUNCTION": 0.12,
+    "PROCEDURE": 0.12,
+    "TRIGGER": 0.04,
+    "JOB": 0.01,
+}
+
+# Dependencias externas (no están en el manifest): se resuelven como externas
+EXTERNAL_DEPENDENCIES = ["DBMS_OUTPUT.PUT_LINE", "UTL_FILE.FOPEN", "DBMS_LOB.SUBSTR"]
+
+# Bloque de comentario grande con palabras clave que el parser debe ignorar
+BIG_COMMENT = (
+    "/*\n"
+    + "".join(
+        f" * Historial {i}: PROCEDURE fake_{i} IS BEGIN NULL; END fake_{i};\n"
+        for i in range(12)
+    )
+    + " * /\n"
+    " */\n"
+)
+
+# Cabecera de objeto (DBMS_METADATA) de más de 100 caracteres después del "/":
+# en modo streaming queda al inicio del bloque, antes de CREATE OR REPLACE
+HEADER_COMMENT = (
+    "/*\n"
+    " * Objeto: historial de cambios, autor, fecha y notas de mantenimiento\n"
+    " * Segunda línea de la cabecera para superar los cien caracteres\n"
+    " */\n"
+)
+
+
+def plan_counts(total_objects: int, package_size: int) -> Dict[str, int]:
+    """Distribuye total_objects entre tipos (packages con package_size hijos)."""
+    counts = {
+        object_type: max(1, int(total_objects * ratio))
+        for object_type, ratio in TYPE_RATIOS.items()
+    }
+    remaining = max(package_size + 1, total_objects - sum(counts.values()))
+    counts["PACKAGE_BODY"] = max(1, remaining // (package_size + 1))
+    return counts
+
+
+def object_name(prefix: str, i: int, rng: random.Random) -> str:
+    """Nombre de objeto; ~20% entre comillas (y la mitad con esquema)."""
+    name = f"{prefix}_{i:06d}"
+    roll = rng.random()
+    if roll < 0.1:
+        return f'"LATINO_PLSQL"."{name}"'
+    if roll < 0.2:
+        return f'"{name}"'
+    return name
+
+
+def bare_name(name: str) -> str:
+    """Nombre sin esquema ni comillas (el que usa END nombre;)."""
+    return name.split(".")[-1].strip('"')
+
+
+def subprogram_body(kind: str, name: str, i: int, rng: random.Random) -> str:
+    """Cuerpo PL/SQL de un procedure/function con anidados, literales y loops."""
+    end_name = bare_name(name)
+    lines = [f"{kind.lower() if i % 3 == 0 else kind} {name}(p_id IN NUMBER)"]
+    if kind == "FUNCTION":
+        lines.append("RETURN NUMBER")
+    lines.append("IS")
+    lines.append("  -- FUNCTION fake_in_comment RETURN NUMBER IS")
+    lines.append("  v_msg VARCHAR2(200) := 'END; -- dentro de un literal /';")
+    lines.append("  v_total NUMBER := 0;")
+    if rng.random() < 0.3:
+        lines.append(f"  FUNCTION nested_{i}(a NUMBER) RETURN NUMBER IS")
+        lines.append("  BEGIN")
+        lines.append("    RETURN a + 1;")
+        lines.append(f"  END nested_{i};")
+    lines.append("BEGIN")
+    for j in range(rng.randint(3, 12)):
+        lines.append(f"  IF p_id > {j} THEN")
+        lines.append("    FOR r IN (SELECT id FROM dual) LOOP")
+        lines.append("      v_total := v_total + CASE WHEN r.id > 0 THEN 1 ELSE 0 END;")
+        lines.append("    END LOOP;")
+        lines.append("  END IF;")
+    if kind == "FUNCTION":
+        lines.append("  RETURN v_total;")
+    lines.append(f"END {end_name};" if rng.random() < 0.8 else "END;")
+    return "\n".join(lines) + "\n"
+
+
+def java_function(name: str) -> str:
+    """Java Stored Function (sin BEGIN/END, termina en NAME '...';)."""
+    return (
+        f"FUNCTION {name}(p_value IN VARCHAR2) RETURN VARCHAR2\n"
+        "AS LANGUAGE JAVA NAME 'com.latino.Util.format(java.lang.String) return java.lang.String';\n"
+    )
+
+
+def write_standalone(
+    file_path: Path, kind: str, prefix: str, count: int, rng: random.Random
+):
+    """Escribe functions.sql / procedures.sql en formato ALL_SOURCE (delimitador /)."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            name = object_name(prefix, i, rng)
+            if i % 50 == 0:
+                f.write(BIG_COMMENT)
+            elif i % 50 == 25:
+                f.write(HEADER_COMMENT + "CREATE OR REPLACE ")
+            if kind == "FUNCTION" and i % 40 == 7:
+                f.write(java_function(name))
+            else:
+                f.write(subprogram_body(kind, name, i, rng))
+            f.write("/\n")
+
+
+def write_packages(
+    spec_path: Path,
+    body_path: Path,
+    count: int,
+    package_size: int,
+    rng: random.Random,
+):
+    """Escribe packages_spec.sql y packages_body.sql (package_size hijos cada uno)."""
+    with open(spec_path, "w", encoding="utf-8") as spec, open(
+        body_path, "w", encoding="utf-8"
+    ) as body:
+        for p in range(count):
+            package = object_name("PKG", p, rng)
+            end_name = bare_name(package)
+
+            spec.write(f"PACKAGE {package} AUTHID DEFINER AS\n")
+            spec.write("  TYPE t_rec IS RECORD (id NUMBER, name VARCHAR2(100));\n")
+            spec.write("  c_max_rows CONSTANT NUMBER := 1000;\n")
+            spec.write("  g_debug BOOLEAN;\n")
+            spec.write("  e_invalid EXCEPTION;\n")
+            spec.write("  CURSOR c_active IS SELECT id FROM dual;\n")
+
+            body.write(f"PACKAGE BODY {package} AS\n")
+            body.write(BIG_COMMENT)
+            body.write("  g_counter NUMBER := 0;\n")
+            body.write("  k_limit CONSTANT NUMBER(5) := 100;\n")
+
+            for s in range(package_size):
+                kind = "FUNCTION" if s % 2 else "PROCEDURE"
+                name = f"{kind[0]}_{s:04d}"
+                if s % 97 == 13:
+                    body.write("  " + java_function(f"F_JAVA_{s:04d}"))
+                    spec.write(
+                        f"  FUNCTION F_JAVA_{s:04d}(p_value IN VARCHAR2) RETURN VARCHAR2;\n"
+                    )
+                    continue
+                signature = f"{kind} {name}(p_id IN NUMBER)"
+                if kind == "FUNCTION":
+                    signature += " RETURN NUMBER"
+                spec.write(f"  {signature};\n")
+                code = subprogram_body(kind, name, s, rng)
+                body.write("".join(f"  {line}\n" for line in code.splitlines()))
+
+            spec.write(f"END {end_name};\n/\n")
+            body.write("BEGIN\n  g_counter := 0;\n")
+            body.write(f"END {end_name};\n/\n")
+
+
+def write_ddl(extracted_dir: Path, counts: Dict[str, int], rng: random.Random):
+    """Escribe types, sequences, tables, constraints, views, mviews, triggers y jobs."""
+    tables = [object_name("TBL", i, rng) for i in range(counts["TABLE"])]
+
+    with open(extracted_dir / "types.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["TYPE"]):
+            f.write(
+                f"CREATE OR REPLACE TYPE {object_name('TY', i, rng)} AS OBJECT (\n"
+                "  id NUMBER,\n  name VARCHAR2(100)\n)\n/\n\n"
+            )
+
+    with open(extracted_dir / "sequences.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["SEQUENCE"]):
+            f.write(
+                f"  CREATE SEQUENCE {object_name('SEQ', i, rng)} "
+                "MINVALUE 1 INCREMENT BY 1 START WITH 1 CACHE 20;\n\n"
+            )
+
+    with open(extracted_dir / "tables.sql", "w", encoding="utf-8") as f:
+        for table in tables:
+            f.write(
+                f"  CREATE TABLE {table}\n"
+                '   (\t"ID" NUMBER NOT NULL ENABLE,\n'
+                '\t"NAME" VARCHAR2(100),\n'
+                '\t"CREATED_AT" DATE DEFAULT SYSDATE\n'
+                "   ) SEGMENT CREATION IMMEDIATE;\n\n"
+            )
+
+    with open(extracted_dir / "primary_keys.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["PRIMARY_KEY"]):
+            table = tables[i % len(tables)]
+            f.write(
+                f'  ALTER TABLE {table} ADD CONSTRAINT "PK_{i:06d}" '
+                'PRIMARY KEY ("ID")\n  USING INDEX ENABLE;\n\n'
+            )
+
+    with open(extracted_dir / "foreign_keys.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["FOREIGN_KEY"]):
+            table = tables[i % len(tables)]
+            parent = tables[rng.randrange(len(tables))]
+            f.write(
+                f'  ALTER TABLE {table} ADD CONSTRAINT "FK_{i:06d}" FOREIGN KEY ("ID")\n'
+                f'\t  REFERENCES {parent} ("ID") ENABLE;\n\n'
+            )
+
+    with open(extracted_dir / "views.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["VIEW"]):
+            table = tables[i % len(tables)]
+            f.write(
+                f"  CREATE OR REPLACE FORCE VIEW {object_name('VW', i, rng)} (\"ID\", \"NAME\") AS\n"
+                f"  SELECT id, name FROM {table} WHERE name <> 'END;';\n\n"
+            )
+
+    with open(extracted_dir / "materialized_views.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["MVIEW"]):
+            table = tables[i % len(tables)]
+            f.write(
+                f"  CREATE MATERIALIZED VIEW {object_name('MV', i, rng)}\n"
+                f"  REFRESH COMPLETE ON DEMAND AS SELECT id FROM {table};\n\n"
+            )
+
+    with open(extracted_dir / "triggers.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["TRIGGER"]):
+            name = object_name("TRG", i, rng)
+            table = tables[i % len(tables)]
+            f.write(
+                f"TRIGGER {name}\n"
+                f"BEFORE INSERT ON {table} FOR EACH ROW\n"
+                "BEGIN\n"
+                "  IF :new.id IS NULL THEN\n"
+                "    SELECT NVL(MAX(id), 0) + 1 INTO :new.id FROM dual;\n"
+                "  END IF;\n"
+                f"END {bare_name(name)};\n/\n"
+            )
+
+    with open(extracted_dir / "jobs.sql", "w", encoding="utf-8") as f:
+        for i in range(counts["JOB"]):
+            f.write(
+                f"-- JOB: JOB_{i:06d}\n-- Tipo: PLSQL_BLOCK\n-- Estado: ENABLED\n"
+                "BEGIN\n"
+                f"dbms_scheduler.create_job('\"JOB_{i:06d}\"',\n"
+                "job_type=>'PLSQL_BLOCK', job_action=>'BEGIN NULL; END;',\n"
+                "enabled=>TRUE);\n"
+                "END;\n/\n\n"
+            )
+
+
+def generate_corpus(
+    base_dir: Path, total_objects: int, package_size: int, seed: int
+) -> Dict[str, int]:
+    """
+    Genera sql/extracted/ en base_dir.
+
+    Returns:
+        Cantidad de objetos top-level generados por tipo
+    """
+    rng = random.Random(seed)
+    extracted_dir = base_dir / "sql" / "extracted"
+    extracted_dir.mkdir(parents=True, exist_ok=True)
+
+    counts = plan_counts(total_objects, package_size)
+
+    write_ddl(extracted_dir, counts, rng)
+    write_standalone(
+        extracted_dir / "functions.sql", "FUNCTION", "FN", counts["FUNCTION"], rng
+    )
+    write_standalone(
+        extracted_dir / "procedures.sql", "PROCEDURE", "PR", counts["PROCEDURE"], rng
+    )
+    write_packages(
+        extracted_dir / "packages_spec.sql",
+        extracted_dir / "packages_body.sql",
+        counts["PACKAGE_BODY"],
+        package_size,
+        rng,
+    )
+    (extracted_dir / "directories.sql").write_text("", encoding="utf-8")
+
+    return counts
+
+
+def generate_knowledge(base_dir: Path, batch_size: int, seed: int) -> int:
+    """
+    Genera outputs de plsql-analyzer (knowledge/json/batch_XXX/) desde el manifest.
+
+    Cada objeto ejecutable recibe dependencies.executable_objects con nombres de
+    objetos anteriores en el manifest (grafo mayormente acíclico), ~1% de
+    dependencias hacia objetos cercanos posteriores (ciclos pequeños) y algunas
+    dependencias externas.
+
+    Returns:
+        Cantidad de archivos JSON generados
+    """
+    rng = random.Random(seed)
+    base_dir = base_dir.resolve()
+
+    # manifest_store usa Path.cwd() al importarse: funciona con cualquier layout
+    # (el índice tiene id/nombre/tipo/categoría, suficiente aquí)
+    os.chdir(base_dir)
+    from manifest_store import load_manifest_index
+
+    manifest = load_manifest_index()
+
+    executables = [
+        obj
+        for obj in manifest["objects"]
+        if obj.get("category") in ("EXECUTABLE", "REFERENCE_AND_EXECUTABLE")
+    ]
+    names = [obj["object_name"] for obj in executables]
+
+    written = 0
+    for index, obj in enumerate(executables):
+        batch_dir = (
+            base_dir / "knowledge" / "json" / f"batch_{index // batch_size + 1:03d}"
+        )
+        batch_dir.mkdir(parents=True, exist_ok=True)
+
+        dependencies: List[str] = []
+        if index > 0:
+            dependencies = [
+                names[rng.randrange(max(0, index - 500), index)]
+                for _ in range(rng.randint(0, 4))
+            ]
+        if rng.random() < 0.01 and index + 1 < len(names):
+            forward_end = min(len(names), index + 20)
+            dependencies.append(names[rng.randrange(index + 1, forward_end)])
+        if rng.random() < 0.1:
+            dependencies.append(rng.choice(EXTERNAL_DEPENDENCIES))
+
+        output = {
+            "object_id": obj["object_id"],
+            "object_name": obj["object_name"],
+            "object_type": obj["object_type"],
+            "source_file": obj.get("source_file"),
+            "line_range": [obj.get("line_start"), obj.get("line_end")],
+            "classification": {
+                "complexity": "COMPLEX" if rng.random() < 0.3 else "SIMPLE",
+                "confidence": "HIGH",
+                "migration_strategy": "ora2pg",
+            },
+            "dependencies": {
+                "executable_objects": sorted(set(dependencies)),
+                "tables": [],
+                "types": [],
+                "views": [],
+                "sequences": [],
+                "directories": [],
+            },
+        }
+
+        safe_name = obj["object_name"].replace(".", "_").replace('"', "")
+        output_file = batch_dir / f"{obj['object_id']}_{safe_name}.json"
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        written += 1
+
+    return written
+
+
+def get_option(name: str, default: int) -> int:
+    """Lee una opción numérica --nombre N de sys.argv."""
+    if name in sys.argv:
+        return int(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+
+def main():
+    """Función principal"""
+    if len(sys.argv) < 2 or sys.argv[1].startswith("--"):
+        print("❌ Error: Falta el directorio de salida")
+        print("\nUso:")
+        print(
+            "  python scripts/generate_synthetic_corpus.py /tmp/corpus --objects 10000"
+        )
+        sys.exit(1)
+
+    base_dir = Path(sys.argv[1])
+    seed = get_option("--seed", 42)
+
+    if "--knowledge" in sys.argv:
+        batch_size = get_option("--batch-size", 200)
+        written = generate_knowledge(base_dir, batch_size, seed)
+        print(f"✅ {written} outputs generados en {base_dir / 'knowledge' / 'json'}")
+        return
+
+    total_objects = get_option("--objects", 1000)
+    package_size = get_option("--package-size", 100)
+    counts = generate_corpus(base_dir, total_objects, package_size, seed)
+
+    print(f"✅ Corpus generado en {base_dir / 'sql' / 'extracted'}")
+    for object_type, count in counts.items():
+        print(f"   {object_type:15s} {count:>8,}")
+    print(f"   Objetos internos de packages: {counts['PACKAGE_BODY'] * package_size:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Análisis de impacto transitivo sobre dependency_graph.json (bitsets).
+
+PROPÓSITO:
+    Cuando un objeto convertido cambia después de compilar hay que recompilar y
+    volver a probar (shadow tests) todo lo que depende de él, directa o
+    indirectamente. Recorrer depended_by a mano en dependency_graph.json no
+    escala. Este módulo precalcula la alcanzabilidad de todo el grafo una vez y
+    responde cada consulta con operaciones sobre enteros de Python usados como
+    bitsets.
+
+PRECÁLCULO:
+    - SCCs con Tarjan (build_dependency_graph.find_strongly_connected_components):
+      salen en orden de dependencias y cada objeto recibe su posición en ese
+      orden topológico
+    - dependencies[i]: bitset de todo lo que el objeto i necesita (transitivo),
+      una pasada en orden topológico: OR de las dependencias directas y de sus
+      bitsets. Los objetos de un ciclo comparten bitset (se incluyen entre sí)
+    - dependents[i]: lo mismo en orden inverso sobre depended_by. Usa bits
+      invertidos (n - 1 - posición): los enteros quedan del tamaño de la parte
+      del grafo que cubren, no del grafo completo
+
+CONSULTAS (API y CLI):
+    dependents        Todo lo que hay que recompilar si cambian los objetos dados
+    dependencies      Todo lo que los objetos dados necesitan compilado antes
+    common-ancestors  Dependencias transitivas compartidas por todos los objetos
+    compilable        Objetos que quedan listos para compilar al terminar los
+                      dados (todas sus dependencias fuera de su ciclo terminadas)
+
+    Los resultados salen en orden topológico (orden de recompilación) y no
+    incluyen los objetos consultados.
+
+USO (desde otros scripts):
+    from impact_analysis import build_impact_index, load_dependency_graph
+    from impact_analysis import transitive_dependents
+
+    index = build_impact_index(load_dependency_graph())
+    transitive_dependents(index, ["obj_0123"])
+
+USO (línea de comandos):
+    python scripts/impact_analysis.py dependents obj_0123 [obj_0124 ...]
+    python scripts/impact_analysis.py dependencies PKG_VENTAS.CALCULAR_TOTAL
+    python scripts/impact_analysis.py common-ancestors obj_0123 obj_0456
+    python scripts/impact_analysis.py compilable obj_0001 obj_0002 [--json]
+
+    Los objetos se indican por object_id u object_name.
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene dependency_graph.json
+"""
+
+import json
+import sys
+import time
+from typing import Dict, Iterable, List
+
+from build_dependency_graph import (
+    DEPENDENCY_GRAPH_FILE,
+    find_strongly_connected_components,
+)
+
+QUERIES = ("dependents", "dependencies", "common-ancestors", "compilable")
+
+
+def load_dependency_graph() -> Dict[str, Dict]:
+    """Nodos de dependency_graph.json (object_id → object_name, depends_on, ...)."""
+    with open(DEPENDENCY_GRAPH_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)["graph"]
+
+
+def bits_to_positions(bits: int) -> List[int]:
+    """Posiciones de los bits en 1, de menor a mayor."""
+    return [
+        position for position, bit in enumerate(reversed(bin(bits)[2:])) if bit == "1"
+    ]
+
+
+def build_impact_index(graph: Dict[str, Dict]) -> Dict:
+    """
+    Precalcula dependencias y dependientes transitivos de cada objeto.
+
+    Args:
+        graph: Nodos de dependency_graph.json
+
+    Returns:
+        Dict con order (object_ids en orden topológico), position, names,
+        component (posición → id de SCC), component_range (id de SCC →
+        posiciones [start, end)), dependencies/dependents (bitsets por
+        posición), direct (bitset de dependencias directas fuera del ciclo) y
+        depended_by
+    """
+    nodes = list(graph)
+    adj_list = {node: graph[node]["depends_on"] for node in nodes}
+    components = find_strongly_connected_components(nodes, adj_list)
+
+    order = [node for component in components for node in component]
+    position = {node: i for i, node in enumerate(order)}
+    total = len(order)
+    # Los miembros de cada SCC quedan contiguos: [start, end) en el orden
+    component = [0] * total
+    component_range = []
+    for component_id, members in enumerate(components):
+        start = position[members[0]]
+        component_range.append((start, start + len(members)))
+        for node in members:
+            component[position[node]] = component_id
+
+    def cyclic(members: List[str]) -> bool:
+        return len(members) > 1 or members[0] in adj_list[members[0]]
+
+    # Dependencias transitivas: componentes en orden de dependencias
+    dependencies = [0] * total
+    direct = [0] * total
+    for component_id, members in enumerate(components):
+        bits = 0
+        for node in members:
+            node_direct = 0
+            for dep in adj_list[node]:
+                dep_position = position.get(dep)
+                if dep_position is None or component[dep_position] == component_id:
+                    continue
+                node_direct |= 1 << dep_position
+                bits |= dependencies[dep_position]
+            direct[position[node]] = node_direct
+            bits |= node_direct
+        if cyclic(members):
+            for node in members:
+                bits |= 1 << position[node]
+        for node in members:
+            dependencies[position[node]] = bits
+
+    # Dependientes transitivos: orden inverso, bits invertidos (total - 1 - posición)
+    reverse_adj = {node: [] for node in nodes}
+    for node in nodes:
+        for dep in adj_list[node]:
+            if dep in reverse_adj:
+                reverse_adj[dep].append(node)
+
+    dependents = [0] * total
+    for component_id in range(len(components) - 1, -1, -1):
+        members = components[component_id]
+        bits = 0
+        for node in members:
+            for dependent in reverse_adj[node]:
+                dependent_position = position[dependent]
+                if component[dependent_position] == component_id:
+                    continue
+                bits |= (1 << (total - 1 - dependent_position)) | dependents[
+                    dependent_position
+                ]
+        if cyclic(members):
+            for node in members:
+                bits |= 1 << (total - 1 - position[node])
+        for node in members:
+            dependents[position[node]] = bits
+
+    return {
+        "order": order,
+        "position": position,
+        "names": {graph[node]["object_name"].upper(): node for node in nodes},
+        "component": component,
+        "component_range": component_range,
+        "dependencies": dependencies,
+        "dependents": dependents,
+        "direct": direct,
+        "depended_by": reverse_adj,
+    }
+
+
+def resolve_objects(index: Dict, objects: Iterable[str]) -> List[str]:
+    """
+    object_ids de una lista de object_ids u object_names.
+
+    Raises:
+        KeyError: Si alguno no está en el grafo
+    """
+    object_ids = []
+    for obj in objects:
+        if obj in index["position"]:
+            object_ids.append(obj)
+        elif obj.upper() in index["names"]:
+            object_ids.append(index["names"][obj.upper()])
+        else:
+            raise KeyError(obj)
+    return object_ids
+
+
+def positions_mask(index: Dict, object_ids: Iterable[str]) -> int:
+    """Bitset (posiciones topológicas) de los objetos."""
+    mask = 0
+    for object_id in object_ids:
+        mask |= 1 << index["position"][object_id]
+    return mask
+
+
+def mask_to_objects(index: Dict, bits: int, exclude: int = 0) -> List[str]:
+    """object_ids de un bitset en orden topológico, sin los bits de exclude."""
+    order = index["order"]
+    return [order[position] for position in bits_to_positions(bits & ~exclude)]
+
+
+def transitive_dependents(index: Dict, object_ids: Iterable[str]) -> List[str]:
+    """Todo lo que depende (directa o indirectamente) de algún objeto dado."""
+    object_ids = list(object_ids)
+    total = len(index["order"])
+    reversed_bits = 0
+    for object_id in object_ids:
+        reversed_bits |= index["dependents"][index["position"][object_id]]
+
+    # Volver de bits invertidos a posiciones topológicas (invertir el binario)
+    bits = int(bin(reversed_bits)[2:].zfill(total)[::-1], 2)
+    return mask_to_objects(index, bits, positions_mask(index, object_ids))
+
+
+def transitive_dependencies(index: Dict, object_ids: Iterable[str]) -> List[str]:
+    """Todo lo que algún objeto dado necesita (directa o indirectamente)."""
+    object_ids = list(object_ids)
+    bits = 0
+    for object_id in object_ids:
+        bits |= index["dependencies"][index["position"][object_id]]
+    return mask_to_objects(index, bits, positions_mask(index, object_ids))
+
+
+def common_ancestors(index: Dict, object_ids: Iterable[str]) -> List[str]:
+    """Dependencias transitivas compartidas por todos los objetos dados."""
+    object_ids = list(object_ids)
+    if not object_ids:
+        return []
+    bits = -1
+    for object_id in object_ids:
+        bits &= index["dependencies"][index["position"][object_id]]
+    return mask_to_objects(index, bits, positions_mask(index, object_ids))
+
+
+def newly_compilable(index: Dict, done_ids: Iterable[str]) -> List[str]:
+    """
+    Objetos que quedan listos para compilar cuando los objetos dados terminan.
+
+    Un objeto está listo cuando terminaron todas sus dependencias directas fuera
+    de su ciclo; un ciclo queda listo entero (se compila con forward
+    declarations). Solo se revisan los dependientes directos de done_ids.
+    """
+    done_ids = list(done_ids)
+    position = index["position"]
+    component = index["component"]
+    done = positions_mask(index, done_ids)
+
+    # Dependientes directos de lo terminado, agrupados por ciclo (SCC)
+    candidates = set()
+    for object_id in done_ids:
+        for dependent in index["depended_by"][object_id]:
+            dependent_position = position[dependent]
+            if not done >> dependent_position & 1:
+                candidates.add(component[dependent_position])
+
+    ready = 0
+    for component_id in candidates:
+        start, end = index["component_range"][component_id]
+        needed = 0
+        for object_position in range(start, end):
+            needed |= index["direct"][object_position]
+        if needed & ~done == 0:
+            ready |= ((1 << (end - start)) - 1) << start
+    return mask_to_objects(index, ready, done)
+
+
+def run_query(index: Dict, query: str, object_ids: List[str]) -> List[str]:
+    """Ejecuta una de las QUERIES."""
+    if query == "dependents":
+        return transitive_dependents(index, object_ids)
+    if query == "dependencies":
+        return transitive_dependencies(index, object_ids)
+    if query == "common-ancestors":
+        return common_ancestors(index, object_ids)
+    return newly_compilable(index, object_ids)
+
+
+def main():
+    """Función principal"""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    as_json = "--json" in sys.argv
+
+    if len(args) < 2 or args[0] not in QUERIES:
+        print(
+            f"Uso: python scripts/impact_analysis.py {{{'|'.join(QUERIES)}}} OBJETO..."
+        )
+        print("     [--json]  (OBJETO: object_id u object_name)")
+        sys.exit(1)
+
+    if not DEPENDENCY_GRAPH_FILE.exists():
+        print(f"❌ Error: {DEPENDENCY_GRAPH_FILE} no existe")
+        print("   Ejecuta primero: python scripts/build_dependency_graph.py")
+        sys.exit(1)
+
+    query = args[0]
+    graph = load_dependency_graph()
+
+    started = time.perf_counter()
+    index = build_impact_index(graph)
+    index_seconds = time.perf_counter() - started
+
+    try:
+        object_ids = resolve_objects(index, args[1:])
+    except KeyError as e:
+        print(f"❌ Error: {e.args[0]} no está en dependency_graph.json")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    result = run_query(index, query, object_ids)
+    query_seconds = time.perf_counter() - started
+
+    if as_json:
+        print(json.dumps({"query": query, "objects": object_ids, "result": result}))
+        return
+
+    print(f"🔎 {query}: {', '.join(object_ids)}\n")
+    for object_id in result:
+        print(f"   {object_id}  {graph[object_id]['object_name']}")
+    print(f"\n📊 {len(result)} objetos")
+    print(
+        f"⏱️  Índice: {index_seconds * 1000:.0f} ms "
+        f"({len(graph)} objetos), consulta: {query_seconds * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
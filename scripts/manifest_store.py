@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""
+Lectura y escritura del manifest (monolítico, sharded o SQLite).
+
+LAYOUTS:
+    Monolítico (default):
+        sql/extracted/manifest.json            ← metadata + todos los objetos
+
+    Sharded (prepare_migration.py --sharded):
+        sql/extracted/manifest/index.json      ← metadata + índice liviano (una línea
+                                                 por objeto: id, nombre, tipo, status,
+                                                 orden y shard)
+        sql/extracted/manifest/shards/*.json   ← objetos completos
+            package_obj_NNNN.json  → PACKAGE_BODY + sus procedures/functions internos
+                                     (incluye spec_declarations)
+            objects_NNN.json       → resto de objetos, SHARD_SIZE por shard en orden
+                                     de procesamiento (≈ un batch de update_progress)
+
+    Los lectores cargan solo el índice o los shards que necesitan, y los escritores
+    reescriben solo los shards modificados (más el índice).
+
+    SQLite (prepare_migration.py --sqlite):
+        sql/extracted/manifest.db              ← tabla objects (una fila por objeto:
+                                                 columnas indexadas + JSON completo)
+                                                 y tabla metadata
+
+    Las actualizaciones de status tocan solo las filas modificadas y las consultas
+    por status/tipo/package/nivel usan índices (sin parsear todo el manifest).
+    "export" genera un manifest.json compatible (snapshot; la base sigue siendo
+    la fuente de verdad).
+
+USO (desde los otros scripts):
+    from manifest_store import load_manifest_index, update_manifest_objects
+
+    index = load_manifest_index()          # "objects" = entradas livianas
+    update_manifest_objects({"obj_0001": {"status": "processed"}})
+
+USO (línea de comandos):
+    python scripts/manifest_store.py status              # Conteo por status/tipo
+                                                         # (con el journal aplicado)
+    python scripts/manifest_store.py export [ARCHIVO]    # Exportar a manifest.json
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene sql/extracted/
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Directorio base del proyecto (usa CWD para compatibilidad con --plugin-dir)
+BASE_DIR = Path.cwd()
+EXTRACTED_DIR = BASE_DIR / "sql" / "extracted"
+MANIFEST_FILE = EXTRACTED_DIR / "manifest.json"
+MANIFEST_DIR = EXTRACTED_DIR / "manifest"
+MANIFEST_INDEX_FILE = MANIFEST_DIR / "index.json"
+SHARDS_DIR = MANIFEST_DIR / "shards"
+MANIFEST_DB_FILE = EXTRACTED_DIR / "manifest.db"
+
+# Layouts soportados (ver save_manifest)
+LAYOUT_MONOLITHIC = "monolithic"
+LAYOUT_SHARDED = "sharded"
+LAYOUT_SQLITE = "sqlite"
+
+SHARD_SIZE = 200  # Objetos por shard objects_NNN (mismo tamaño que un batch)
+
+# Campos de cada objeto que se copian al índice
+INDEX_FIELDS = (
+    "object_id",
+    "object_name",
+    "object_type",
+    "category",
+    "status",
+    "code_length",
+    "processing_order",
+    "migration_order",
+    "dependency_level",
+    "parent_package",
+    "parent_package_id",
+    "batch_id",
+)
+
+# Columnas indexadas de la tabla objects (object_id es la PRIMARY KEY)
+DB_INDEXED_COLUMNS = (
+    "object_name",
+    "object_type",
+    "status",
+    "parent_package_id",
+    "dependency_level",
+)
+# Filas por sentencia en consultas WHERE object_id IN (...)
+DB_QUERY_CHUNK = 500
+
+
+def manifest_layout() -> Optional[str]:
+    """
+    Layout del manifest actual (None si no existe).
+
+    Si hay más de uno (p. ej. manifest.db + un manifest.json exportado), la base
+    SQLite tiene prioridad, luego el layout sharded.
+    """
+    if MANIFEST_DB_FILE.exists():
+        return LAYOUT_SQLITE
+    if MANIFEST_INDEX_FILE.exists():
+        return LAYOUT_SHARDED
+    if MANIFEST_FILE.exists():
+        return LAYOUT_MONOLITHIC
+    return None
+
+
+def manifest_exists() -> bool:
+    """True si existe el manifest en cualquiera de los layouts."""
+    return manifest_layout() is not None
+
+
+def is_sharded() -> bool:
+    """True si el manifest está en layout sharded (manifest/index.json)."""
+    return manifest_layout() == LAYOUT_SHARDED
+
+
+def manifest_location() -> Path:
+    """Archivo principal del manifest actual (para mensajes)."""
+    return {
+        LAYOUT_SQLITE: MANIFEST_DB_FILE,
+        LAYOUT_SHARDED: MANIFEST_INDEX_FILE,
+    }.get(manifest_layout(), MANIFEST_FILE)
+
+
+def index_entry(obj: Dict, shard: str) -> Dict:
+    """Entrada del índice para un objeto completo."""
+    entry = {field: obj[field] for field in INDEX_FIELDS if field in obj}
+    entry["shard"] = shard
+    return entry
+
+
+def assign_shards(objects: List[Dict], shard_size: int = SHARD_SIZE) -> List[str]:
+    """
+    Asigna un shard a cada objeto (en el mismo orden que objects).
+
+    Un PACKAGE_BODY abre un shard propio que incluye los objetos internos que le
+    siguen (parent_package == nombre del package). El resto se agrupa en shards
+    objects_NNN de shard_size objetos en orden de procesamiento.
+    """
+    shards = []
+    package_shard = None
+    package_name = None
+    loose_count = 0
+
+    for obj in objects:
+        if obj["object_type"] == "PACKAGE_BODY":
+            package_shard = f"package_{obj['object_id']}"
+            package_name = obj["object_name"]
+            shards.append(package_shard)
+        elif package_shard and obj.get("parent_package") == package_name:
+            shards.append(package_shard)
+        else:
+            package_shard = None
+            shards.append(f"objects_{loose_count // shard_size + 1:03d}")
+            loose_count += 1
+
+    return shards
+
+
+def shard_file(shard: str) -> Path:
+    """Ruta del archivo de un shard."""
+    return SHARDS_DIR / f"{shard}.json"
+
+
+@contextmanager
+def atomic_write(path: Path):
+    """
+    Abre un temporal junto a path y lo renombra sobre path al terminar.
+
+    os.replace es atómico: un corte a mitad de escritura deja el archivo anterior
+    intacto (nunca un JSON truncado).
+    """
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def write_json_atomic(path: Path, data):
+    """Escribe data como JSON indentado con atomic_write."""
+    with atomic_write(path) as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def write_shard(shard: str, objects: List[Dict]):
+    """Escribe un shard completo."""
+    write_json_atomic(shard_file(shard), {"shard": shard, "objects": objects})
+
+
+def write_index(index: Dict):
+    """
+    Escribe index.json con la metadata indentada y un objeto por línea.
+
+    Una línea por objeto permite buscar un object_id con grep o leer el índice
+    por rangos de líneas sin cargar el JSON completo.
+    """
+    metadata = {key: value for key, value in index.items() if key != "objects"}
+    header = json.dumps(metadata, indent=2, ensure_ascii=False)
+    entries = ",\n".join(
+        f"    {json.dumps(entry, ensure_ascii=False)}" for entry in index["objects"]
+    )
+
+    with atomic_write(MANIFEST_INDEX_FILE) as f:
+        f.write(header[:-2])
+        f.write(',\n  "objects": [\n' if metadata else '{\n  "objects": [\n')
+        f.write(entries)
+        f.write("\n  ]\n}\n")
+
+
+def remove_other_layouts(layout: str):
+    """Elimina los archivos de los layouts distintos de layout."""
+    if layout != LAYOUT_MONOLITHIC and MANIFEST_FILE.exists():
+        MANIFEST_FILE.unlink()
+    if layout != LAYOUT_SHARDED and MANIFEST_DIR.exists():
+        shutil.rmtree(MANIFEST_DIR)
+    if layout != LAYOUT_SQLITE and MANIFEST_DB_FILE.exists():
+        MANIFEST_DB_FILE.unlink()
+
+
+def save_manifest(
+    manifest: Dict, layout: str = LAYOUT_MONOLITHIC, shard_size: int = SHARD_SIZE
+) -> Path:
+    """
+    Guarda el manifest completo en el layout indicado.
+
+    Al cambiar de layout se elimina el anterior (manifest.json, manifest/ o
+    manifest.db) para que los lectores nunca vean una versión desactualizada.
+
+    Returns:
+        Archivo principal escrito (manifest.json, manifest/index.json o manifest.db)
+    """
+    if layout == LAYOUT_SQLITE:
+        write_manifest_db(manifest)
+        remove_other_layouts(layout)
+        return MANIFEST_DB_FILE
+
+    if layout == LAYOUT_MONOLITHIC:
+        write_json_atomic(MANIFEST_FILE, manifest)
+        remove_other_layouts(layout)
+        return MANIFEST_FILE
+
+    objects = manifest["objects"]
+    shards = assign_shards(objects, shard_size)
+
+    shard_objects = {}
+    for obj, shard in zip(objects, shards):
+        shard_objects.setdefault(shard, []).append(obj)
+
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    for old_file in SHARDS_DIR.glob("*.json"):
+        if old_file.stem not in shard_objects:
+            old_file.unlink()
+    for shard, objects_in_shard in shard_objects.items():
+        write_shard(shard, objects_in_shard)
+
+    index = {key: value for key, value in manifest.items() if key != "objects"}
+    index["layout"] = "sharded"
+    index["shard_size"] = shard_size
+    index["shards"] = {
+        shard: {
+            "file": str(shard_file(shard).relative_to(MANIFEST_DIR)),
+            "objects": len(objects_in_shard),
+        }
+        for shard, objects_in_shard in shard_objects.items()
+    }
+    index["objects"] = [index_entry(obj, shard) for obj, shard in zip(objects, shards)]
+    write_index(index)
+
+    remove_other_layouts(layout)
+    return MANIFEST_INDEX_FILE
+
+
+def load_manifest_index() -> Dict:
+    """
+    Carga el índice del manifest.
+
+    En layout sharded retorna index.json (objects = entradas livianas con shard).
+    En layout SQLite retorna la metadata + las columnas indexadas de cada fila
+    (sin parsear el JSON de los objetos). En layout monolítico retorna
+    manifest.json completo: sus objetos tienen todos los campos del índice, así
+    que el código que solo usa esos campos funciona igual con los tres layouts.
+    """
+    if manifest_layout() == LAYOUT_SQLITE:
+        return load_manifest_db_index()
+
+    path = manifest_location()
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_shard(shard: str) -> List[Dict]:
+    """Carga los objetos completos de un shard."""
+    with open(shard_file(shard), "r", encoding="utf-8") as f:
+        return json.load(f)["objects"]
+
+
+def load_manifest() -> Dict:
+    """Carga el manifest completo (en layout sharded une todos los shards)."""
+    layout = manifest_layout()
+    if layout == LAYOUT_SQLITE:
+        return load_manifest_db()
+
+    index = load_manifest_index()
+    if layout != LAYOUT_SHARDED:
+        return index
+
+    manifest = {
+        key: value
+        for key, value in index.items()
+        if key not in ("layout", "shard_size", "shards", "objects")
+    }
+    shard_objects = {shard: iter(load_shard(shard)) for shard in index["shards"]}
+    manifest["objects"] = [
+        next(shard_objects[entry["shard"]]) for entry in index["objects"]
+    ]
+    return manifest
+
+
+def load_objects(object_ids: Iterable[str]) -> List[Dict]:
+    """
+    Carga los objetos completos de object_ids (en orden de procesamiento).
+
+    En layout sharded lee solo los shards que contienen esos objetos; en layout
+    SQLite solo las filas de esos objetos.
+    """
+    wanted = set(object_ids)
+    layout = manifest_layout()
+    if layout == LAYOUT_SQLITE:
+        return load_db_objects(wanted)
+    if layout != LAYOUT_SHARDED:
+        return [obj for obj in load_manifest()["objects"] if obj["object_id"] in wanted]
+
+    index = load_manifest_index()
+    shards = {
+        entry["shard"] for entry in index["objects"] if entry["object_id"] in wanted
+    }
+
+    found = {}
+    for shard in shards:
+        for obj in load_shard(shard):
+            if obj["object_id"] in wanted:
+                found[obj["object_id"]] = obj
+
+    return [
+        found[entry["object_id"]]
+        for entry in index["objects"]
+        if entry["object_id"] in found
+    ]
+
+
+def update_manifest_objects(
+    updates: Dict[str, Dict], metadata: Optional[Dict] = None
+) -> int:
+    """
+    Aplica cambios de campos a objetos del manifest y los guarda.
+
+    Args:
+        updates: {object_id: {campo: valor}}
+        metadata: Campos top-level del manifest a actualizar (opcional)
+
+    Returns:
+        Cantidad de escrituras: shards + índice (sharded), 1 (monolítico) o filas
+        actualizadas (SQLite)
+    """
+    layout = manifest_layout()
+    if layout == LAYOUT_SQLITE:
+        return update_db_objects(updates, metadata)
+
+    if layout != LAYOUT_SHARDED:
+        manifest = load_manifest()
+        for obj in manifest["objects"]:
+            if obj["object_id"] in updates:
+                obj.update(updates[obj["object_id"]])
+        manifest.update(metadata or {})
+        save_manifest(manifest, LAYOUT_MONOLITHIC)
+        return 1
+
+    index = load_manifest_index()
+    touched_shards = set()
+    for entry in index["objects"]:
+        changes = updates.get(entry["object_id"])
+        if changes:
+            touched_shards.add(entry["shard"])
+            entry.update(
+                {
+                    field: value
+                    for field, value in changes.items()
+                    if field in INDEX_FIELDS
+                }
+            )
+
+    for shard in touched_shards:
+        objects = load_shard(shard)
+        for obj in objects:
+            if obj["object_id"] in updates:
+                obj.update(updates[obj["object_id"]])
+        write_shard(shard, objects)
+
+    index.update(metadata or {})
+    write_index(index)
+    return len(touched_shards) + 1
+
+
+# ===== LAYOUT SQLITE =====
+
+
+@contextmanager
+def manifest_db(path: Path = MANIFEST_DB_FILE):
+    """Conexión a manifest.db; hace commit al salir (rollback si hay excepción)."""
+    db = sqlite3.connect(path)
+    try:
+        with db:
+            yield db
+    finally:
+        db.close()
+
+
+def db_row(obj: Dict, fields: Iterable[str] = INDEX_FIELDS) -> tuple:
+    """Valores de una fila de objects: columnas de fields + JSON completo."""
+    return tuple(obj.get(field) for field in fields) + (
+        json.dumps(obj, ensure_ascii=False),
+    )
+
+
+def db_index_fields(db: sqlite3.Connection) -> List[str]:
+    """
+    Campos de INDEX_FIELDS que existen como columna en objects.
+
+    Una base creada por una versión anterior puede no tener las columnas
+    agregadas después (p. ej. batch_id): esos campos quedan solo en el JSON.
+    """
+    columns = {row[1] for row in db.execute("PRAGMA table_info(objects)")}
+    return [field for field in INDEX_FIELDS if field in columns]
+
+
+def write_manifest_db(manifest: Dict):
+    """
+    Crea manifest.db desde cero con el manifest completo.
+
+    Se escribe en un archivo temporal que reemplaza al anterior al terminar, así
+    los lectores nunca ven una base a medio escribir.
+    """
+    temp_file = MANIFEST_DB_FILE.with_suffix(".db.tmp")
+    if temp_file.exists():
+        temp_file.unlink()
+
+    columns = ", ".join(
+        f"{field} TEXT PRIMARY KEY" if field == "object_id" else field
+        for field in INDEX_FIELDS
+    )
+    placeholders = ", ".join("?" for _ in range(len(INDEX_FIELDS) + 1))
+
+    with manifest_db(temp_file) as db:
+        db.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+        db.execute(f"CREATE TABLE objects ({columns}, data TEXT NOT NULL)")
+        for column in DB_INDEXED_COLUMNS:
+            db.execute(f"CREATE INDEX idx_objects_{column} ON objects ({column})")
+
+        db.executemany(
+            "INSERT INTO metadata (key, value) VALUES (?, ?)",
+            [
+                (key, json.dumps(value, ensure_ascii=False))
+                for key, value in manifest.items()
+                if key != "objects"
+            ],
+        )
+        db.executemany(
+            f"INSERT INTO objects VALUES ({placeholders})",
+            (db_row(obj) for obj in manifest["objects"]),
+        )
+
+    temp_file.replace(MANIFEST_DB_FILE)
+
+
+def load_db_metadata(db: sqlite3.Connection) -> Dict:
+    """Campos top-level del manifest (en el orden original)."""
+    return {
+        key: json.loads(value)
+        for key, value in db.execute("SELECT key, value FROM metadata ORDER BY rowid")
+    }
+
+
+def load_manifest_db_index() -> Dict:
+    """Metadata + columnas indexadas de cada objeto (en orden de procesamiento)."""
+    with manifest_db() as db:
+        index = load_db_metadata(db)
+        index["layout"] = LAYOUT_SQLITE
+        fields = db_index_fields(db)
+        rows = db.execute(f"SELECT {', '.join(fields)} FROM objects ORDER BY rowid")
+        index["objects"] = [
+            {field: value for field, value in zip(fields, row) if value is not None}
+            for row in rows
+        ]
+    return index
+
+
+def load_manifest_db() -> Dict:
+    """Manifest completo desde manifest.db (mismo formato que manifest.json)."""
+    with manifest_db() as db:
+        manifest = load_db_metadata(db)
+        manifest["objects"] = [
+            json.loads(data)
+            for (data,) in db.execute("SELECT data FROM objects ORDER BY rowid")
+        ]
+    return manifest
+
+
+def select_db_objects(db: sqlite3.Connection, object_ids: List[str]) -> List[tuple]:
+    """Filas (rowid, object_id, data) de object_ids, en bloques de DB_QUERY_CHUNK."""
+    rows = []
+    for start in range(0, len(object_ids), DB_QUERY_CHUNK):
+        chunk = object_ids[start : start + DB_QUERY_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows.extend(
+            db.execute(
+                "SELECT rowid, object_id, data FROM objects "
+                f"WHERE object_id IN ({placeholders})",
+                chunk,
+            )
+        )
+    return rows
+
+
+def load_db_objects(object_ids: Iterable[str]) -> List[Dict]:
+    """Objetos completos de object_ids (en orden de procesamiento)."""
+    with manifest_db() as db:
+        rows = select_db_objects(db, list(object_ids))
+    return [json.loads(data) for _, _, data in sorted(rows)]
+
+
+def update_db_objects(updates: Dict[str, Dict], metadata: Optional[Dict] = None) -> int:
+    """
+    Aplica updates a las filas de manifest.db (solo las filas modificadas).
+
+    Returns:
+        Cantidad de filas actualizadas
+    """
+    with manifest_db() as db:
+        fields = db_index_fields(db)
+        assignments = ", ".join(f"{field} = ?" for field in fields[1:])
+        new_rows = []
+        for _, object_id, data in select_db_objects(db, list(updates)):
+            obj = json.loads(data)
+            obj.update(updates[object_id])
+            row = db_row(obj, fields)
+            new_rows.append(row[1:] + (object_id,))
+
+        db.executemany(
+            f"UPDATE objects SET {assignments}, data = ? WHERE object_id = ?",
+            new_rows,
+        )
+        db.executemany(
+            "INSERT INTO metadata (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [
+                (key, json.dumps(value, ensure_ascii=False))
+                for key, value in (metadata or {}).items()
+            ],
+        )
+
+    return len(new_rows)
+
+
+# ===== CONSULTAS Y EXPORTACIÓN =====
+
+
+def manifest_status_summary(events: Optional[List[Dict]] = None) -> Dict:
+    """
+    Conteo de objetos por status, tipo y categoría.
+
+    Con SQLite usa GROUP BY sobre columnas indexadas; con los otros layouts, o
+    si hay eventos del journal sin compactar, recorre el índice
+    (load_manifest_index) con los eventos aplicados.
+
+    Args:
+        events: Eventos de progress_journal.jsonl pendientes de compactar
+    """
+    summary = {"by_status": {}, "by_type": {}, "by_category": {}}
+    columns = {
+        "by_status": "status",
+        "by_type": "object_type",
+        "by_category": "category",
+    }
+
+    if manifest_layout() == LAYOUT_SQLITE and not events:
+        with manifest_db() as db:
+            for key, column in columns.items():
+                summary[key] = dict(
+                    db.execute(
+                        f"SELECT {column}, COUNT(*) FROM objects "
+                        f"GROUP BY {column} ORDER BY COUNT(*) DESC"
+                    )
+                )
+    else:
+        objects = load_manifest_index()["objects"]
+        if events:
+            # progress_journal importa este módulo: import local
+            from progress_journal import apply_events
+
+            apply_events(objects, events)
+        for obj in objects:
+            for key, column in columns.items():
+                value = obj.get(column)
+                summary[key][value] = summary[key].get(value, 0) + 1
+
+    summary["total_objects"] = sum(summary["by_status"].values())
+    return summary
+
+
+def export_manifest_json(output_file: Path = MANIFEST_FILE) -> Path:
+    """Exporta el manifest actual (cualquier layout) al formato de manifest.json."""
+    write_json_atomic(output_file, load_manifest())
+    return output_file
+
+
+def main():
+    """Función principal"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("status", "export"):
+        print("Uso:")
+        print("  python scripts/manifest_store.py status")
+        print("  python scripts/manifest_store.py export [ARCHIVO]")
+        sys.exit(1)
+
+    if not manifest_exists():
+        print(f"❌ Error: {MANIFEST_FILE} no existe")
+        print("   Ejecuta primero: python scripts/prepare_migration.py")
+        sys.exit(1)
+
+    if sys.argv[1] == "export":
+        output_file = Path(sys.argv[2]) if len(sys.argv) > 2 else MANIFEST_FILE
+        export_manifest_json(output_file)
+        print(f"✅ Manifest exportado: {output_file}")
+        return
+
+    from progress_journal import read_events
+
+    events = read_events()
+    summary = manifest_status_summary(events)
+    print(f"📊 Manifest: {manifest_location()} ({manifest_layout()})")
+    if events:
+        print(f"   Con {len(events):,} eventos del journal sin compactar aplicados")
+    print(f"   Total objetos: {summary['total_objects']:,}")
+    for title, key in (
+        ("Por status", "by_status"),
+        ("Por tipo", "by_type"),
+        ("Por categoría", "by_category"),
+    ):
+        print(f"\n   {title}:")
+        for value, count in summary[key].items():
+            print(f"   - {value}: {count:,}")
+
+
+if __name__ == "__main__":
+    main()
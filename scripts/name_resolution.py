@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Resolución de nombres de dependencias PL/SQL a object_ids del manifest.
+
+PROPÓSITO:
+    plsql-analyzer escribe las dependencias como nombres tal cual aparecen en el
+    código ("PKG.PROC", "PROC" dentro del mismo package, "ESQUEMA.FN",
+    sinónimos...). Un índice nombre → object_id con un solo valor por nombre
+    pierde los overloads y deja como externas las llamadas sin calificar dentro
+    de un package. Cada arista mal resuelta termina en errores de compilación y
+    reintentos.
+
+ÍNDICE (una pasada sobre el manifest):
+    - Nombre calificado exacto: "FN_X", "PKG.PROC" → todos los objetos con ese
+      nombre (los overloads de un package comparten nombre)
+    - Nombres de package: para no confundir "PKG.X" con un prefijo de esquema
+    - Sinónimos y esquemas conocidos: sql/extracted/synonyms.json (opcional)
+
+ORDEN DE RESOLUCIÓN DE UNA REFERENCIA:
+    1. package_local   "PROC" dentro de PKG → "PKG.PROC"
+    2. exact           Nombre calificado tal cual
+    3. synonym         El nombre (o su primera parte) es un sinónimo
+    4. schema_prefix   "ESQUEMA.RESTO" con ESQUEMA en synonyms.json → "RESTO"
+    Con varios candidatos: overload (mismo package) o ambiguous (resto).
+
+    Una primera parte desconocida no se recorta: "OTRO_SISTEMA_PKG.FN_X" es una
+    llamada externa aunque exista un FN_X propio.
+
+    Cada arista lleva method y confidence (RESOLUTION_CONFIDENCE; si se combinan
+    pasos, la menor). Costo: O(partes del nombre) búsquedas en dicts por
+    referencia, lineal en el total de referencias.
+
+FORMATO DE synonyms.json:
+    {
+      "synonyms": {"SCI_K_VALIDA": "SOLCA_PLSQL.SCI_K_VALIDA"},
+      "schemas": ["LATINO_PLSQL", "SOLCA_PLSQL"]
+    }
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene sql/extracted/
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from manifest_store import EXTRACTED_DIR
+
+SYNONYMS_FILE = EXTRACTED_DIR / "synonyms.json"
+
+# Confianza de cada forma de resolución (1.0 = sin ambigüedad)
+RESOLUTION_CONFIDENCE = {
+    "exact": 1.0,
+    "package_local": 1.0,
+    "schema_prefix": 0.95,
+    "synonym": 0.9,
+    "overload": 0.8,
+    "ambiguous": 0.5,
+}
+
+# Sinónimos que apuntan a otros sinónimos: saltos máximos (corta ciclos)
+MAX_SYNONYM_DEPTH = 5
+
+# Packages de Oracle: "DBMS_OUTPUT.PUT_LINE" nunca es "esquema + PUT_LINE"
+BUILTIN_PACKAGE_PREFIXES = ("DBMS_", "UTL_", "APEX_", "OWA_")
+BUILTIN_PACKAGES = {"SYS", "STANDARD", "HTP", "HTF", "OWA"}
+
+
+def normalize_name(name: str) -> str:
+    """Mayúsculas, sin comillas ni espacios, sin @dblink."""
+    return name.split("@", 1)[0].replace('"', "").replace(" ", "").upper()
+
+
+def is_builtin_package(name: str) -> bool:
+    """True si name es un package/esquema propio de Oracle."""
+    return name in BUILTIN_PACKAGES or name.startswith(BUILTIN_PACKAGE_PREFIXES)
+
+
+def load_synonyms() -> Dict:
+    """
+    Contenido de synonyms.json normalizado ({synonyms, schemas}).
+
+    Sin archivo (o inválido) retorna tablas vacías: la resolución funciona igual,
+    solo sin los pasos synonym / schema_prefix.
+    """
+    config = {"synonyms": {}, "schemas": set()}
+    if not SYNONYMS_FILE.exists():
+        return config
+
+    try:
+        with open(SYNONYMS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"   ⚠️  {SYNONYMS_FILE.name} inválido, se ignora: {e}")
+        return config
+
+    config["synonyms"] = {
+        normalize_name(synonym): normalize_name(target)
+        for synonym, target in data.get("synonyms", {}).items()
+    }
+    config["schemas"] = {normalize_name(schema) for schema in data.get("schemas", [])}
+    return config
+
+
+def object_package(obj: Dict) -> Optional[str]:
+    """Package al que pertenece el código de un objeto (None si es standalone)."""
+    if obj.get("parent_package"):
+        return normalize_name(obj["parent_package"])
+    if obj.get("object_type") in ("PACKAGE_BODY", "PACKAGE_SPEC"):
+        return normalize_name(obj["object_name"])
+    name = normalize_name(obj.get("object_name", ""))
+    if "." in name:
+        return name.rsplit(".", 1)[0]
+    return None
+
+
+def build_resolution_index(
+    manifest_objects: Iterable[Dict], synonyms: Optional[Dict] = None
+) -> Dict:
+    """
+    Índice de resolución de nombres (una pasada sobre el manifest).
+
+    Args:
+        manifest_objects: Objetos (o entradas del índice) con object_id,
+            object_name, object_type y parent_package
+        synonyms: De load_synonyms() (opcional)
+
+    Returns:
+        Dict con by_name (nombre calificado → [objetos]), packages, synonyms y
+        schemas
+    """
+    synonyms = synonyms or {"synonyms": {}, "schemas": set()}
+    by_name = {}
+    packages = set()
+
+    for obj in manifest_objects:
+        entry = {
+            "object_id": obj["object_id"],
+            "package": object_package(obj),
+        }
+        by_name.setdefault(normalize_name(obj["object_name"]), []).append(entry)
+        if entry["package"]:
+            packages.add(entry["package"])
+
+    return {
+        "by_name": by_name,
+        "packages": packages,
+        "synonyms": synonyms["synonyms"],
+        "schemas": synonyms["schemas"],
+    }
+
+
+def classify_candidates(
+    candidates: List[Dict], caller_id: Optional[str]
+) -> Tuple[List[str], str]:
+    """
+    object_ids de los candidatos y method: exact (uno), overload (varios del mismo
+    package) o ambiguous.
+
+    Una llamada entre overloads del mismo nombre no se resuelve al propio objeto.
+    """
+    object_ids = [candidate["object_id"] for candidate in candidates]
+    if len(object_ids) == 1:
+        return object_ids, "exact"
+
+    others = [object_id for object_id in object_ids if object_id != caller_id]
+    packages = {candidate["package"] for candidate in candidates}
+    if len(packages) == 1 and None not in packages:
+        return others or object_ids, "overload"
+    return others or object_ids, "ambiguous"
+
+
+def lookup(
+    index: Dict, name: str, caller_id: Optional[str], caller_package: Optional[str]
+) -> Optional[Tuple[List[str], List[str]]]:
+    """Pasos 1-2: package_local y exact. Retorna (object_ids, methods) o None."""
+    by_name = index["by_name"]
+    if caller_package and "." not in name:
+        candidates = by_name.get(f"{caller_package}.{name}")
+        if candidates:
+            object_ids, method = classify_candidates(candidates, caller_id)
+            methods = (
+                ["package_local"] if method == "exact" else ["package_local", method]
+            )
+            return object_ids, methods
+
+    candidates = by_name.get(name)
+    if candidates:
+        object_ids, method = classify_candidates(candidates, caller_id)
+        return object_ids, [method]
+    return None
+
+
+def expand_synonym(index: Dict, name: str) -> Optional[str]:
+    """Nombre con el sinónimo reemplazado (completo o primera parte), en cadena."""
+    synonyms = index["synonyms"]
+    expanded = name
+    for _ in range(MAX_SYNONYM_DEPTH):
+        if expanded in synonyms:
+            expanded = synonyms[expanded]
+            continue
+        first, dot, rest = expanded.partition(".")
+        if dot and first in synonyms:
+            expanded = f"{synonyms[first]}.{rest}"
+            continue
+        break
+    return expanded if expanded != name else None
+
+
+def resolve_reference(
+    index: Dict,
+    reference: str,
+    caller_id: Optional[str] = None,
+    caller_package: Optional[str] = None,
+) -> Optional[Dict]:
+    """
+    Resuelve un nombre referenciado desde el código de caller_id.
+
+    Returns:
+        {object_ids, method, confidence} o None si es externo (no está en el manifest)
+    """
+    name = normalize_name(reference)
+    methods = []
+
+    found = lookup(index, name, caller_id, caller_package)
+    if not found:
+        expanded = expand_synonym(index, name)
+        if expanded:
+            methods.append("synonym")
+            name = expanded
+            found = lookup(index, name, caller_id, caller_package)
+
+    # Prefijo de esquema declarado: "ESQUEMA.FN", "ESQUEMA.PKG.PROC" (nunca si es
+    # un package); cualquier otro prefijo es de un objeto externo
+    if not found and "." in name:
+        prefix, rest = name.split(".", 1)
+        if (
+            prefix in index["schemas"]
+            and prefix not in index["packages"]
+            and not is_builtin_package(prefix)
+        ):
+            found = lookup(index, rest, caller_id, None)
+            if found:
+                methods.append("schema_prefix")
+
+    if not found:
+        return None
+
+    object_ids, lookup_methods = found
+    methods.extend(lookup_methods)
+    # El method que se reporta es el de menor confianza (el paso más dudoso)
+    method = min(methods, key=RESOLUTION_CONFIDENCE.get)
+    return {
+        "object_ids": object_ids,
+        "method": method,
+        "confidence": RESOLUTION_CONFIDENCE[method],
+    }
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Código fuente por objeto: pack de fuentes + índice de offsets y lector con mmap.
+
+PROPÓSITO:
+    Los objetos del manifest solo guardan source_file + char_start/char_end (o
+    line_start/line_end para los procedures/functions internos de un package). Para
+    leer un objeto, un agente tenía que abrir archivos de varios MB como
+    packages_body.sql. Con prepare_migration.py --extract-objects cada objeto se
+    copia una vez a un pack y el lector sirve su código por object_id leyendo
+    solo esos bytes.
+
+ARCHIVOS:
+    sql/extracted/objects/objects.pack ← código de cada objeto en UTF-8, concatenado
+    sql/extracted/objects/index.json   ← {object_id: {offset, length, source_file,
+                                          line_start, line_end}} (offsets en bytes)
+
+    Además de cada objeto (también los hijos de packages), el SPEC de cada
+    PACKAGE_BODY se guarda como "{object_id}:spec".
+
+    El pack corresponde a un manifest: prepare_migration.py lo borra cuando
+    regenera el manifest sin --extract-objects (remove_object_sources).
+
+    Los char_start/char_end del parser son posiciones en el texto leído en modo texto
+    (saltos de línea normalizados), no bytes del archivo: por eso el pack se arma
+    leyendo los archivos igual que el parser y los offsets del índice son de bytes
+    del pack. Los archivos se leen línea a línea (no se cargan completos).
+
+USO (desde los otros scripts):
+    from object_source import object_source_reader
+
+    with object_source_reader() as read_source:
+        code = read_source("obj_0123")            # None si no está en el pack
+        spec = read_source("obj_0456", spec=True)
+
+USO (línea de comandos):
+    python scripts/object_source.py obj_0123 [obj_0124 ...]   # Imprime el código
+    python scripts/object_source.py obj_0456 --spec           # SPEC del package
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene sql/extracted/
+"""
+
+import json
+import mmap
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from manifest_store import EXTRACTED_DIR, atomic_write
+
+OBJECTS_DIR = EXTRACTED_DIR / "objects"
+OBJECT_PACK_FILE = OBJECTS_DIR / "objects.pack"
+OBJECT_INDEX_FILE = OBJECTS_DIR / "index.json"
+
+SPEC_SUFFIX = ":spec"
+
+
+def source_ranges(objects: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    Rangos a extraer agrupados por archivo fuente.
+
+    Objetos top-level: char_start/char_end. Hijos de packages: line_start/line_end
+    (líneas completas). SPEC de un PACKAGE_BODY: spec_line_start/spec_line_end.
+    """
+    ranges = {}
+
+    for obj in objects:
+        if obj.get("source_file") and "char_start" in obj:
+            ranges.setdefault(obj["source_file"], []).append(
+                {
+                    "key": obj["object_id"],
+                    "char_start": obj["char_start"],
+                    "char_end": obj["char_end"],
+                    "line_start": obj.get("line_start"),
+                    "line_end": obj.get("line_end"),
+                }
+            )
+        elif obj.get("source_file") and obj.get("line_start"):
+            ranges.setdefault(obj["source_file"], []).append(
+                {
+                    "key": obj["object_id"],
+                    "line_start": obj["line_start"],
+                    "line_end": obj["line_end"],
+                }
+            )
+
+        if obj.get("spec_file") and obj.get("spec_line_start"):
+            ranges.setdefault(obj["spec_file"], []).append(
+                {
+                    "key": obj["object_id"] + SPEC_SUFFIX,
+                    "line_start": obj["spec_line_start"],
+                    "line_end": obj["spec_line_end"],
+                }
+            )
+
+    return ranges
+
+
+def resolve_line_ranges(file_path: Path, ranges: List[Dict]):
+    """
+    Convierte los rangos por líneas en rangos de caracteres (primera pasada).
+
+    Solo guarda la posición de las líneas que inician o terminan un rango.
+    """
+    wanted = set()
+    for entry in ranges:
+        if "char_start" not in entry:
+            wanted.update((entry["line_start"], entry["line_end"]))
+    if not wanted:
+        return
+
+    positions = {}
+    char_pos = 0
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line_number in wanted:
+                positions[line_number] = (char_pos, char_pos + len(line.rstrip("\n")))
+            char_pos += len(line)
+
+    for entry in ranges:
+        if "char_start" not in entry:
+            start = positions.get(entry["line_start"])
+            end = positions.get(entry["line_end"])
+            if start and end:
+                entry["char_start"] = start[0]
+                entry["char_end"] = end[1]
+
+
+def extract_ranges(file_path: Path, ranges: List[Dict]) -> Iterator[tuple]:
+    """
+    Recorre el archivo una vez y emite (entry, código) al completar cada rango.
+
+    Los rangos pueden solaparse (PACKAGE_BODY y sus hijos): solo se mantiene en
+    memoria el texto de los rangos abiertos.
+    """
+    pending = sorted(
+        (entry for entry in ranges if "char_start" in entry),
+        key=lambda entry: entry["char_start"],
+    )
+    next_pending = 0
+    active = []
+    char_pos = 0
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line_end = char_pos + len(line)
+
+            while (
+                next_pending < len(pending)
+                and pending[next_pending]["char_start"] < line_end
+            ):
+                active.append((pending[next_pending], []))
+                next_pending += 1
+
+            still_active = []
+            for entry, parts in active:
+                start = max(entry["char_start"] - char_pos, 0)
+                end = min(entry["char_end"] - char_pos, len(line))
+                if end > start:
+                    parts.append(line[start:end])
+                if entry["char_end"] <= line_end:
+                    yield entry, "".join(parts)
+                else:
+                    still_active.append((entry, parts))
+            active = still_active
+            char_pos = line_end
+
+    for entry, parts in active:
+        yield entry, "".join(parts)
+
+
+def write_object_sources(objects: List[Dict], source_dir: Path = EXTRACTED_DIR) -> Dict:
+    """
+    Genera objects.pack + index.json para los objetos del manifest.
+
+    Ambos se escriben en temporales y se renombran al terminar: un corte nunca
+    deja un pack o un índice a medio escribir.
+
+    Returns:
+        Índice escrito
+    """
+    OBJECTS_DIR.mkdir(parents=True, exist_ok=True)
+    entries = {}
+    temp_pack = OBJECT_PACK_FILE.with_name(f".{OBJECT_PACK_FILE.name}.tmp")
+
+    with open(temp_pack, "wb") as pack:
+        for source_file, ranges in source_ranges(objects).items():
+            file_path = source_dir / source_file
+            if not file_path.exists():
+                continue
+
+            resolve_line_ranges(file_path, ranges)
+            for entry, code in extract_ranges(file_path, ranges):
+                data = code.encode("utf-8")
+                entries[entry["key"]] = {
+                    "offset": pack.tell(),
+                    "length": len(data),
+                    "source_file": source_file,
+                    "line_start": entry.get("line_start"),
+                    "line_end": entry.get("line_end"),
+                }
+                pack.write(data)
+
+        pack.flush()
+        os.fsync(pack.fileno())
+        total_bytes = pack.tell()
+
+    index = {
+        "generated_at": datetime.now().isoformat(),
+        "pack_file": OBJECT_PACK_FILE.name,
+        "total_bytes": total_bytes,
+        "total_entries": len(entries),
+        "objects": entries,
+    }
+
+    os.replace(temp_pack, OBJECT_PACK_FILE)
+    with atomic_write(OBJECT_INDEX_FILE) as f:
+        json.dump(index, f, ensure_ascii=False)
+
+    return index
+
+
+def object_sources_exist() -> bool:
+    """True si existen objects.pack e index.json."""
+    return OBJECT_PACK_FILE.exists() and OBJECT_INDEX_FILE.exists()
+
+
+def remove_object_sources() -> bool:
+    """
+    Borra objects.pack e index.json (manifest regenerado sin --extract-objects).
+
+    Los object_id del pack serían los del manifest anterior: un lector que lo
+    encuentre serviría el código de otro objeto.
+
+    Returns:
+        True si había un pack que borrar
+    """
+    existed = OBJECT_PACK_FILE.exists() or OBJECT_INDEX_FILE.exists()
+    # Primero el índice: los lectores verifican que existan los dos
+    OBJECT_INDEX_FILE.unlink(missing_ok=True)
+    OBJECT_PACK_FILE.unlink(missing_ok=True)
+    return existed
+
+
+def load_object_index() -> Dict:
+    """Carga index.json del pack."""
+    with open(OBJECT_INDEX_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@contextmanager
+def object_source_reader() -> Iterator[Callable[..., Optional[str]]]:
+    """
+    Abre el pack con mmap (una vez) y retorna read_source(object_id, spec=False).
+
+    read_source retorna el código del objeto (o del SPEC del package con
+    spec=True), o None si no está en el pack.
+    """
+    entries = load_object_index()["objects"]
+
+    with open(OBJECT_PACK_FILE, "rb") as pack:
+        if os.fstat(pack.fileno()).st_size == 0:
+            yield lambda object_id, spec=False: None
+            return
+
+        with mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+            def read_source(object_id: str, spec: bool = False) -> Optional[str]:
+                entry = entries.get(object_id + (SPEC_SUFFIX if spec else ""))
+                if entry is None:
+                    return None
+                start = entry["offset"]
+                return data[start : start + entry["length"]].decode("utf-8")
+
+            yield read_source
+
+
+def main():
+    """Función principal"""
+    object_ids = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    spec = "--spec" in sys.argv
+
+    if not object_ids:
+        print("Uso:")
+        print("  python scripts/object_source.py obj_0123 [obj_0124 ...]")
+        print("  python scripts/object_source.py obj_0456 --spec")
+        sys.exit(1)
+
+    if not object_sources_exist():
+        print(f"❌ Error: {OBJECT_INDEX_FILE} no existe")
+        print(
+            "   Ejecuta primero: python scripts/prepare_migration.py --extract-objects"
+        )
+        sys.exit(1)
+
+    entries = load_object_index()["objects"]
+    missing = []
+
+    with object_source_reader() as read_source:
+        for object_id in object_ids:
+            code = read_source(object_id, spec=spec)
+            if code is None:
+                missing.append(object_id)
+                continue
+
+            key = object_id + (SPEC_SUFFIX if spec else "")
+            entry = entries[key]
+            if len(object_ids) > 1:
+                print(
+                    f"-- {key} ({entry['source_file']}:"
+                    f"{entry['line_start']}-{entry['line_end']})"
+                )
+            print(code)
+
+    if missing:
+        print(
+            f"❌ No están en {OBJECT_PACK_FILE}: {', '.join(missing)}", file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
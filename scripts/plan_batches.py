@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Planificador de batches por presupuesto de tokens (Fase 1: plsql-analyzer).
+
+PROPÓSITO:
+    Reemplaza los batches fijos de 200 objetos (20 agentes × 10 objetos): un agente
+    podía recibir 10 package bodies de 5,000 líneas y otro 10 funciones de 10
+    líneas. El planificador reparte los objetos pendientes entre agentes según el
+    tamaño estimado de lo que cada agente tiene que leer y escribir.
+
+ESTIMACIÓN (tokens ≈ caracteres / CHARS_PER_TOKEN):
+    objeto   = code_length / CHARS_PER_TOKEN + OBJECT_OVERHEAD_TOKENS (JSON de salida)
+    package  = tamaño de knowledge/packages/{parent_package_id}_context.json
+               (declaraciones del SPEC y privadas del BODY), una vez por agente
+               que procesa objetos de ese package
+    agente   = AGENT_PROMPT_TOKENS + objetos + contextos ≤ token_budget
+
+ALGORITMO:
+    1. Agrupa los objetos pendientes por package (PACKAGE_BODY + procedures/functions
+       internos); cada standalone es un grupo de un objeto. Un grupo que no entra
+       en un agente se parte en orden de procesamiento (cada parte paga el contexto).
+    2. Toma grupos en orden de procesamiento hasta completar la capacidad del batch
+       (agentes × presupuesto) y los reparte entre los agentes con best-fit
+       decreasing. Lo que no entra pasa al batch siguiente, así el orden de
+       procesamiento se mantiene entre batches.
+
+SALIDA:
+    sql/extracted/batches.json  ← batch → agentes → object_ids + tokens estimados
+
+USO:
+    python scripts/plan_batches.py [--token-budget N] [--agents N]
+
+    update_progress.py y prepare_migration.py regeneran batches.json con los valores
+    por defecto después de cada actualización.
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene sql/extracted/ y knowledge/
+"""
+
+import json
+import math
+import sys
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from manifest_store import BASE_DIR, EXTRACTED_DIR, load_objects, write_json_atomic
+from progress_journal import PROGRESS_FILE, load_current_state
+
+PACKAGES_CONTEXT_DIR = BASE_DIR / "knowledge" / "packages"
+BATCHES_FILE = EXTRACTED_DIR / "batches.json"
+
+AGENTS_PER_BATCH = 20  # Agentes plsql-analyzer en paralelo por batch
+AGENT_TOKEN_BUDGET = 80_000  # Tokens estimados por instancia de agente
+AGENT_PROMPT_TOKENS = 10_000  # Definición del agente + instrucciones
+OBJECT_OVERHEAD_TOKENS = 3_000  # JSON de salida + razonamiento + lecturas del manifest
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(chars: int) -> int:
+    """Tokens estimados para chars caracteres de código/JSON."""
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def package_context_tokens(package_id: Optional[str], cache: Dict) -> int:
+    """Tokens del contexto de un package (0 si no hay archivo de contexto)."""
+    if not package_id:
+        return 0
+    if package_id not in cache:
+        context_file = PACKAGES_CONTEXT_DIR / f"{package_id}_context.json"
+        cache[package_id] = (
+            estimate_tokens(context_file.stat().st_size) if context_file.exists() else 0
+        )
+    return cache[package_id]
+
+
+def pending_objects(objects: List[Dict]) -> List[Dict]:
+    """
+    Objetos en pending (en orden de procesamiento), con code_length.
+
+    Con un índice sharded/SQLite generado antes de que code_length estuviera en el
+    índice, se leen los objetos completos que no lo tienen.
+    """
+    pending = [obj for obj in objects if obj.get("status") == "pending"]
+
+    missing = [obj["object_id"] for obj in pending if "code_length" not in obj]
+    if missing:
+        lengths = {
+            obj["object_id"]: obj.get("code_length", 0) for obj in load_objects(missing)
+        }
+        for obj in pending:
+            if "code_length" not in obj:
+                obj["code_length"] = lengths.get(obj["object_id"], 0)
+
+    return pending
+
+
+def group_objects(objects: List[Dict]) -> List[Dict]:
+    """
+    Agrupa objetos por package (en orden de primera aparición).
+
+    Returns:
+        Lista de grupos {package, context_tokens, objects, tokens}
+    """
+    groups = {}
+    context_cache = {}
+
+    for position, obj in enumerate(objects):
+        if obj.get("parent_package"):
+            key = ("package", obj["parent_package"])
+        elif obj.get("object_type") == "PACKAGE_BODY":
+            key = ("package", obj["object_name"])
+        else:
+            key = ("object", obj["object_id"])
+
+        group = groups.setdefault(
+            key,
+            {
+                "package": key[1] if key[0] == "package" else None,
+                "context_tokens": 0,
+                "objects": [],
+                "tokens": 0,
+            },
+        )
+        # Los hijos referencian el contexto del package por parent_package_id
+        if not group["context_tokens"] and obj.get("parent_package_id"):
+            group["context_tokens"] = package_context_tokens(
+                obj["parent_package_id"], context_cache
+            )
+
+        group["objects"].append(
+            (
+                position,
+                obj["object_id"],
+                estimate_tokens(obj.get("code_length", 0)) + OBJECT_OVERHEAD_TOKENS,
+            )
+        )
+
+    for group in groups.values():
+        group["tokens"] = group["context_tokens"] + sum(
+            tokens for _, _, tokens in group["objects"]
+        )
+
+    return list(groups.values())
+
+
+def split_group(group: Dict, capacity: int) -> List[Dict]:
+    """
+    Parte un grupo que excede capacity en partes consecutivas.
+
+    Cada parte incluye el contexto del package. Un objeto que por sí solo excede
+    capacity queda en una parte propia (marcada over_budget al planificar).
+    """
+    if group["tokens"] <= capacity:
+        return [group]
+
+    parts = []
+    current = None
+    for item in group["objects"]:
+        if current is None or current["tokens"] + item[2] > capacity:
+            current = {
+                "package": group["package"],
+                "context_tokens": group["context_tokens"],
+                "objects": [],
+                "tokens": group["context_tokens"],
+            }
+            parts.append(current)
+        current["objects"].append(item)
+        current["tokens"] += item[2]
+
+    return parts
+
+
+def pack_batch(
+    groups: List[Dict], agents: int, capacity: int
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Reparte grupos entre agentes con best-fit decreasing.
+
+    Returns:
+        (bins con los grupos asignados, grupos que no entraron)
+    """
+    bins = []
+    leftovers = []
+
+    for group in sorted(groups, key=lambda group: group["tokens"], reverse=True):
+        fitting = [
+            agent_bin
+            for agent_bin in bins
+            if agent_bin["tokens"] + group["tokens"] <= capacity
+        ]
+        if fitting:
+            target = min(fitting, key=lambda agent_bin: capacity - agent_bin["tokens"])
+        elif len(bins) < agents:
+            target = {"groups": [], "tokens": 0}
+            bins.append(target)
+        else:
+            leftovers.append(group)
+            continue
+
+        target["groups"].append(group)
+        target["tokens"] += group["tokens"]
+
+    leftovers.sort(key=lambda group: group["objects"][0][0])
+    return bins, leftovers
+
+
+def plan_batches(
+    objects: List[Dict],
+    first_batch: int = 1,
+    token_budget: int = AGENT_TOKEN_BUDGET,
+    agents: int = AGENTS_PER_BATCH,
+) -> Dict:
+    """
+    Planifica todos los objetos pendientes en batches de agentes.
+
+    Args:
+        objects: Objetos del manifest (o entradas del índice) con status actual
+        first_batch: Número del primer batch (siguiente a progress["current_batch"])
+        token_budget: Tokens estimados por agente
+        agents: Agentes por batch
+
+    Returns:
+        Plan en el formato de batches.json
+    """
+    capacity = max(token_budget - AGENT_PROMPT_TOKENS, 1)
+    pending = pending_objects(objects)
+
+    queue = deque()
+    for group in group_objects(pending):
+        queue.extend(split_group(group, capacity))
+
+    batches = []
+    while queue:
+        window = [queue.popleft()]
+        window_tokens = window[0]["tokens"]
+        while queue and window_tokens + queue[0]["tokens"] <= capacity * agents:
+            window_tokens += queue[0]["tokens"]
+            window.append(queue.popleft())
+
+        bins, leftovers = pack_batch(window, agents, capacity)
+        queue.extendleft(reversed(leftovers))
+
+        batch_agents = []
+        for agent_bin in sorted(
+            bins, key=lambda agent_bin: agent_bin["groups"][0]["objects"][0][0]
+        ):
+            items = sorted(
+                item for group in agent_bin["groups"] for item in group["objects"]
+            )
+            tokens = AGENT_PROMPT_TOKENS + agent_bin["tokens"]
+            batch_agents.append(
+                {
+                    "agent": len(batch_agents) + 1,
+                    "object_ids": [object_id for _, object_id, _ in items],
+                    "packages": [
+                        group["package"]
+                        for group in agent_bin["groups"]
+                        if group["package"]
+                    ],
+                    "estimated_tokens": tokens,
+                    "over_budget": tokens > token_budget,
+                }
+            )
+
+        batches.append(
+            {
+                "batch_id": f"batch_{first_batch + len(batches):03d}",
+                "objects": sum(len(agent["object_ids"]) for agent in batch_agents),
+                "estimated_tokens": sum(
+                    agent["estimated_tokens"] for agent in batch_agents
+                ),
+                "agents": batch_agents,
+            }
+        )
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "token_budget": token_budget,
+        "agents_per_batch": agents,
+        "agent_prompt_tokens": AGENT_PROMPT_TOKENS,
+        "object_overhead_tokens": OBJECT_OVERHEAD_TOKENS,
+        "chars_per_token": CHARS_PER_TOKEN,
+        "pending_objects": len(pending),
+        "total_batches": len(batches),
+        "batches": batches,
+    }
+
+
+def next_batch_number(progress: Dict) -> int:
+    """Número del batch siguiente a progress["current_batch"] (batch_000 al inicio)."""
+    return int(progress["current_batch"].split("_")[1]) + 1
+
+
+def save_batches(plan: Dict) -> Path:
+    """Guarda batches.json (escritura atómica)."""
+    write_json_atomic(BATCHES_FILE, plan)
+    return BATCHES_FILE
+
+
+def load_batches() -> Dict:
+    """Carga batches.json."""
+    with open(BATCHES_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_plan_summary(plan: Dict):
+    """Resumen del plan: batches, objetos y ocupación de los agentes."""
+    print(
+        f"📦 Plan de batches: {plan['pending_objects']} objetos pendientes → "
+        f"{plan['total_batches']} batches "
+        f"(presupuesto {plan['token_budget']:,} tokens/agente, "
+        f"{plan['agents_per_batch']} agentes/batch)"
+    )
+
+    if not plan["batches"]:
+        return
+
+    all_agents = [agent for batch in plan["batches"] for agent in batch["agents"]]
+    fill = [agent["estimated_tokens"] / plan["token_budget"] for agent in all_agents]
+    print(
+        f"   Ocupación por agente: promedio {sum(fill) / len(fill):.0%}, "
+        f"mínimo {min(fill):.0%}, máximo {max(fill):.0%}"
+    )
+
+    over_budget = [agent for agent in all_agents if agent["over_budget"]]
+    if over_budget:
+        print(
+            f"   ⚠️  {len(over_budget)} agentes exceden el presupuesto "
+            f"(un objeto más grande que el presupuesto queda solo en su agente)"
+        )
+
+
+def get_option(name: str) -> Optional[str]:
+    """Lee el valor de una opción --nombre VALOR de sys.argv."""
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return None
+
+
+def main():
+    """Función principal"""
+    if not PROGRESS_FILE.exists():
+        print(f"❌ Error: {PROGRESS_FILE} no existe")
+        print("   Ejecuta primero: python scripts/prepare_migration.py")
+        sys.exit(1)
+
+    token_budget = int(get_option("--token-budget") or AGENT_TOKEN_BUDGET)
+    agents = int(get_option("--agents") or AGENTS_PER_BATCH)
+
+    manifest, progress, _ = load_current_state()
+    plan = plan_batches(
+        manifest["objects"], next_batch_number(progress), token_budget, agents
+    )
+    save_batches(plan)
+
+    print_plan_summary(plan)
+    for batch in plan["batches"][:3]:
+        print(
+            f"   {batch['batch_id']}: {batch['objects']} objetos, "
+            f"{len(batch['agents'])} agentes, "
+            f"~{batch['estimated_tokens']:,} tokens"
+        )
+    print(f"\n✅ Plan guardado: {BATCHES_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,20 +76,60 @@ Opciones:
     --dry-run           Solo valida parsing sin generar manifest
     --force             Sobrescribir progress.json existente
     --no-granular       Deshabilitar parsing granular de packages (usa v3 behavior)
+    --streaming         Leer archivos por bloques delimitados (/ o ;) sin cargarlos completos
+    --jobs N            Parsear los archivos (y los packages) en N procesos (default: 1)
+    --incremental       Re-parsear solo archivos modificados; los objetos sin cambios
+                        conservan object_id, status y análisis (manifest_cache.json).
+                        progress.json se recalcula desde esos status y conserva los
+                        batches (con o sin --force)
+    --profile           Medir tiempo y memoria por paso, archivo y objeto; marca objetos
+                        con fallback_end_pos (sql/extracted/parsing_profile.json)
+    --profile-threshold MS
+                        Umbral para listar objetos lentos en el reporte (default: 50)
+    --sharded           Guardar manifest/index.json (índice liviano) + manifest/shards/
+                        en lugar de manifest.json (ver manifest_store.py)
+    --sqlite            Guardar el manifest en sql/extracted/manifest.db (SQLite con
+                        índices por status, tipo, package y nivel de dependencia)
+    --extract-objects   Copiar el código de cada objeto (y del SPEC de cada package) a
+                        sql/extracted/objects/objects.pack + index.json; los agentes lo
+                        leen por object_id con scripts/object_source.py. Sin esta opción
+                        se borra el pack anterior (sus object_id ya no corresponden)
 """
 
 import hashlib
 import json
 import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from manifest_store import (
+    LAYOUT_MONOLITHIC,
+    LAYOUT_SHARDED,
+    LAYOUT_SQLITE,
+    load_manifest,
+    manifest_exists,
+    manifest_location,
+    save_manifest,
+    write_json_atomic,
+)
+from object_source import OBJECT_PACK_FILE, remove_object_sources, write_object_sources
+from plan_batches import (
+    BATCHES_FILE,
+    next_batch_number,
+    plan_batches,
+    print_plan_summary,
+    save_batches,
+)
+from progress_journal import compact_journal, discard_journal, progress_from_objects
+
 # Directorio base del proyecto
 BASE_DIR = Path.cwd()
 EXTRACTED_DIR = BASE_DIR / "sql" / "extracted"
 OBJECTS_DIR = EXTRACTED_DIR / "objects"
-MANIFEST_FILE = EXTRACTED_DIR / "manifest.json"
 PROGRESS_FILE = EXTRACTED_DIR / "progress.json"
 VALIDATION_LOG = EXTRACTED_DIR / "parsing_validation.log"
 
@@ -100,9 +140,6 @@ PACKAGES_CONTEXT_DIR = KNOWLEDGE_DIR / "packages"
 # Tracking de errores
 parsing_errors = []
 
-# Configuración de chunks
-CHUNK_SIZE = 20  # Máximo de procedures/functions por chunk
-
 
 def log_parsing_error(error_msg: str, object_info: Dict = None):
     """Log de errores de parsing."""
@@ -150,6 +187,209 @@ def extract_object_name(match) -> str:
     return object_name
 
 
+# ===== LEXER PL/SQL (UNA SOLA PASADA) =====
+# Reconoce comentarios (-- y /* */), literales de texto ('...', N'...'),
+# q-quoted strings (q'[...]', q'{...}', q'!...!') e identificadores entre comillas.
+# El resto del texto es código. Cada archivo se tokeniza UNA vez y todas las etapas
+# trabajan sobre la vista "code" (comentarios e interior de literales en blanco,
+# misma longitud y mismos saltos de línea que el original).
+SQL_LEXER_PATTERN = re.compile(
+    r"(?P<line_comment>--[^\n]*)"
+    r"|(?P<block_comment>/\*.*?\*/)"
+    r"|(?P<q_string>(?<![\w$#])[nN]?[qQ]'"
+    r"(?:\[.*?\]|\{.*?\}|\(.*?\)|<.*?>|(?P<q_delim>[^\s\[\{\(<]).*?(?P=q_delim))')"
+    r"|(?P<string>(?:(?<![\w$#])[nN])?'[^']*(?:''[^']*)*')"
+    r"|(?P<quoted_identifier>\"[^\"\n]*\")",
+    re.DOTALL,
+)
+
+SQL_TOKEN_KINDS = {
+    "line_comment": "comment",
+    "block_comment": "comment",
+    "q_string": "string",
+    "string": "string",
+    "quoted_identifier": "quoted_identifier",
+}
+
+# Los tokens se guardan en arrays compactos (tipo, inicio, fin) en lugar de tuplas:
+# en archivos de varios MB hay cientos de miles de literales/comentarios
+SQL_TOKEN_KIND_CODES = ("comment", "string", "quoted_identifier")
+_TOKEN_KIND_TO_CODE = {
+    group: SQL_TOKEN_KIND_CODES.index(kind) for group, kind in SQL_TOKEN_KINDS.items()
+}
+
+
+def _blank(text: str) -> str:
+    """Reemplaza el texto por espacios manteniendo los saltos de línea."""
+    if "\n" not in text:
+        return " " * len(text)
+    return "\n".join(" " * len(line) for line in text.split("\n"))
+
+
+def tokenize_sql(content: str) -> Dict:
+    """
+    Tokeniza código PL/SQL en una sola pasada.
+
+    Args:
+        content: Código SQL original
+
+    Returns:
+        Diccionario "source" con:
+        - text: código original
+        - code: código con comentarios e interior de literales reemplazados por
+          espacios (mismos offsets y mismas líneas que text)
+        - token_kinds/token_starts/token_ends: arrays con los tokens comment,
+          string y quoted_identifier (ver iter_sql_tokens)
+    """
+    kinds = array("B")
+    starts = array("q")
+    ends = array("q")
+    pieces = []
+    last = 0
+
+    for match in SQL_LEXER_PATTERN.finditer(content):
+        kind_code = _TOKEN_KIND_TO_CODE[match.lastgroup]
+        start, end = match.span()
+        token_text = match.group()
+
+        pieces.append(content[last:start])
+        if kind_code == 0:  # comment
+            pieces.append(_blank(token_text))
+        elif kind_code == 1:  # string
+            # Conservar las comillas para patrones como NAME '...'
+            pieces.append("'" + _blank(token_text[1:-1]) + "'")
+        else:
+            pieces.append(token_text)
+
+        kinds.append(kind_code)
+        starts.append(start)
+        ends.append(end)
+        last = end
+
+    pieces.append(content[last:])
+
+    return {
+        "text": content,
+        "code": "".join(pieces),
+        "token_kinds": kinds,
+        "token_starts": starts,
+        "token_ends": ends,
+    }
+
+
+def iter_sql_tokens(source: Dict):
+    """Itera los tokens del source como tuplas (tipo, inicio, fin)."""
+    for kind_code, start, end in zip(
+        source["token_kinds"], source["token_starts"], source["token_ends"]
+    ):
+        yield SQL_TOKEN_KIND_CODES[kind_code], start, end
+
+
+def as_sql_source(code) -> Dict:
+    """Acepta código (str) o un source ya tokenizado y retorna el source."""
+    if isinstance(code, dict):
+        return code
+    return tokenize_sql(code)
+
+
+def sql_source_cleaned(source: Dict) -> str:
+    """
+    Retorna el texto del source solo sin comentarios (literales intactos).
+
+    Se construye desde los tokens (sin volver a escanear) y se cachea en el source.
+    Útil cuando se necesita el valor real de constantes, defaults o queries.
+    """
+    if "cleaned" not in source:
+        text = source["text"]
+        pieces = []
+        last = 0
+        for kind, start, end in iter_sql_tokens(source):
+            if kind != "comment":
+                continue
+            pieces.append(text[last:start])
+            pieces.append(_blank(text[start:end]))
+            last = end
+        pieces.append(text[last:])
+        source["cleaned"] = "".join(pieces)
+    return source["cleaned"]
+
+
+def slice_sql_source(source: Dict, start: int, end: int, strip: bool = True) -> Dict:
+    """
+    Extrae un sub-source [start:end] reutilizando los tokens del source padre.
+
+    Args:
+        source: Source tokenizado del archivo completo
+        start: Offset de inicio
+        end: Offset de fin
+        strip: Si es True, aplica el mismo .strip() que se usa para object_code
+
+    Returns:
+        Source cuyo text es source["text"][start:end] (strip opcional)
+    """
+    text = source["text"]
+    if strip:
+        segment = text[start:end]
+        stripped_left = segment.lstrip()
+        start += len(segment) - len(stripped_left)
+        end = start + len(stripped_left.rstrip())
+
+    # Tokens que intersectan [start, end): búsqueda binaria en ambos extremos
+    first = max(bisect_right(source["token_starts"], start) - 1, 0)
+    if first < len(source["token_ends"]) and source["token_ends"][first] <= start:
+        first += 1
+    last = bisect_left(source["token_starts"], end)
+
+    starts = array(
+        "q", (max(s, start) - start for s in source["token_starts"][first:last])
+    )
+    ends = array("q", (min(e, end) - start for e in source["token_ends"][first:last]))
+
+    return {
+        "text": text[start:end],
+        "code": source["code"][start:end],
+        "token_kinds": source["token_kinds"][first:last],
+        "token_starts": starts,
+        "token_ends": ends,
+        "offset": start,
+    }
+
+
+# ===== ÍNDICE DE LÍNEAS (offset → línea en O(log n)) =====
+def build_line_index(content: str) -> array:
+    """
+    Construye el índice de saltos de línea de un texto (una sola pasada).
+
+    Args:
+        content: Texto completo
+
+    Returns:
+        Array ordenado con el offset de cada "\n"
+    """
+    return array("q", (m.start() for m in re.finditer("\n", content)))
+
+
+def line_at(line_index: array, pos: int) -> int:
+    """
+    Retorna la línea (1-based) del offset pos usando búsqueda binaria.
+
+    Equivale a content[:pos].count("\n") + 1 sin volver a recorrer el texto.
+    """
+    return bisect_left(line_index, pos) + 1
+
+
+def source_line_at(source: Dict, pos: int) -> int:
+    """
+    Línea (1-based) de un offset del source; el índice se construye una vez y se cachea.
+
+    Si el source es un bloque de un archivo mayor (modo streaming), suma
+    source["line_base"] para retornar la línea absoluta en el archivo.
+    """
+    if "line_index" not in source:
+        source["line_index"] = build_line_index(source["text"])
+    return source.get("line_base", 0) + line_at(source["line_index"], pos)
+
+
 def find_object_end_robust(
     content: str, start_pos: int, end_pos: int, object_name: str, object_type: str
 ) -> Tuple[int, str]:
@@ -168,7 +408,7 @@ def find_object_end_robust(
     ESPECIAL: Java Stored Functions terminan con ; después de NAME '...' (no tienen END)
 
     Args:
-        content: Contenido completo del archivo
+        content: Contenido del archivo (vista "code" del lexer: sin comentarios ni literales)
         start_pos: Posición de inicio del objeto
         end_pos: Posición máxima de búsqueda
         object_name: Nombre exacto del objeto
@@ -285,7 +525,7 @@ def find_object_end_robust(
 
 
 def validate_extracted_code(
-    code: str, object_name: str, object_type: str
+    code: str, object_name: str, object_type: str, source: Optional[Dict] = None
 ) -> Tuple[bool, str]:
     """
     Valida que el código extraído sea sintácticamente coherente.
@@ -301,15 +541,22 @@ def validate_extracted_code(
         code: Código extraído
         object_name: Nombre del objeto
         object_type: Tipo de objeto
+        source: Source ya tokenizado del objeto (evita volver a escanear el código)
 
     Returns:
         Tupla (es_válido, mensaje_error)
     """
+    # Todas las verificaciones usan la vista sin comentarios ni literales
+    # (ej: "-- Este procedure es..." o 'END x; /' dentro de un string no cuentan)
+    code_no_comments = as_sql_source(source if source is not None else code)["code"]
+
     # Verificación 1: Debe iniciar con CREATE o directamente con el tipo de objeto
     # Formato DBMS_METADATA: "CREATE OR REPLACE FUNCTION..."
     # Formato ALL_SOURCE: "FUNCTION..." o "procedure..." o "package body..."
     valid_start = re.match(
-        r"^\s*(CREATE|FUNCTION|PROCEDURE|PACKAGE|TRIGGER)", code, re.IGNORECASE
+        r"^\s*(CREATE|FUNCTION|PROCEDURE|PACKAGE|TRIGGER)",
+        code_no_comments,
+        re.IGNORECASE,
     )
     if not valid_start:
         return False, "No inicia con CREATE o tipo de objeto válido"
@@ -317,7 +564,7 @@ def validate_extracted_code(
     # MEJORA V7.3: Detectar Java Stored Functions (validación diferente)
     is_java_function = False
     if object_type in ["FUNCTION", "PROCEDURE"]:
-        if re.search(r"LANGUAGE\s+JAVA", code, re.IGNORECASE):
+        if re.search(r"LANGUAGE\s+JAVA", code_no_comments, re.IGNORECASE):
             is_java_function = True
 
     # Verificación 2: Debe terminar con END; o END nombre; OBLIGATORIAMENTE seguido de /
@@ -331,20 +578,22 @@ def validate_extracted_code(
         if is_java_function:
             # Java functions terminan con NAME '...' ; / (no tienen END)
             java_end_pattern = r"NAME\s+'[^']+'\s*;(?:--[^\n]*)?(?:[\s]|--[^\n]*\n)*/$"
-            if not re.search(java_end_pattern, code.strip(), re.IGNORECASE | re.DOTALL):
+            if not re.search(
+                java_end_pattern, code_no_comments.strip(), re.IGNORECASE | re.DOTALL
+            ):
                 return False, f"Java function: No termina con NAME '...' ; /"
         else:
             # Objetos PL/SQL estándar terminan con END
             # El / es OBLIGATORIO para objetos PL/SQL
             # Permite comentarios inline y múltiples líneas en blanco/comentarios antes del /
             end_pattern = rf"(END\s+{re.escape(object_name)}\s*;|END\s*;)(?:--[^\n]*)?(?:[\s]|--[^\n]*\n)*/$"
-            if not re.search(end_pattern, code.strip(), re.IGNORECASE | re.DOTALL):
+            if not re.search(
+                end_pattern, code_no_comments.strip(), re.IGNORECASE | re.DOTALL
+            ):
                 return False, f"No termina con END {object_name}; / o END; /"
     # Verificación 3: No debe contener múltiples CREATE statements o múltiples objetos
     # Para ALL_SOURCE: verificar que no haya múltiples "FUNCTION nombre" o "PROCEDURE nombre"
     # Para DBMS_METADATA: verificar que no haya múltiples "CREATE OR REPLACE"
-    # MEJORA: Eliminar comentarios primero para evitar falsos positivos (ej: "-- Este procedure es...")
-    code_no_comments, _ = remove_sql_comments(code)
     create_count = len(
         re.findall(
             r"\b(?:CREATE\s+(?:OR\s+REPLACE\s+)?)?(?:PACKAGE\s+BODY|PACKAGE|FUNCTION|PROCEDURE|TRIGGER)\s+\w+",
@@ -374,77 +623,183 @@ def validate_extracted_code(
     return True, "OK"
 
 
-def remove_sql_comments(code: str) -> Tuple[str, Dict[int, int]]:
+def remove_sql_comments(
+    code: str, with_position_map: bool = False
+) -> Tuple[str, Optional[array]]:
     """
-    Elimina comentarios SQL (-- y /* */) manteniendo el mapeo de posiciones.
+    Elimina comentarios SQL (-- y /* */) manteniendo las posiciones.
+
+    Usa tokenize_sql(): los "--" o "/*" dentro de literales de texto ya no se
+    confunden con comentarios. Los comentarios se reemplazan por espacios
+    (manteniendo newlines), por lo que offset_limpio == offset_original y no
+    hace falta un mapeo carácter por carácter.
 
     Args:
         code: Código SQL original
+        with_position_map: Si es True, retorna también los rangos de comentarios
 
     Returns:
-        Tupla (código sin comentarios, mapeo de posiciones offset_limpio -> offset_original)
-    """
-    # Mapeo de posiciones
-    position_map = {}
-    result = []
-    i = 0
-    result_pos = 0
-
-    while i < len(code):
-        # Comentario de bloque /* ... */
-        if i < len(code) - 1 and code[i : i + 2] == "/*":
-            # Buscar el cierre */
-            end = code.find("*/", i + 2)
-            if end != -1:
-                # Reemplazar el comentario por espacios (mantener newlines para contar líneas)
-                comment_content = code[i : end + 2]
-                # Mantener newlines, reemplazar resto con espacios
-                cleaned = "".join("\n" if c == "\n" else " " for c in comment_content)
-                result.append(cleaned)
-                position_map[result_pos] = i
-                result_pos += len(cleaned)
-                i = end + 2
-                continue
-            else:
-                # Comentario sin cierre (error de sintaxis, pero lo manejamos)
-                i += 2
-                continue
+        Tupla (código sin comentarios, mapeo compacto o None). El mapeo es un
+        array plano [inicio_0, fin_0, inicio_1, fin_1, ...] con solo los rangos
+        que eran comentarios (fuera de ellos el offset es idéntico).
+    """
+    source = tokenize_sql(code)
+    cleaned = sql_source_cleaned(source)
+
+    if not with_position_map:
+        return cleaned, None
+
+    position_map = array("q")
+    for kind, start, end in iter_sql_tokens(source):
+        if kind == "comment":
+            position_map.append(start)
+            position_map.append(end)
+    return cleaned, position_map
+
+
+# ===== SCANNER DE ESTRUCTURA DE BLOQUES (PL/SQL) =====
+# Palabras clave que abren/cierran bloques + ";" (los identificadores entre comillas
+# se capturan para ignorarlos: "END" no es una palabra clave)
+BLOCK_KEYWORD_PATTERN = re.compile(
+    r'"[^"\n]*"|;|(?<![\w$#])(BEGIN|END|IS|AS|CASE|LOOP|IF|DECLARE|PROCEDURE|FUNCTION|LANGUAGE|EXTERNAL)(?![\w$#])',
+    re.IGNORECASE,
+)
+# Identificador que sigue a END (IF/LOOP/CASE o nombre opcional del bloque)
+END_LABEL_PATTERN = re.compile(r"\s*([A-Za-z_][\w$#]*|\"[^\"\n]*\")?")
+
+# Frames donde se declaran subprogramas (sección de declaraciones)
+DECLARATION_FRAMES = {"PACKAGE", "SUBPROGRAM_DECL", "DECLARE"}
+
+
+def scan_package_subprograms(code: str) -> Dict[int, Tuple[int, str]]:
+    """
+    Encuentra los límites de todos los PROCEDURE/FUNCTION de un package en UNA pasada.
 
-        # Comentario de línea --
-        if i < len(code) - 1 and code[i : i + 2] == "--":
-            # Buscar el fin de línea
-            end = code.find("\n", i)
-            if end != -1:
-                # Reemplazar comentario por espacios, mantener newline
-                comment_length = end - i
-                result.append(" " * comment_length + "\n")
-                position_map[result_pos] = i
-                result_pos += comment_length + 1
-                i = end + 1
+    Recorre las palabras clave de la vista "code" (sin comentarios ni literales)
+    manteniendo una pila de bloques abiertos:
+    - PACKAGE BODY ... IS/AS y PROCEDURE/FUNCTION ... IS/AS abren una sección de
+      declaraciones; BEGIN la convierte en cuerpo
+    - DECLARE/BEGIN, CASE, LOOP e IF anidados dentro de los cuerpos
+    - END IF / END LOOP / END CASE cierran su bloque; END [nombre] cierra el
+      bloque (o CASE expresión) más interno
+    - PROCEDURE/FUNCTION ... ; sin IS/AS es una declaración forward
+    - IS/AS LANGUAGE ... o EXTERNAL ... ; es un call spec (Java/C)
+
+    Así los overloads y los subprogramas anidados se resuelven a su propio END.
+
+    Args:
+        code: Código del package body (vista "code" del lexer)
+
+    Returns:
+        Diccionario {offset de la palabra PROCEDURE/FUNCTION: (offset_fin, método)}
+        con fin = posición después del ";" que cierra el subprograma. Métodos:
+        "block_end_named", "block_end", "forward_declaration", "call_spec".
+        Los subprogramas sin cierre (código desbalanceado) no se incluyen.
+    """
+    boundaries = {}
+    stack = []  # [tipo_frame, offset_subprograma]
+    header_start = None  # offset de PROCEDURE/FUNCTION mientras se lee el header
+    package_opened = False
+    call_spec_start = None  # subprograma con IS/AS LANGUAGE|EXTERNAL (termina en ;)
+    after_is = False
+    resume_at = 0  # fin de la etiqueta de un END (END IF, END LOOP, END nombre)
+
+    for token in BLOCK_KEYWORD_PATTERN.finditer(code):
+        if token.start() < resume_at:
+            continue
+        keyword = token.group(1)
+        if keyword is None:
+            if token.group() != ";":
+                continue  # identificador entre comillas
+            # ";" cierra un header sin IS/AS (forward) o un call spec
+            if header_start is not None:
+                boundaries[header_start] = (token.end(), "forward_declaration")
+                header_start = None
+            elif call_spec_start is not None:
+                boundaries[call_spec_start] = (token.end(), "call_spec")
+                call_spec_start = None
+                stack.pop()
+            after_is = False
+            continue
+
+        keyword = keyword.upper()
+        top = stack[-1][0] if stack else None
+
+        if after_is:
+            after_is = False
+            if keyword in ("LANGUAGE", "EXTERNAL") and top == "SUBPROGRAM_DECL":
+                call_spec_start = stack[-1][1]
                 continue
+
+        if not package_opened:
+            # Header del package: PACKAGE BODY nombre IS|AS
+            if keyword in ("IS", "AS"):
+                stack.append(["PACKAGE", None])
+                package_opened = True
+            continue
+
+        if header_start is not None:
+            # Header de subprograma: nombre (params) RETURN tipo ... IS|AS
+            if keyword in ("IS", "AS"):
+                stack.append(["SUBPROGRAM_DECL", header_start])
+                header_start = None
+                after_is = True
+            continue
+
+        if keyword in ("PROCEDURE", "FUNCTION"):
+            if top in DECLARATION_FRAMES:
+                header_start = token.start()
+        elif keyword == "BEGIN":
+            if top == "SUBPROGRAM_DECL":
+                stack[-1][0] = "SUBPROGRAM_BODY"
+            elif top == "DECLARE":
+                stack[-1][0] = "BLOCK"
+            elif top == "PACKAGE":
+                stack[-1][0] = "PACKAGE_INIT"
             else:
-                # Comentario hasta el final del archivo
-                result.append(" " * (len(code) - i))
-                position_map[result_pos] = i
-                break
+                stack.append(["BLOCK", None])
+        elif keyword == "DECLARE":
+            if top not in DECLARATION_FRAMES:
+                stack.append(["DECLARE", None])
+        elif keyword == "CASE":
+            stack.append(["CASE", None])
+        elif keyword in ("LOOP", "IF"):
+            if top not in DECLARATION_FRAMES:
+                stack.append([keyword, None])
+        elif keyword == "END" and stack:
+            label_match = END_LABEL_PATTERN.match(code, token.end())
+            label = (label_match.group(1) or "").upper()
+            resume_at = label_match.end()
+
+            if label in ("IF", "LOOP", "CASE"):
+                # END IF / END LOOP / END CASE: cerrar el bloque de ese tipo
+                while stack and stack[-1][0] != label:
+                    if stack[-1][0] not in ("CASE", "LOOP", "IF", "BLOCK"):
+                        break
+                    stack.pop()
+                if stack and stack[-1][0] == label:
+                    stack.pop()
+                continue
 
-        # Carácter normal
-        result.append(code[i])
-        position_map[result_pos] = i
-        result_pos += 1
-        i += 1
+            frame_type, subprogram_start = stack.pop()
+            if frame_type in ("SUBPROGRAM_BODY", "SUBPROGRAM_DECL"):
+                semicolon = code.find(";", token.end())
+                if semicolon == -1:
+                    continue
+                method = "block_end_named" if label else "block_end"
+                boundaries[subprogram_start] = (semicolon + 1, method)
 
-    return "".join(result), position_map
+    return boundaries
 
 
 def parse_package_internals(
-    package_code: str, package_name: str, package_id: str, package_line_start: int
+    package_code, package_name: str, package_id: str, package_line_start: int
 ) -> Tuple[List[Dict], Dict]:
     """
     Parsea PROCEDURES y FUNCTIONS dentro de un PACKAGE_BODY.
 
     Args:
-        package_code: Código completo del package body
+        package_code: Código completo del package body (str o source de tokenize_sql)
         package_name: Nombre del package
         package_id: ID del package en el manifest
         package_line_start: Línea donde inicia el package en el archivo fuente
@@ -454,8 +809,10 @@ def parse_package_internals(
     """
     internal_objects = []
 
-    # MEJORA V3: Eliminar comentarios antes de parsear
-    cleaned_code, position_map = remove_sql_comments(package_code)
+    # MEJORA V3: Parsear sobre la vista sin comentarios ni literales del lexer
+    source = as_sql_source(package_code)
+    package_code = source["text"]
+    cleaned_code = source["code"]
 
     # Patrón para encontrar PROCEDURE o FUNCTION (ya no necesita excluir comentarios manualmente)
     # Busca: PROCEDURE nombre o FUNCTION nombre (al inicio de línea o después de espacios)
@@ -464,6 +821,9 @@ def parse_package_internals(
 
     print(f"    Parseando {len(matches)} procedures/functions en {package_name}...")
 
+    # Límites de todos los subprogramas en una sola pasada (ver scan_package_subprograms)
+    boundaries = scan_package_subprograms(cleaned_code)
+
     for idx, match in enumerate(matches):
         obj_type = match.group(1).upper()  # PROCEDURE o FUNCTION
         obj_name = match.group(2).upper()
@@ -492,11 +852,13 @@ def parse_package_internals(
             if semicolon_match:
                 end_offset = start_offset + semicolon_match.end()
 
-                # Calcular líneas
-                lines_before_in_package = package_code[:start_offset].count("\n")
-                lines_in_object = package_code[start_offset:end_offset].count("\n") + 1
-                absolute_line_start = package_line_start + lines_before_in_package
-                absolute_line_end = absolute_line_start + lines_in_object - 1
+                # Calcular líneas (índice de líneas del package)
+                absolute_line_start = (
+                    package_line_start + source_line_at(source, start_offset) - 1
+                )
+                absolute_line_end = (
+                    package_line_start + source_line_at(source, end_offset) - 1
+                )
 
                 # Extraer el código Java
                 obj_code = package_code[start_offset:end_offset].strip()
@@ -524,76 +886,64 @@ def parse_package_internals(
                         "total_in_package": len(matches),
                         "java_call": java_call,
                         "migration_note": "Java Stored Function - Requiere conversión especial a PostgreSQL",
+                        "parsing_method": "java_stored_function",
                     }
                 )
                 continue  # Siguiente objeto
 
-        # ESTRATEGIA 1: Buscar END con el nombre específico del procedure/function
-        # Ejemplo: END dig_p_regla_agenda_new_prueba;
-        # Buscar en código limpio (sin comentarios)
-        end_pattern_named = rf"END\s+{re.escape(obj_name)}\s*;"
-        end_matches_named = list(
-            re.finditer(end_pattern_named, cleaned_code[start_offset:], re.IGNORECASE)
-        )
-
-        if end_matches_named:
-            # Encontrado END con nombre específico (más confiable)
-            end_offset = start_offset + end_matches_named[0].end()
+        if match.start(1) in boundaries:
+            # ESTRATEGIA 1: Límite del scanner de bloques (BEGIN/END/CASE/LOOP/IF)
+            end_offset, method = boundaries[match.start(1)]
         else:
-            # ESTRATEGIA 2: Si no hay END con nombre, buscar el siguiente PROCEDURE/FUNCTION
-            # y tomar el ÚLTIMO END; antes de ese punto
-            next_proc_pattern = r"^[ \t]*(PROCEDURE|FUNCTION)\s+\w+"
-            next_proc_matches = list(
-                re.finditer(
-                    next_proc_pattern,
-                    cleaned_code[start_offset + 10 :],
-                    re.IGNORECASE | re.MULTILINE,
-                )
-            )
-
-            if next_proc_matches:
-                # Hay otro procedure/function después
-                search_limit = start_offset + 10 + next_proc_matches[0].start()
+            # ESTRATEGIA 2 (código desbalanceado): END con el nombre del
+            # procedure/function, buscando desde start_offset sin copiar el resto
+            end_match_named = re.compile(
+                rf"END\s+{re.escape(obj_name)}\s*;", re.IGNORECASE
+            ).search(cleaned_code, start_offset)
+            if end_match_named:
+                end_offset = end_match_named.end()
+                method = "fallback_named_end"
             else:
-                # Es el último procedure/function del package
-                search_limit = len(cleaned_code)
-
-            # Buscar todos los END; en el rango (en código limpio)
-            end_pattern_generic = r"END\s*;"
-            end_matches_generic = list(
-                re.finditer(
-                    end_pattern_generic,
-                    cleaned_code[start_offset:search_limit],
-                    re.IGNORECASE,
+                # ESTRATEGIA 3: último END; antes del siguiente PROCEDURE/FUNCTION
+                search_limit = (
+                    matches[idx + 1].start()
+                    if idx + 1 < len(matches)
+                    else len(cleaned_code)
+                )
+                end_matches_generic = list(
+                    re.compile(r"END\s*;", re.IGNORECASE).finditer(
+                        cleaned_code, start_offset, search_limit
+                    )
                 )
-            )
 
-            if not end_matches_generic:
-                # No se encontró END, skip este objeto
-                # Calcular línea absoluta para el mensaje de error
-                lines_before = package_code[:start_offset].count("\n")
-                absolute_line = package_line_start + lines_before
+                if not end_matches_generic:
+                    # No se encontró END, skip este objeto
+                    # Calcular línea absoluta para el mensaje de error
+                    absolute_line = (
+                        package_line_start + source_line_at(source, start_offset) - 1
+                    )
 
-                log_parsing_error(
-                    f"No se encontró END para {obj_type} '{obj_name}' en package {package_name} (línea ~{absolute_line})",
-                    {
-                        "object_name": obj_name,
-                        "object_type": obj_type,
-                        "package": package_name,
-                        "line_start": absolute_line,
-                        "offset_in_package": start_offset,
-                    },
-                )
-                continue
+                    log_parsing_error(
+                        f"No se encontró END para {obj_type} '{obj_name}' en package {package_name} (línea ~{absolute_line})",
+                        {
+                            "object_name": obj_name,
+                            "object_type": obj_type,
+                            "package": package_name,
+                            "line_start": absolute_line,
+                            "offset_in_package": start_offset,
+                        },
+                    )
+                    continue
 
-            # Tomar el ÚLTIMO END; encontrado (más probable que sea el del procedure/function)
-            end_offset = start_offset + end_matches_generic[-1].end()
+                # Tomar el ÚLTIMO END; encontrado (más probable que sea el del procedure/function)
+                end_offset = end_matches_generic[-1].end()
+                method = "fallback_last_end"
 
-        # Calcular líneas
-        lines_before_in_package = package_code[:start_offset].count("\n")
-        lines_in_object = package_code[start_offset:end_offset].count("\n") + 1
-        absolute_line_start = package_line_start + lines_before_in_package
-        absolute_line_end = absolute_line_start + lines_in_object - 1
+        # Calcular líneas (índice de líneas del package, sin re-contar desde el inicio)
+        absolute_line_start = (
+            package_line_start + source_line_at(source, start_offset) - 1
+        )
+        absolute_line_end = package_line_start + source_line_at(source, end_offset) - 1
 
         # Código del objeto
         obj_code = package_code[start_offset:end_offset].strip()
@@ -615,20 +965,19 @@ def parse_package_internals(
                 "internal_to_package": True,
                 "procedure_index": idx + 1,
                 "total_in_package": len(matches),
+                "parsing_method": method,
             }
         )
 
     return internal_objects
 
 
-def create_package_context(
-    package_code: str, package_name: str, package_id: str
-) -> Dict:
+def create_package_context(package_code, package_name: str, package_id: str) -> Dict:
     """
     Extrae metadata y contexto de un package para compartir con procedures/functions.
 
     Args:
-        package_code: Código completo del package
+        package_code: Código completo del package (str o source de tokenize_sql)
         package_name: Nombre del package
         package_id: ID del package
 
@@ -650,13 +999,16 @@ def create_package_context(
     # MEJORA V6: Extraer TODAS las declaraciones globales del package
     # Sección global = entre "PACKAGE BODY ... IS" y el primer "PROCEDURE/FUNCTION"
 
-    # Eliminar comentarios primero
-    cleaned_code_for_vars, _ = remove_sql_comments(package_code)
+    # Tokenizar una sola vez: "code" para ubicar secciones, "cleaned" (literales
+    # intactos) para capturar valores de las declaraciones
+    source = as_sql_source(package_code)
+    cleaned_code = source["code"]
+    cleaned_code_for_vars = sql_source_cleaned(source)
 
     # Encontrar el primer PROCEDURE o FUNCTION
     first_proc_pattern = r"^[ \t]*(PROCEDURE|FUNCTION)\s+\w+"
     first_proc_match = re.search(
-        first_proc_pattern, cleaned_code_for_vars, re.IGNORECASE | re.MULTILINE
+        first_proc_pattern, cleaned_code, re.IGNORECASE | re.MULTILINE
     )
 
     if first_proc_match:
@@ -736,9 +1088,7 @@ def create_package_context(
     ]  # No limit - v7.6
 
     # MEJORA V4: Contar procedures y functions SIN comentarios
-    # Eliminar comentarios antes de contar (igual que parse_package_internals)
-    cleaned_code, _ = remove_sql_comments(package_code)
-
+    # Reutiliza la vista "code" del lexer (igual que parse_package_internals)
     # Usar el mismo pattern que parse_package_internals() para consistencia
     # Pattern: al inicio de línea o después de espacios (no dentro de comentarios)
     proc_pattern = r"^[ \t]*PROCEDURE\s+\w+"
@@ -754,14 +1104,14 @@ def create_package_context(
     return context
 
 
-def extract_global_declarations(code: str, _code_type: str = "body") -> Dict:
+def extract_global_declarations(code, _code_type: str = "body") -> Dict:
     """
     Extrae declaraciones globales de código Oracle (SPEC o BODY).
 
     VERSIÓN 7.0: Función reutilizable para extraer declaraciones de SPEC o BODY
 
     Args:
-        code: Código SQL del SPEC o BODY
+        code: Código SQL del SPEC o BODY (str o source de tokenize_sql)
         _code_type: "spec" o "body" (reservado para logging futuro)
 
     Returns:
@@ -780,13 +1130,14 @@ def extract_global_declarations(code: str, _code_type: str = "body") -> Dict:
         "exceptions": [],
     }
 
-    # Eliminar comentarios primero
-    cleaned_code, _ = remove_sql_comments(code)
+    # Tokenizar una sola vez (o reutilizar el source recibido)
+    source = as_sql_source(code)
+    cleaned_code = sql_source_cleaned(source)
 
-    # Encontrar el primer PROCEDURE o FUNCTION
+    # Encontrar el primer PROCEDURE o FUNCTION (fuera de comentarios y literales)
     first_proc_pattern = r"^[ \t]*(PROCEDURE|FUNCTION)\s+\w+"
     first_proc_match = re.search(
-        first_proc_pattern, cleaned_code, re.IGNORECASE | re.MULTILINE
+        first_proc_pattern, source["code"], re.IGNORECASE | re.MULTILINE
     )
 
     if first_proc_match:
@@ -869,132 +1220,139 @@ def extract_global_declarations(code: str, _code_type: str = "body") -> Dict:
     return declarations
 
 
-def extract_package_spec_code(package_name: str, spec_content: str) -> Optional[str]:
+# Detección de PACKAGE (SPEC) sobre la vista "code" de packages_spec.sql
+PACKAGE_SPEC_PATTERN = r"(?:CREATE\s+OR\s+REPLACE\s+)?PACKAGE\s+(?:\"?(\w+)\"?\.\"?(\w+)\"?|\"?(\w+)\"?)[^\n]*?\s+(IS|AS)"
+
+
+def build_spec_index(spec_content) -> Dict:
     """
-    Extrae el código del PACKAGE SPEC dado el nombre del package.
+    Indexa packages_spec.sql UNA sola vez: nombre del package → rango del SPEC.
 
-    VERSIÓN 7.5: Patrón flexible para packages con o sin CREATE OR REPLACE
+    VERSIÓN 7.7: Reemplaza el re.finditer sobre todo el SPEC por cada package body.
+
+    El nombre se obtiene con extract_object_name (igual que los BODY): soporta
+    "esquema"."nombre", esquema.nombre, "nombre" y nombre. Si un package aparece
+    más de una vez se conserva la primera ocurrencia.
 
     Args:
-        package_name: Nombre del package a buscar
-        spec_content: Contenido completo del archivo packages_spec.sql
+        spec_content: Contenido completo de packages_spec.sql (str o source de tokenize_sql)
 
     Returns:
-        Código del SPEC o None si no se encuentra
+        Diccionario con:
+        - source: source tokenizado del SPEC
+        - packages: {NOMBRE: {char_start, char_end, line_start, line_end}}
+          (las declaraciones se calculan al primer uso, ver lookup_package_spec)
     """
-    # Buscar el SPEC del package (con o sin CREATE OR REPLACE)
-    # FIXED v7.5: CREATE OR REPLACE es opcional
-    pattern = r"(?:CREATE\s+OR\s+REPLACE\s+)?PACKAGE\s+(?:\"?(\w+)\"?\.\"?(\w+)\"?|\"?(\w+)\"?)[^\n]*?\s+(IS|AS)"
-    matches = list(re.finditer(pattern, spec_content, re.IGNORECASE))
+    spec_source = as_sql_source(spec_content)
+    spec_code_view = spec_source["code"]
+    matches = list(re.finditer(PACKAGE_SPEC_PATTERN, spec_code_view, re.IGNORECASE))
 
+    packages = {}
     for i, match in enumerate(matches):
-        # Extraer nombre del package
-        groups = match.groups()
-        relevant_groups = [
-            g
-            for g in groups
-            if g is not None
-            and not re.match(r"^(OR|REPLACE|IS|AS|\s)+$", g, re.IGNORECASE)
-        ]
-
-        if len(relevant_groups) >= 2:
-            found_name = relevant_groups[1].upper()
-        else:
-            found_name = relevant_groups[-1].upper()
-
-        # Si es el package que buscamos, extraer su código
-        if found_name == package_name.upper():
-            start_pos = match.start()
+        package_name = extract_object_name(match)
+        if package_name in packages:
+            continue
 
-            # Encontrar el final del SPEC
-            if i + 1 < len(matches):
-                search_end = matches[i + 1].start()
-            else:
-                search_end = len(spec_content)
+        start_pos = match.start()
 
-            search_content = spec_content[start_pos:search_end]
-            end_pattern = rf"END\s+{re.escape(package_name)}\s*;"
-            end_match = re.search(end_pattern, search_content, re.IGNORECASE)
+        # Encontrar el final del SPEC (END nombre; o END "nombre";)
+        if i + 1 < len(matches):
+            search_end = matches[i + 1].start()
+        else:
+            search_end = len(spec_code_view)
 
-            if end_match:
-                actual_end = start_pos + end_match.end()
-            else:
-                actual_end = search_end
+        end_pattern = rf"END\s+\"?{re.escape(package_name)}\"?\s*;"
+        end_match = re.compile(end_pattern, re.IGNORECASE).search(
+            spec_code_view, start_pos, search_end
+        )
+        actual_end = end_match.end() if end_match else search_end
 
-            return spec_content[start_pos:actual_end].strip()
+        packages[package_name] = {
+            "char_start": start_pos,
+            "char_end": actual_end,
+            "line_start": source_line_at(spec_source, start_pos),
+            "line_end": source_line_at(spec_source, actual_end),
+        }
 
-    return None
+    return {"source": spec_source, "packages": packages}
 
 
-def extract_package_spec_with_lines(
-    package_name: str, spec_content: str
-) -> Optional[Tuple[str, int, int]]:
+def lookup_package_spec(spec_index: Dict, package_name: str) -> Optional[Dict]:
     """
-    Extrae el código del PACKAGE SPEC y sus líneas de inicio/fin.
+    Busca el SPEC de un package en el índice de build_spec_index.
 
-    VERSIÓN 7.5: Nueva función para consolidar SPEC en manifest.json
+    La primera vez que se consulta un package se extraen su código y sus
+    declaraciones públicas, que quedan cacheados en la entrada del índice.
 
     Args:
-        package_name: Nombre del package a buscar
-        spec_content: Contenido completo del archivo packages_spec.sql
+        spec_index: Índice retornado por build_spec_index
+        package_name: Nombre del package (sin esquema ni comillas)
 
     Returns:
-        Tupla (código, line_start, line_end) o None si no se encuentra
+        Entrada con char/line range, "code" y "declarations", o None si no existe
     """
-    # Buscar el SPEC del package (con o sin CREATE OR REPLACE)
-    # Formato 1: CREATE OR REPLACE PACKAGE nombre IS/AS
-    # Formato 2: PACKAGE nombre IS/AS (sin CREATE OR REPLACE)
-    # Formato 3: package nombre is/as (minúsculas)
-    pattern = r"(?:CREATE\s+OR\s+REPLACE\s+)?PACKAGE\s+(?:\"?(\w+)\"?\.\"?(\w+)\"?|\"?(\w+)\"?)[^\n]*?\s+(IS|AS)"
-    matches = list(re.finditer(pattern, spec_content, re.IGNORECASE))
+    entry = spec_index["packages"].get(package_name.strip('"').upper())
+    if entry is None:
+        return None
 
-    for i, match in enumerate(matches):
-        # Extraer nombre del package
-        groups = match.groups()
-        relevant_groups = [
-            g
-            for g in groups
-            if g is not None
-            and not re.match(r"^(OR|REPLACE|IS|AS|\s)+$", g, re.IGNORECASE)
-        ]
-
-        if len(relevant_groups) >= 2:
-            found_name = relevant_groups[1].upper()
-        else:
-            found_name = relevant_groups[-1].upper()
+    if "declarations" not in entry:
+        package_source = slice_sql_source(
+            spec_index["source"], entry["char_start"], entry["char_end"]
+        )
+        entry["code"] = package_source["text"]
+        entry["declarations"] = extract_global_declarations(package_source, "spec")
 
-        # Si es el package que buscamos, extraer su código y líneas
-        if found_name == package_name.upper():
-            start_pos = match.start()
+    return entry
 
-            # Encontrar el final del SPEC
-            if i + 1 < len(matches):
-                search_end = matches[i + 1].start()
-            else:
-                search_end = len(spec_content)
 
-            search_content = spec_content[start_pos:search_end]
-            end_pattern = rf"END\s+{re.escape(package_name)}\s*;"
-            end_match = re.search(end_pattern, search_content, re.IGNORECASE)
+def extract_package_spec_code(package_name: str, spec_content) -> Optional[str]:
+    """
+    Extrae el código del PACKAGE SPEC dado el nombre del package.
 
-            if end_match:
-                actual_end = start_pos + end_match.end()
-            else:
-                actual_end = search_end
+    VERSIÓN 7.5: Patrón flexible para packages con o sin CREATE OR REPLACE
 
-            # Calcular líneas
-            line_start = spec_content[:start_pos].count("\n") + 1
-            line_end = spec_content[:actual_end].count("\n") + 1
+    NOTA: Para varios packages, construir el índice una vez con build_spec_index.
 
-            spec_code = spec_content[start_pos:actual_end].strip()
+    Args:
+        package_name: Nombre del package a buscar
+        spec_content: Contenido completo de packages_spec.sql (str o source de tokenize_sql)
+
+    Returns:
+        Código del SPEC o None si no se encuentra
+    """
+    result = extract_package_spec_with_lines(package_name, spec_content)
+    return result[0] if result else None
+
+
+def extract_package_spec_with_lines(
+    package_name: str, spec_content
+) -> Optional[Tuple[str, int, int]]:
+    """
+    Extrae el código del PACKAGE SPEC y sus líneas de inicio/fin.
 
-            return (spec_code, line_start, line_end)
+    VERSIÓN 7.5: Nueva función para consolidar SPEC en manifest.json
 
-    return None
+    NOTA: Para varios packages, construir el índice una vez con build_spec_index.
+
+    Args:
+        package_name: Nombre del package a buscar
+        spec_content: Contenido completo de packages_spec.sql (str o source de tokenize_sql)
+
+    Returns:
+        Tupla (código, line_start, line_end) o None si no se encuentra
+    """
+    entry = lookup_package_spec(build_spec_index(spec_content), package_name)
+    if entry is None:
+        return None
+    return (entry["code"], entry["line_start"], entry["line_end"])
 
 
 def create_package_context_v7(
-    package_name: str, package_id: str, body_code: str, spec_code: Optional[str] = None
+    package_name: str,
+    package_id: str,
+    body_code,
+    spec_code=None,
+    spec_index: Optional[Dict] = None,
 ) -> Dict:
     """
     Extrae metadata y contexto de un package (SPEC + BODY).
@@ -1004,12 +1362,21 @@ def create_package_context_v7(
     Args:
         package_name: Nombre del package
         package_id: ID del package
-        body_code: Código completo del PACKAGE BODY
-        spec_code: Código completo del PACKAGE SPEC (opcional)
+        body_code: Código completo del PACKAGE BODY (str o source de tokenize_sql)
+        spec_code: Código completo del PACKAGE SPEC (opcional, str o source)
+        spec_index: Índice de build_spec_index; si se pasa, el SPEC del package
+            y sus declaraciones (ya extraídas) se buscan ahí en lugar de spec_code
 
     Returns:
         Diccionario con contexto del package distinguiendo público vs privado
     """
+    spec_declarations = None
+    if spec_index is not None:
+        spec_entry = lookup_package_spec(spec_index, package_name)
+        if spec_entry:
+            spec_code = spec_entry["code"]
+            spec_declarations = spec_entry["declarations"]
+
     context = {
         "package_name": package_name,
         "package_id": package_id,
@@ -1034,14 +1401,17 @@ def create_package_context_v7(
     }
 
     # Extraer declaraciones PÚBLICAS del SPEC (si existe)
-    if spec_code:
+    if spec_declarations is not None:
+        context["public_declarations"] = spec_declarations
+    elif spec_code:
         context["public_declarations"] = extract_global_declarations(spec_code, "spec")
 
     # Extraer declaraciones PRIVADAS del BODY
-    context["private_declarations"] = extract_global_declarations(body_code, "body")
+    body_source = as_sql_source(body_code)
+    context["private_declarations"] = extract_global_declarations(body_source, "body")
 
     # Contar procedures y functions en el BODY
-    cleaned_code, _ = remove_sql_comments(body_code)
+    cleaned_code = body_source["code"]
     proc_pattern = r"^[ \t]*PROCEDURE\s+\w+"
     func_pattern = r"^[ \t]*FUNCTION\s+\w+"
 
@@ -1064,8 +1434,105 @@ def save_package_context(context: Dict, package_id: str):
         json.dump(context, f, indent=2, ensure_ascii=False)
 
 
+# ===== MODO STREAMING (archivos de varios GB) =====
+# Delimitador de fin de objeto por tipo: los archivos de ALL_SOURCE (y TYPES/JOBS)
+# separan objetos con "/" en línea propia (garantizado por extract_all_objects.sql);
+# los DDL de DBMS_METADATA terminan cada sentencia con ";" al final de línea.
+STREAMING_DELIMITERS = {
+    "FUNCTION": "/",
+    "PROCEDURE": "/",
+    "PACKAGE_SPEC": "/",
+    "PACKAGE_BODY": "/",
+    "TRIGGER": "/",
+    "TYPE": "/",
+    "JOB": "/",
+    "VIEW": ";",
+    "MVIEW": ";",
+    "TABLE": ";",
+    "SEQUENCE": ";",
+    "DIRECTORY": ";",
+    "PRIMARY_KEY": ";",
+    "FOREIGN_KEY": ";",
+}
+
+
+# Detección de PACKAGE BODY (se aplica sobre la vista "code" del lexer)
+PACKAGE_BODY_PATTERN = r"(?:CREATE\s+OR\s+REPLACE\s+)?PACKAGE\s+BODY\s+(?:\"?(\w+)\"?\.\"?(\w+)\"?|\"?(\w+)\"?)[^\n]*?\s+(IS|AS)"
+
+
+def is_block_delimiter(line: str, delimiter: str) -> bool:
+    """Indica si la línea cierra un bloque top-level para el delimitador dado."""
+    stripped = line.strip()
+    if delimiter == "/":
+        return stripped == "/"
+    return stripped.endswith(";") and not stripped.startswith("--")
+
+
+def read_sql_blocks(file_path: Path, object_type: str, streaming: bool = False):
+    """
+    Lee un archivo SQL completo o por bloques de líneas delimitados.
+
+    En modo streaming el archivo se recorre línea a línea y solo se mantiene en
+    memoria el bloque actual (uno o pocos objetos). Los offsets se calculan en
+    caracteres (no bytes), igual que con f.read().
+
+    Args:
+        file_path: Ruta al archivo SQL
+        object_type: Tipo de objeto (define el delimitador, ver STREAMING_DELIMITERS)
+        streaming: Si es False, retorna el archivo completo como un solo bloque
+
+    Yields:
+        Tupla (texto_del_bloque, char_offset, line_offset) con los caracteres y
+        saltos de línea del archivo anteriores al bloque
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        if not streaming:
+            yield f.read(), 0, 0
+            return
+
+        delimiter = STREAMING_DELIMITERS.get(object_type, "/")
+        char_offset = 0
+        line_offset = 0
+        lines = []
+        delimiter_seen = False
+
+        for line in f:
+            # Las líneas en blanco y comentarios después del delimitador pertenecen
+            # al bloque actual: así cada bloque termina donde empieza el siguiente
+            # objeto, igual que el rango de búsqueda del modo completo
+            stripped = line.strip()
+            if delimiter_seen and stripped and not stripped.startswith("--"):
+                block = "".join(lines)
+                yield block, char_offset, line_offset
+                char_offset += len(block)
+                line_offset += block.count("\n")
+                lines = []
+                delimiter_seen = False
+
+            lines.append(line)
+            if is_block_delimiter(line, delimiter):
+                delimiter_seen = True
+
+        if lines:
+            yield "".join(lines), char_offset, line_offset
+
+
+def rebase_char_offsets(objects: List[Dict], char_base: int):
+    """Convierte char_start/char_end de un bloque en offsets absolutos del archivo."""
+    if not char_base:
+        return
+    for obj in objects:
+        if "char_start" in obj:
+            obj["char_start"] += char_base
+            obj["char_end"] += char_base
+
+
 def parse_sql_file_robust(
-    file_path: Path, object_type: str, spec_content: Optional[str] = None
+    file_path: Path,
+    object_type: str,
+    spec_content: Optional[str] = None,
+    streaming: bool = False,
+    jobs: int = 1,
 ) -> List[Dict]:
     """
     Parsea archivo SQL grande y extrae objetos individuales (VERSIÓN ROBUSTA v2).
@@ -1083,6 +1550,10 @@ def parse_sql_file_robust(
         file_path: Ruta al archivo SQL
         object_type: Tipo de objeto (FUNCTION, PROCEDURE, PACKAGE, etc.)
         spec_content: Contenido completo de packages_spec.sql (solo para PACKAGE_BODY)
+        streaming: Si es True, lee el archivo por bloques delimitados (ver read_sql_blocks)
+            en lugar de cargarlo completo. Genera las mismas entradas del manifest.
+        jobs: Procesos para parsear los packages en paralelo (solo PACKAGE_BODY,
+            ver parse_package_blocks_parallel)
 
     Returns:
         Lista de diccionarios con metadata de cada objeto
@@ -1094,17 +1565,256 @@ def parse_sql_file_robust(
         print(f"⚠️  Archivo no encontrado: {file_path}")
         return []
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    if jobs > 1 and object_type == "PACKAGE_BODY":
+        objects = parse_package_blocks_parallel(file_path, spec_content, jobs)
+        print(f"  ✅ Encontrados {len(objects)} objetos de tipo {object_type}")
+        return objects
+
+    # packages_spec.sql se tokeniza e indexa una sola vez para todos los packages
+    spec_index = build_spec_index(spec_content) if spec_content else None
+
+    objects = []
+    index_base = 0
+
+    for content, char_base, line_base in read_sql_blocks(
+        file_path, object_type, streaming
+    ):
+        block_objects, block_count = parse_sql_content(
+            content, file_path.name, object_type, spec_index, line_base, index_base
+        )
+        rebase_char_offsets(block_objects, char_base)
+        objects.extend(block_objects)
+        index_base += block_count
+
+    print(f"  ✅ Encontrados {len(objects)} objetos de tipo {object_type}")
+    return objects
+
+
+# ===== PARSING PARALELO DE PACKAGES (intra-archivo) =====
+# Índice de packages_spec.sql en cada worker (ver _init_package_worker)
+_worker_spec_content = None
+_worker_spec_index = None
+
+
+def run_captured(func, *args) -> Tuple:
+    """
+    Ejecuta func(*args) capturando la salida por consola y los parsing_errors.
+
+    Se usa en los workers de los pools (y en el proceso principal cuando un paso
+    corre en paralelo con otros) para mostrar la salida y registrar los errores
+    en orden determinista.
+
+    Returns:
+        Tupla (resultado, parsing_errors, salida_consola)
+    """
+    import contextlib
+    import io
+
+    previous_errors = parsing_errors[:]
+    parsing_errors.clear()
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            result = func(*args)
+        errors = parsing_errors[:]
+    finally:
+        parsing_errors[:] = previous_errors
+
+    return result, errors, output.getvalue()
+
+
+def _init_package_worker(spec_content: Optional[str]):
+    """Inicializa un worker del pool de packages con el contenido del SPEC."""
+    global _worker_spec_content, _worker_spec_index
+    _worker_spec_content = spec_content
+    _worker_spec_index = None
+
+
+# Cabecera de PACKAGE BODY al inicio de una línea del texto sin tokenizar: estima
+# el index_base de cada bloque sin pasar el lexer (se verifica al parsear)
+PACKAGE_BODY_HEADER_PATTERN = re.compile(
+    r"^[ \t]*" + PACKAGE_BODY_PATTERN, re.IGNORECASE | re.MULTILINE
+)
+
+
+def estimate_package_bodies(content: str) -> int:
+    """PACKAGE BODY de un bloque según sus cabeceras, sin lexer (proceso principal)."""
+    return sum(1 for _ in PACKAGE_BODY_HEADER_PATTERN.finditer(content))
+
+
+def _parse_package_block(
+    content: str, file_name: str, char_base: int, line_base: int, index_base: int
+) -> Tuple[List[Dict], int]:
+    """
+    Parsea un bloque de packages_body.sql en un worker (offsets absolutos).
+
+    Returns:
+        Tupla (objetos, PACKAGE BODY top-level encontrados por el lexer)
+    """
+    global _worker_spec_index
+    # El SPEC se indexa una sola vez por worker, en el primer bloque
+    if _worker_spec_index is None and _worker_spec_content:
+        _worker_spec_index = build_spec_index(_worker_spec_content)
+
+    objects, count = parse_sql_content(
+        content, file_name, "PACKAGE_BODY", _worker_spec_index, line_base, index_base
+    )
+    rebase_char_offsets(objects, char_base)
+    return objects, count
+
+
+def parse_package_blocks_parallel(
+    file_path: Path, spec_content: Optional[str], jobs: int
+) -> List[Dict]:
+    """
+    Parsea packages_body.sql en un pool de procesos, un bloque por package.
+
+    El archivo se divide en los delimitadores "/" top-level (los mismos bloques
+    del modo streaming). Los IDs de packages (obj_1NNNN) dependen de cuántos
+    packages hay antes de cada bloque:
+    1. El proceso principal cuenta las cabeceras PACKAGE BODY de cada bloque con
+       una regex sobre el texto (sin lexer) → index_base acumulado
+    2. Cada worker tokeniza y parsea su bloque una sola vez y retorna cuántos
+       PACKAGE BODY encontró el lexer
+    Si algún conteo no coincide (p. ej. una cabecera dentro de un comentario
+    /* */), los index_base estaban corridos: se re-parsea el archivo en el
+    proceso principal con los conteos reales y se borran los contextos de
+    package escritos con IDs que ya no existen.
+
+    char_start, line_start y los object_id de packages e hijos quedan idénticos
+    a los del parsing secuencial; salida y parsing_errors se agregan en orden.
+
+    Args:
+        file_path: Ruta a packages_body.sql
+        spec_content: Contenido de packages_spec.sql (None si no existe)
+        jobs: Número de procesos
+
+    Returns:
+        Lista de objetos (packages + procedures/functions internos) en orden de archivo
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    blocks = list(read_sql_blocks(file_path, "PACKAGE_BODY", streaming=True))
+    contents = [content for content, _, _ in blocks]
+    chunksize = max(1, len(blocks) // (jobs * 4))
+    print(f"   ⚡ {len(blocks)} bloques en {jobs} procesos")
+
+    estimates = [estimate_package_bodies(content) for content in contents]
+    index_bases = []
+    index_base = 0
+    for estimate in estimates:
+        index_bases.append(index_base)
+        index_base += estimate
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_package_worker, initargs=(spec_content,)
+    ) as executor:
+        results = list(
+            executor.map(
+                run_captured,
+                [_parse_package_block] * len(blocks),
+                contents,
+                [file_path.name] * len(blocks),
+                [char_base for _, char_base, _ in blocks],
+                [line_base for _, _, line_base in blocks],
+                index_bases,
+                chunksize=chunksize,
+            )
+        )
+
+    counts = [count for (_, count), _, _ in results]
+    if counts != estimates:
+        print("   ⚠️  Conteo de packages distinto al estimado: re-parseo secuencial")
+        stale_ids = {
+            obj["object_id"]
+            for (block_objects, _), _, _ in results
+            for obj in block_objects
+            if obj["object_type"] == "PACKAGE_BODY"
+        }
+        _init_package_worker(spec_content)
+        results = []
+        index_base = 0
+        for content, char_base, line_base in blocks:
+            result = run_captured(
+                _parse_package_block,
+                content,
+                file_path.name,
+                char_base,
+                line_base,
+                index_base,
+            )
+            index_base += result[0][1]
+            results.append(result)
+
+        for (block_objects, _), _, _ in results:
+            for obj in block_objects:
+                stale_ids.discard(obj["object_id"])
+        for package_id in stale_ids:
+            (PACKAGES_CONTEXT_DIR / f"{package_id}_context.json").unlink(
+                missing_ok=True
+            )
+
+    objects = []
+    for (block_objects, _), errors, output in results:
+        print(output, end="")
+        parsing_errors.extend(errors)
+        objects.extend(block_objects)
+
+    return objects
+
+
+def follows_delimiter(cleaned_content: str, start_pos: int) -> bool:
+    """
+    Indica si start_pos está al inicio del texto o después de un delimitador /.
+
+    Entre medio solo puede haber whitespace: en la vista "code" los comentarios
+    ya están en blanco, así que una cabecera /* ... */ de cualquier largo entre
+    el / y el objeto no cambia el resultado (ni su posición en un bloque).
+    """
+    pos = start_pos - 1
+    while pos >= 0 and cleaned_content[pos].isspace():
+        pos -= 1
+    if pos < 0:
+        return True
+    return cleaned_content[pos] == "/" and "\n" in cleaned_content[pos:start_pos]
+
+
+def parse_sql_content(
+    content: str,
+    file_name: str,
+    object_type: str,
+    spec_index: Optional[Dict] = None,
+    line_base: int = 0,
+    index_base: int = 0,
+) -> Tuple[List[Dict], int]:
+    """
+    Extrae los objetos de un texto SQL (archivo completo o bloque en modo streaming).
+
+    Args:
+        content: Texto a parsear
+        file_name: Nombre del archivo fuente (para source_file)
+        object_type: Tipo de objeto (FUNCTION, PROCEDURE, PACKAGE_BODY, etc.)
+        spec_index: Índice de packages_spec.sql (build_spec_index, solo PACKAGE_BODY)
+        line_base: Líneas del archivo anteriores a content (números de línea absolutos)
+        index_base: Objetos top-level ya numerados en bloques anteriores
+
+    Returns:
+        Tupla (objetos con char_start/char_end relativos a content, cantidad de
+        objetos top-level encontrados)
+    """
+    # Tokenizar el texto UNA sola vez: detección, fin de objeto, validación y
+    # parsing de packages reutilizan este source (sin volver a escanear el texto)
+    # MEJORA V7.2: Parsear sin comentarios (ni literales) para evitar falsos positivos
+    # Ejemplo: "-- Procedure anidado nivel 1" no debe ser capturado como procedure
+    source = tokenize_sql(content)
+    source["line_base"] = line_base
+    cleaned_content = source["code"]
 
     objects = []
+    matches = []
 
     # Patrones de detección según tipo de objeto
     if object_type in ["FUNCTION", "PROCEDURE"]:
-        # MEJORA V7.2: Eliminar comentarios antes de parsear para evitar falsos positivos
-        # Ejemplo: "-- Procedure anidado nivel 1" no debe ser capturado como procedure
-        cleaned_content, position_map = remove_sql_comments(content)
-
         # Pattern flexible: acepta con o sin CREATE OR REPLACE
         # Formato ALL_SOURCE: "FUNCTION nombre" o "procedure              nombre" o con comillas
         # Formato DBMS_METADATA: "CREATE OR REPLACE FUNCTION nombre"
@@ -1119,9 +1829,10 @@ def parse_sql_file_robust(
         # MEJORA V4.1: Filtrar solo funciones/procedimientos TOP-LEVEL (no anidados)
         # Las funciones anidadas tienen FUNCTION dentro del cuerpo de otra función
         # Las funciones top-level tienen uno de estos contextos:
-        # 1. Inicio del archivo (solo whitespace antes)
+        # 1. Inicio del archivo o del bloque (solo whitespace/comentarios antes)
         # 2. Precedidas por CREATE OR REPLACE
-        # 3. Precedidas por delimitador / en línea anterior (separa objetos en ALL_SOURCE)
+        # 3. Precedidas por delimitador / (separa objetos en ALL_SOURCE), aunque haya
+        #    comentarios en medio
 
         matches = []
         for match in all_matches:
@@ -1141,16 +1852,11 @@ def parse_sql_file_robust(
             ):
                 is_top_level = True
 
-            # CASO 2: Al inicio del archivo (solo whitespace/comentarios antes)
-            elif start_pos < 100 and re.match(
-                r"^[\s\n\r]*$", cleaned_content[:start_pos]
-            ):
-                is_top_level = True
-
+            # CASO 2: Al inicio del archivo o del bloque (modo streaming)
             # CASO 3: Precedido por delimitador / (separa objetos)
-            # Buscar / en línea propia antes del FUNCTION/PROCEDURE
-            # Formato: END nombre; / \n\n FUNCTION siguiente
-            elif re.search(r"/\s*\n[\s\n]*$", context_before, re.DOTALL):
+            # Formato: END nombre; / \n /* cabecera */ \n FUNCTION siguiente
+            # Solo whitespace/comentarios en medio, sin importar su largo
+            elif follows_delimiter(cleaned_content, start_pos):
                 is_top_level = True
 
             if is_top_level:
@@ -1159,7 +1865,7 @@ def parse_sql_file_robust(
                 # Loguear funciones anidadas omitidas (para debugging)
                 nested_name = extract_object_name(match)
                 # Usar content original para calcular líneas (limpio tiene mismas posiciones)
-                line_num = content[:start_pos].count("\n") + 1
+                line_num = source_line_at(source, start_pos)
                 print(
                     f"      🔸 Omitida función anidada: {nested_name} (línea {line_num})"
                 )
@@ -1169,6 +1875,7 @@ def parse_sql_file_robust(
         )
 
         for i, match in enumerate(matches):
+            object_started = time.perf_counter()
             start_pos = match.start()
             end_pos = matches[i + 1].start() if i < len(matches) - 1 else len(content)
 
@@ -1177,14 +1884,15 @@ def parse_sql_file_robust(
 
             # Encontrar END de forma robusta
             actual_end, method = find_object_end_robust(
-                content, start_pos, end_pos, object_name, object_type
+                cleaned_content, start_pos, end_pos, object_name, object_type
             )
 
-            object_code = content[start_pos:actual_end].strip()
+            object_source = slice_sql_source(source, start_pos, actual_end)
+            object_code = object_source["text"]
 
             # Validar código extraído
             is_valid, error_msg = validate_extracted_code(
-                object_code, object_name, object_type
+                object_code, object_name, object_type, object_source
             )
 
             if not is_valid:
@@ -1193,22 +1901,22 @@ def parse_sql_file_robust(
                     {
                         "object_name": object_name,
                         "object_type": object_type,
-                        "line_start": content[:start_pos].count("\n") + 1,
+                        "line_start": source_line_at(source, start_pos),
                         "method": method,
                         "validation_error": error_msg,
                     },
                 )
 
             # Calcular líneas
-            lines_before = content[:start_pos].count("\n") + 1
+            lines_before = source_line_at(source, start_pos)
             lines_in_object = object_code.count("\n") + 1
 
             # Construir objeto base
             obj = {
-                "object_id": f"{object_type.lower()}_{i + 1:04d}",
+                "object_id": f"{object_type.lower()}_{index_base + i + 1:04d}",
                 "object_name": object_name,
                 "object_type": object_type,
-                "source_file": file_path.name,
+                "source_file": file_name,
                 "line_start": lines_before,
                 "line_end": lines_before + lines_in_object - 1,
                 "char_start": start_pos,
@@ -1217,6 +1925,7 @@ def parse_sql_file_robust(
                 "status": "pending",
                 "parsing_method": method,
                 "validation_status": "valid" if is_valid else "warning",
+                "parse_seconds": time.perf_counter() - object_started,
             }
 
             # MEJORA V7.3: Detectar y marcar Java Stored Functions
@@ -1238,29 +1947,31 @@ def parse_sql_file_robust(
             objects.append(obj)
 
     elif object_type == "PACKAGE_SPEC":
-        # MEJORA: Eliminar comentarios antes de parsear para evitar falsos positivos
+        # Detección sobre cleaned_content (sin comentarios ni literales)
         # Ejemplo: "-- Este PACKAGE es importante IS necesario" no debe ser capturado
-        cleaned_content, _ = remove_sql_comments(content)
 
         # Patrón flexible: acepta con o sin CREATE OR REPLACE
         # Formato ALL_SOURCE: "package nombre IS" o "PACKAGE nombre AS" o con comillas
         # Formato DBMS_METADATA: "CREATE OR REPLACE PACKAGE nombre IS"
         # FIXED v7.4: Añadido soporte para nombres con comillas dobles sin esquema
-        pattern = r"(?:CREATE\s+OR\s+REPLACE\s+)?PACKAGE\s+(?:\"?(\w+)\"?\.\"?(\w+)\"?|\"?(\w+)\"?)[^\n]*?\s+(IS|AS)"
-        matches = list(re.finditer(pattern, cleaned_content, re.IGNORECASE))
+        matches = list(
+            re.finditer(PACKAGE_SPEC_PATTERN, cleaned_content, re.IGNORECASE)
+        )
 
         for i, match in enumerate(matches):
+            object_started = time.perf_counter()
             start_pos = match.start()
             end_pos = matches[i + 1].start() if i < len(matches) - 1 else len(content)
 
             object_name = extract_object_name(match)
             actual_end, method = find_object_end_robust(
-                content, start_pos, end_pos, object_name, object_type
+                cleaned_content, start_pos, end_pos, object_name, object_type
             )
 
-            object_code = content[start_pos:actual_end].strip()
+            object_source = slice_sql_source(source, start_pos, actual_end)
+            object_code = object_source["text"]
             is_valid, error_msg = validate_extracted_code(
-                object_code, object_name, object_type
+                object_code, object_name, object_type, object_source
             )
 
             if not is_valid:
@@ -1269,21 +1980,21 @@ def parse_sql_file_robust(
                     {
                         "object_name": object_name,
                         "object_type": object_type,
-                        "line_start": content[:start_pos].count("\n") + 1,
+                        "line_start": source_line_at(source, start_pos),
                         "method": method,
                         "validation_error": error_msg,
                     },
                 )
 
-            lines_before = content[:start_pos].count("\n") + 1
+            lines_before = source_line_at(source, start_pos)
             lines_in_object = object_code.count("\n") + 1
 
             objects.append(
                 {
-                    "object_id": f"pkg_spec_{i + 1:04d}",
+                    "object_id": f"pkg_spec_{index_base + i + 1:04d}",
                     "object_name": object_name,
                     "object_type": "PACKAGE_SPEC",
-                    "source_file": file_path.name,
+                    "source_file": file_name,
                     "line_start": lines_before,
                     "line_end": lines_before + lines_in_object - 1,
                     "char_start": start_pos,
@@ -1292,34 +2003,37 @@ def parse_sql_file_robust(
                     "status": "pending",
                     "parsing_method": method,
                     "validation_status": "valid" if is_valid else "warning",
+                    "parse_seconds": time.perf_counter() - object_started,
                 }
             )
 
     elif object_type == "PACKAGE_BODY":
-        # MEJORA: Eliminar comentarios antes de parsear para evitar falsos positivos
+        # Detección sobre cleaned_content (sin comentarios ni literales)
         # Ejemplo: "-- Este PACKAGE BODY es crítico IS fundamental" no debe ser capturado
-        cleaned_content, _ = remove_sql_comments(content)
 
         # VERSIÓN 4.0: Parsing granular de packages
         # Patrón flexible: acepta con o sin CREATE OR REPLACE
         # Formato ALL_SOURCE: "package body nombre is" (case insensitive, espacios variables) o con comillas
         # Formato DBMS_METADATA: "CREATE OR REPLACE PACKAGE BODY nombre IS"
         # FIXED v7.4: Añadido soporte para nombres con comillas dobles sin esquema
-        pattern = r"(?:CREATE\s+OR\s+REPLACE\s+)?PACKAGE\s+BODY\s+(?:\"?(\w+)\"?\.\"?(\w+)\"?|\"?(\w+)\"?)[^\n]*?\s+(IS|AS)"
-        matches = list(re.finditer(pattern, cleaned_content, re.IGNORECASE))
+        matches = list(
+            re.finditer(PACKAGE_BODY_PATTERN, cleaned_content, re.IGNORECASE)
+        )
 
         for i, match in enumerate(matches):
+            object_started = time.perf_counter()
             start_pos = match.start()
             end_pos = matches[i + 1].start() if i < len(matches) - 1 else len(content)
 
             object_name = extract_object_name(match)
             actual_end, method = find_object_end_robust(
-                content, start_pos, end_pos, object_name, object_type
+                cleaned_content, start_pos, end_pos, object_name, object_type
             )
 
-            object_code = content[start_pos:actual_end].strip()
+            object_source = slice_sql_source(source, start_pos, actual_end)
+            object_code = object_source["text"]
             is_valid, error_msg = validate_extracted_code(
-                object_code, object_name, object_type
+                object_code, object_name, object_type, object_source
             )
 
             if not is_valid:
@@ -1328,47 +2042,50 @@ def parse_sql_file_robust(
                     {
                         "object_name": object_name,
                         "object_type": object_type,
-                        "line_start": content[:start_pos].count("\n") + 1,
+                        "line_start": source_line_at(source, start_pos),
                         "method": method,
                         "validation_error": error_msg,
                     },
                 )
 
-            lines_before = content[:start_pos].count("\n") + 1
+            lines_before = source_line_at(source, start_pos)
             lines_in_object = object_code.count("\n") + 1
-            package_id = f"obj_{10000 + i:05d}"  # IDs consistentes para packages
+            package_id = (
+                f"obj_{10000 + index_base + i:05d}"  # IDs consistentes para packages
+            )
 
             # ===== NUEVO EN V4.0: PARSING GRANULAR =====
             # 1. Parsear procedures/functions internos
             internal_objects = parse_package_internals(
-                object_code, object_name, package_id, lines_before
+                object_source, object_name, package_id, lines_before
             )
 
             # 2. Crear contexto del package (V7.5: SPEC + BODY consolidado en manifest)
-            # Buscar el SPEC correspondiente si spec_content está disponible
+            # Buscar el SPEC correspondiente en el índice (V7.7: O(1) por package)
             spec_code = None
             spec_line_start = None
             spec_line_end = None
-            spec_result = None
 
-            if spec_content:
-                spec_result = extract_package_spec_with_lines(object_name, spec_content)
-                if spec_result:
-                    spec_code, spec_line_start, spec_line_end = spec_result
+            if spec_index:
+                spec_entry = lookup_package_spec(spec_index, object_name)
+                if spec_entry:
+                    spec_code = spec_entry["code"]
+                    spec_line_start = spec_entry["line_start"]
+                    spec_line_end = spec_entry["line_end"]
                     print(
                         f"      📝 SPEC encontrado para {object_name} (líneas {spec_line_start}-{spec_line_end})"
                     )
 
             # Usar V7 si tenemos SPEC, V6 si solo tenemos BODY
-            if spec_code or spec_content:
+            if spec_code or spec_index:
                 # V7: Distingue entre público (SPEC) y privado (BODY)
                 pkg_context = create_package_context_v7(
-                    object_name, package_id, object_code, spec_code
+                    object_name, package_id, object_source, spec_index=spec_index
                 )
             else:
                 # V6: Solo declaraciones privadas (BODY) - compatibilidad hacia atrás
                 pkg_context = create_package_context(
-                    object_code, object_name, package_id
+                    object_source, object_name, package_id
                 )
                 # Adaptar formato V6 a V7 para consistencia
                 pkg_context = {
@@ -1402,7 +2119,7 @@ def parse_sql_file_robust(
                 "object_id": package_id,
                 "object_name": object_name,
                 "object_type": "PACKAGE_BODY",
-                "source_file": file_path.name,
+                "source_file": file_name,
                 "line_start": lines_before,
                 "line_end": lines_before + lines_in_object - 1,
                 "char_start": start_pos,
@@ -1416,6 +2133,7 @@ def parse_sql_file_robust(
                 "total_procedures": pkg_context["total_procedures"],
                 "total_functions": pkg_context["total_functions"],
                 "children": [obj["object_id"] for obj in internal_objects],
+                "parse_seconds": time.perf_counter() - object_started,
             }
 
             # V7.5: Agregar información del SPEC directamente al manifest
@@ -1448,9 +2166,8 @@ def parse_sql_file_robust(
             )
 
     elif object_type == "TRIGGER":
-        # MEJORA: Eliminar comentarios antes de parsear para evitar falsos positivos
+        # Detección sobre cleaned_content (sin comentarios ni literales)
         # Ejemplo: "-- Este TRIGGER debe ejecutarse automáticamente" no debe ser capturado
-        cleaned_content, _ = remove_sql_comments(content)
 
         # Patrón flexible: acepta con o sin CREATE OR REPLACE
         # Formato ALL_SOURCE: "trigger nombre" o 'TRIGGER "nombre"' (con comillas)
@@ -1460,17 +2177,19 @@ def parse_sql_file_robust(
         matches = list(re.finditer(pattern, cleaned_content, re.IGNORECASE))
 
         for i, match in enumerate(matches):
+            object_started = time.perf_counter()
             start_pos = match.start()
             end_pos = matches[i + 1].start() if i < len(matches) - 1 else len(content)
 
             object_name = extract_object_name(match)
             actual_end, method = find_object_end_robust(
-                content, start_pos, end_pos, object_name, object_type
+                cleaned_content, start_pos, end_pos, object_name, object_type
             )
 
-            object_code = content[start_pos:actual_end].strip()
+            object_source = slice_sql_source(source, start_pos, actual_end)
+            object_code = object_source["text"]
             is_valid, error_msg = validate_extracted_code(
-                object_code, object_name, object_type
+                object_code, object_name, object_type, object_source
             )
 
             if not is_valid:
@@ -1479,15 +2198,15 @@ def parse_sql_file_robust(
                     {"object_name": object_name, "object_type": object_type},
                 )
 
-            lines_before = content[:start_pos].count("\n") + 1
+            lines_before = source_line_at(source, start_pos)
             lines_in_object = object_code.count("\n") + 1
 
             objects.append(
                 {
-                    "object_id": f"trigger_{i + 1:04d}",
+                    "object_id": f"trigger_{index_base + i + 1:04d}",
                     "object_name": object_name,
                     "object_type": "TRIGGER",
-                    "source_file": file_path.name,
+                    "source_file": file_name,
                     "line_start": lines_before,
                     "line_end": lines_before + lines_in_object - 1,
                     "char_start": start_pos,
@@ -1496,13 +2215,13 @@ def parse_sql_file_robust(
                     "status": "pending",
                     "parsing_method": method,
                     "validation_status": "valid" if is_valid else "warning",
+                    "parse_seconds": time.perf_counter() - object_started,
                 }
             )
 
     elif object_type in ["VIEW", "MVIEW"]:
-        # MEJORA: Eliminar comentarios antes de parsear para evitar falsos positivos
+        # Detección sobre cleaned_content (sin comentarios ni literales)
         # Ejemplo: "-- Nota: CREATE OR REPLACE VIEW usuarios debe incluir..." no debe ser capturado
-        cleaned_content, _ = remove_sql_comments(content)
 
         # FIXED v7.4: Añadido soporte para nombres con comillas dobles sin esquema
         if object_type == "VIEW":
@@ -1513,10 +2232,11 @@ def parse_sql_file_robust(
         matches = list(re.finditer(pattern, cleaned_content, re.IGNORECASE))
 
         for i, match in enumerate(matches):
+            object_started = time.perf_counter()
             start_pos = match.start()
             end_pos = matches[i + 1].start() if i < len(matches) - 1 else len(content)
 
-            semicolon_search = content[start_pos:end_pos]
+            semicolon_search = cleaned_content[start_pos:end_pos]
             semicolon_match = re.search(r";", semicolon_search)
 
             actual_end = (
@@ -1525,43 +2245,86 @@ def parse_sql_file_robust(
             object_name = extract_object_name(match)
             object_code = content[start_pos:actual_end].strip()
 
-            lines_before = content[:start_pos].count("\n") + 1
+            lines_before = source_line_at(source, start_pos)
             lines_in_object = object_code.count("\n") + 1
 
             object_id_prefix = "view" if object_type == "VIEW" else "mview"
 
             objects.append(
                 {
-                    "object_id": f"{object_id_prefix}_{i + 1:04d}",
+                    "object_id": f"{object_id_prefix}_{index_base + i + 1:04d}",
                     "object_name": object_name,
                     "object_type": object_type,
-                    "source_file": file_path.name,
+                    "source_file": file_name,
                     "line_start": lines_before,
                     "line_end": lines_before + lines_in_object - 1,
                     "char_start": start_pos,
                     "char_end": actual_end,
                     "code_length": actual_end - start_pos,
                     "status": "pending",
+                    "parse_seconds": time.perf_counter() - object_started,
                 }
             )
 
-    print(f"  ✅ Encontrados {len(objects)} objetos de tipo {object_type}")
-    return objects
+    return objects, len(matches)
 
 
-def parse_reference_objects(file_path: Path, object_type: str) -> List[Dict]:
-    """Parsea objetos de referencia (DDL, Types, etc.)."""
+def parse_reference_objects(
+    file_path: Path, object_type: str, streaming: bool = False
+) -> List[Dict]:
+    """
+    Parsea objetos de referencia (DDL, Types, etc.).
+
+    Args:
+        file_path: Ruta al archivo SQL
+        object_type: Tipo de objeto (TABLE, TYPE, SEQUENCE, etc.)
+        streaming: Si es True, lee el archivo por bloques delimitados (ver read_sql_blocks)
+    """
     if not file_path.exists():
         return []
 
     print(f"📖 Parseando objetos de referencia: {file_path.name}...")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    objects = []
 
-    # MEJORA: Eliminar comentarios antes de parsear para evitar falsos positivos
+    for content, char_base, line_base in read_sql_blocks(
+        file_path, object_type, streaming
+    ):
+        block_objects = parse_reference_content(
+            content, file_path.name, object_type, line_base, len(objects)
+        )
+        rebase_char_offsets(block_objects, char_base)
+        objects.extend(block_objects)
+
+    print(f"  ✅ Encontrados {len(objects)} objetos de tipo {object_type} (referencia)")
+    return objects
+
+
+def parse_reference_content(
+    content: str,
+    file_name: str,
+    object_type: str,
+    line_base: int = 0,
+    index_base: int = 0,
+) -> List[Dict]:
+    """
+    Extrae objetos de referencia de un texto SQL (archivo completo o bloque).
+
+    Args:
+        content: Texto a parsear
+        file_name: Nombre del archivo fuente (para source_file)
+        object_type: Tipo de objeto (TABLE, TYPE, SEQUENCE, etc.)
+        line_base: Líneas del archivo anteriores a content
+        index_base: Objetos ya numerados en bloques anteriores
+
+    Returns:
+        Lista de objetos con char_start/char_end relativos a content
+    """
+    # MEJORA: Tokenizar una sola vez y parsear sin comentarios ni literales
     # Ejemplo: "-- TODO: CREATE TABLE usuarios debe incluir..." no debe ser capturado
-    cleaned_content, _ = remove_sql_comments(content)
+    source = tokenize_sql(content)
+    source["line_base"] = line_base
+    cleaned_content = source["code"]
 
     objects = []
 
@@ -1590,13 +2353,18 @@ def parse_reference_objects(file_path: Path, object_type: str) -> List[Dict]:
     else:
         return []
 
-    matches = list(re.finditer(pattern, cleaned_content, re.IGNORECASE))
+    # JOB: el nombre viene dentro de un literal ('"JOB_NAME"'), buscar sin comentarios
+    # pero con literales intactos
+    detection_content = (
+        sql_source_cleaned(source) if object_type == "JOB" else cleaned_content
+    )
+    matches = list(re.finditer(pattern, detection_content, re.IGNORECASE))
 
     for i, match in enumerate(matches):
         start_pos = match.start()
         end_pos = matches[i + 1].start() if i < len(matches) - 1 else len(content)
 
-        semicolon_search = content[start_pos:end_pos]
+        semicolon_search = cleaned_content[start_pos:end_pos]
 
         if object_type == "TYPE":
             end_match = re.search(r"\)\s*\n\s*/\s*(?=\n|$)", semicolon_search)
@@ -1627,16 +2395,16 @@ def parse_reference_objects(file_path: Path, object_type: str) -> List[Dict]:
 
         object_code = content[start_pos:actual_end].strip()
 
-        lines_before = content[:start_pos].count("\n") + 1
+        lines_before = source_line_at(source, start_pos)
         lines_in_object = object_code.count("\n") + 1
 
         # Construir objeto base
         obj = {
-            "object_id": f"{object_type.lower()}_{i + 1:04d}",
+            "object_id": f"{object_type.lower()}_{index_base + i + 1:04d}",
             "object_name": object_name,
             "object_type": object_type,
             "category": "REFERENCE",
-            "source_file": file_path.name,
+            "source_file": file_name,
             "line_start": lines_before,
             "line_end": lines_before + lines_in_object - 1,
             "char_start": start_pos,
@@ -1653,16 +2421,535 @@ def parse_reference_objects(file_path: Path, object_type: str) -> List[Dict]:
 
         objects.append(obj)
 
-    print(f"  ✅ Encontrados {len(objects)} objetos de tipo {object_type} (referencia)")
     return objects
 
 
-def generate_manifest(dry_run: bool = False) -> Dict:
+# Pasos de generate_manifest en ORDEN DE COMPILACIÓN:
+# (encabezado, archivo, tipo de objeto, categoría, nota)
+# categoría None = la asigna el parser (REFERENCE para objetos de referencia)
+MANIFEST_STEPS = [
+    ("1️⃣  TYPES (tipos de datos base)", "types.sql", "TYPE", None, None),
+    ("2️⃣  SEQUENCES (secuencias)", "sequences.sql", "SEQUENCE", None, None),
+    ("3️⃣  TABLES (tablas)", "tables.sql", "TABLE", None, None),
+    ("4️⃣  PRIMARY KEYS", "primary_keys.sql", "PRIMARY_KEY", None, None),
+    ("5️⃣  FOREIGN KEYS", "foreign_keys.sql", "FOREIGN_KEY", None, None),
+    (
+        "6️⃣  DIRECTORIES (para UTL_FILE - contexto de análisis)",
+        "directories.sql",
+        "DIRECTORY",
+        None,
+        "Contexto para UTL_FILE - PostgreSQL no usa DIRECTORIES (migrar a S3)",
+    ),
+    (
+        "7️⃣  VIEWS (referencia + ejecutable)",
+        "views.sql",
+        "VIEW",
+        "REFERENCE_AND_EXECUTABLE",
+        "Usado como contexto Y requiere análisis de lógica",
+    ),
+    (
+        "8️⃣  MATERIALIZED VIEWS (referencia + ejecutable)",
+        "materialized_views.sql",
+        "MVIEW",
+        "REFERENCE_AND_EXECUTABLE",
+        "Usado como contexto Y requiere análisis de lógica",
+    ),
+    ("9️⃣  FUNCTIONS", "functions.sql", "FUNCTION", "EXECUTABLE", None),
+    ("🔟 PROCEDURES", "procedures.sql", "PROCEDURE", "EXECUTABLE", None),
+    # NOTA V7.1: PACKAGE_SPEC ya NO se agrega como objeto individual al manifest
+    # porque PostgreSQL no tiene concepto de SPEC/BODY. El SPEC se usa solo como
+    # metadata de contexto para extraer declaraciones públicas del package.
+    (
+        "1️⃣1️⃣  PACKAGE BODIES (V7.1: SPEC como metadata, no como objeto)",
+        "packages_body.sql",
+        "PACKAGE_BODY",
+        "EXECUTABLE",
+        None,
+    ),
+    ("1️⃣2️⃣  TRIGGERS", "triggers.sql", "TRIGGER", "EXECUTABLE", None),
+    ("1️⃣3️⃣  JOBS (programación)", "jobs.sql", "JOB", None, None),
+]
+
+# Tipos que se parsean con parse_reference_objects (el resto con parse_sql_file_robust)
+REFERENCE_STEP_TYPES = {
+    "TYPE",
+    "SEQUENCE",
+    "TABLE",
+    "PRIMARY_KEY",
+    "FOREIGN_KEY",
+    "DIRECTORY",
+    "JOB",
+}
+
+
+def load_spec_content() -> Optional[str]:
+    """Carga packages_spec.sql (declaraciones públicas). Retorna None si no existe."""
+    spec_file_path = EXTRACTED_DIR / "packages_spec.sql"
+    if not spec_file_path.exists():
+        print(
+            "   ⚠️  packages_spec.sql no encontrado - solo se extraerán declaraciones privadas"
+        )
+        return None
+
+    print("   📖 Cargando packages_spec.sql para extraer declaraciones públicas...")
+    with open(spec_file_path, "r", encoding="utf-8") as f:
+        spec_content = f.read()
+    print(f"   ✅ SPEC cargado ({len(spec_content):,} caracteres)")
+    return spec_content
+
+
+def parse_manifest_step(
+    step_index: int, streaming: bool = False, jobs: int = 1
+) -> List[Dict]:
+    """
+    Parsea el archivo de un paso de MANIFEST_STEPS.
+
+    Los pasos son independientes entre sí: los object_ids definitivos (obj_NNNN)
+    se asignan después, al unir los resultados en generate_manifest.
+
+    Args:
+        step_index: Índice del paso en MANIFEST_STEPS
+        streaming: Si es True, lee el archivo por bloques
+        jobs: Procesos para parsear los packages en paralelo (paso PACKAGE_BODY)
+
+    Returns:
+        Lista de objetos parseados (sin category/note del paso)
+    """
+    header, file_name, object_type = MANIFEST_STEPS[step_index][:3]
+    print(f"\n{header}" if step_index > 0 else header)
+
+    file_path = EXTRACTED_DIR / file_name
+    if object_type in REFERENCE_STEP_TYPES:
+        return parse_reference_objects(file_path, object_type, streaming)
+
+    spec_content = None
+    if object_type == "PACKAGE_BODY":
+        spec_content = load_spec_content()
+
+    return parse_sql_file_robust(
+        file_path,
+        object_type,
+        spec_content=spec_content,
+        streaming=streaming,
+        jobs=jobs,
+    )
+
+
+def profile_manifest_step(
+    step_index: int, streaming: bool = False, jobs: int = 1
+) -> Tuple[List[Dict], Dict]:
+    """
+    Parsea un paso de MANIFEST_STEPS midiendo su tiempo.
+
+    Sin memoria por paso: ru_maxrss es el máximo de toda la vida del proceso (cada
+    paso posterior al más grande reportaría ese mismo pico) y tracemalloc hace el
+    parsing ~5x más lento, lo que invalida los tiempos del reporte. La memoria se
+    reporta una sola vez por proceso (ver build_profile_report).
+
+    Returns:
+        Tupla (objetos, {"seconds"})
+    """
+    started = time.perf_counter()
+    objects = parse_manifest_step(step_index, streaming, jobs)
+    metrics = {"seconds": time.perf_counter() - started}
+    return objects, metrics
+
+
+def parse_manifest_steps_parallel(
+    streaming: bool, jobs: int, step_indexes: List[int]
+) -> Dict[int, Tuple[List[Dict], List[Dict]]]:
+    """
+    Parsea los archivos de MANIFEST_STEPS en un pool de procesos.
+
+    Los archivos más grandes se envían primero para que el tiempo total se acerque
+    al del archivo más grande. packages_body.sql se procesa en el proceso principal
+    con su propio pool por package (ver parse_package_blocks_parallel), en paralelo
+    con el resto de archivos. La salida de cada paso se muestra en el orden de
+    MANIFEST_STEPS, igual que en modo secuencial.
+
+    Args:
+        streaming: Si es True, cada worker lee su archivo por bloques
+        jobs: Número de procesos
+        step_indexes: Pasos a parsear (índices de MANIFEST_STEPS)
+
+    Returns:
+        Diccionario {step_index: (objetos, parsing_errors del paso, métricas del paso)}
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    def step_size(step_index: int) -> int:
+        file_path = EXTRACTED_DIR / MANIFEST_STEPS[step_index][1]
+        return file_path.stat().st_size if file_path.exists() else 0
+
+    package_steps = [i for i in step_indexes if MANIFEST_STEPS[i][2] == "PACKAGE_BODY"]
+    pool_steps = sorted(
+        (i for i in step_indexes if i not in package_steps),
+        key=step_size,
+        reverse=True,
+    )
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            step_index: executor.submit(
+                run_captured, profile_manifest_step, step_index, streaming
+            )
+            for step_index in pool_steps
+        }
+        for step_index in package_steps:
+            results[step_index] = run_captured(
+                profile_manifest_step, step_index, streaming, jobs
+            )
+        for step_index, future in futures.items():
+            results[step_index] = future.result()
+
+    step_results = {}
+    for step_index in sorted(results):
+        (objects, metrics), errors, output = results[step_index]
+        print(output, end="")
+        step_results[step_index] = (objects, errors, metrics)
+
+    return step_results
+
+
+# ===== REGENERACIÓN INCREMENTAL (hashes de contenido) =====
+# Objetos parseados por archivo + hash del archivo (ver generate_manifest --incremental)
+MANIFEST_CACHE_FILE = EXTRACTED_DIR / "manifest_cache.json"
+MANIFEST_CACHE_VERSION = 1
+
+
+def file_content_hash(*file_paths: Path) -> str:
+    """SHA-256 del contenido de uno o más archivos (leídos por bloques de 1 MB)."""
+    hasher = hashlib.sha256()
+    for file_path in file_paths:
+        hasher.update(file_path.name.encode("utf-8"))
+        if not file_path.exists():
+            hasher.update(b"\0missing")
+            continue
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def step_content_hash(step_index: int) -> str:
+    """Hash de los archivos de un paso (PACKAGE_BODY incluye packages_spec.sql)."""
+    file_name, object_type = MANIFEST_STEPS[step_index][1:3]
+    file_paths = [EXTRACTED_DIR / file_name]
+    if object_type == "PACKAGE_BODY":
+        file_paths.append(EXTRACTED_DIR / "packages_spec.sql")
+    return file_content_hash(*file_paths)
+
+
+def add_content_hashes(objects: List[Dict], file_path: Path):
+    """
+    Agrega content_hash (SHA-256 de las líneas line_start..line_end) a cada objeto.
+
+    El archivo se recorre una sola vez línea a línea; los objetos internos de
+    packages se solapan con su package y se hashean en la misma pasada.
+    """
+    pending = sorted(
+        (obj for obj in objects if obj.get("line_start")),
+        key=lambda obj: obj["line_start"],
+    )
+    if not pending or not file_path.exists():
+        return
+
+    active = []
+    next_index = 0
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            while (
+                next_index < len(pending)
+                and pending[next_index]["line_start"] <= line_number
+            ):
+                active.append((pending[next_index], hashlib.sha256()))
+                next_index += 1
+
+            encoded = line.encode("utf-8")
+            still_active = []
+            for obj, hasher in active:
+                hasher.update(encoded)
+                if obj["line_end"] <= line_number:
+                    obj["content_hash"] = hasher.hexdigest()
+                else:
+                    still_active.append((obj, hasher))
+            active = still_active
+
+            if not active and next_index == len(pending):
+                break
+
+    for obj, hasher in active:
+        obj["content_hash"] = hasher.hexdigest()
+
+
+def load_manifest_cache() -> Dict:
+    """Carga manifest_cache.json (vacío si no existe o si cambió el parser)."""
+    if not MANIFEST_CACHE_FILE.exists():
+        return {}
+
+    with open(MANIFEST_CACHE_FILE, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+
+    # Si cambió este script, los objetos cacheados pueden no coincidir con el parser
+    if cache.get("version") != MANIFEST_CACHE_VERSION or cache.get(
+        "parser_hash"
+    ) != file_content_hash(Path(__file__)):
+        print("   ⚠️  Cache de otra versión del parser - se re-parsea todo")
+        return {}
+
+    return cache
+
+
+def object_match_keys(objects: List[Dict]) -> List[Tuple[str, str, int]]:
+    """
+    Claves estables para emparejar objetos entre ejecuciones.
+
+    (object_type, object_name, ocurrencia): la ocurrencia distingue overloads y
+    objetos con el mismo nombre en el mismo tipo.
+    """
+    seen = {}
+    keys = []
+    for obj in objects:
+        base_key = (obj["object_type"], obj["object_name"])
+        occurrence = seen.get(base_key, 0)
+        seen[base_key] = occurrence + 1
+        keys.append(base_key + (occurrence,))
+    return keys
+
+
+def assign_incremental_ids(
+    all_objects: List[Dict], previous_objects: List[Dict]
+) -> Dict[str, int]:
+    """
+    Asigna object_ids conservando los de objetos sin cambios.
+
+    Un objeto se considera sin cambios si existe en el manifest anterior con la
+    misma clave (object_match_keys) y el mismo content_hash. En ese caso conserva
+    object_id, status y los campos agregados después (processed_at, análisis de
+    dependencias, etc.). Los nuevos o modificados quedan en "pending" con un
+    object_id nuevo (mayor al máximo anterior, sin reutilizar IDs).
+
+    Returns:
+        Estadísticas {"unchanged", "changed", "new", "removed"}
+    """
+    previous_by_key = dict(zip(object_match_keys(previous_objects), previous_objects))
+    next_number = 1 + max(
+        (
+            int(obj["object_id"][4:])
+            for obj in previous_objects
+            if re.fullmatch(r"obj_\d+", obj.get("object_id", ""))
+        ),
+        default=0,
+    )
+
+    stats = {"unchanged": 0, "changed": 0, "new": 0, "removed": 0}
+    for i, key in enumerate(object_match_keys(all_objects)):
+        obj = all_objects[i]
+        previous = previous_by_key.pop(key, None)
+
+        if (
+            previous
+            and obj.get("content_hash")
+            and previous.get("content_hash") == obj["content_hash"]
+        ):
+            # Conservar estado y análisis; posiciones y metadata de parsing nuevas
+            merged = {**previous, **obj}
+            merged["object_id"] = previous["object_id"]
+            merged["status"] = previous.get("status", obj["status"])
+            all_objects[i] = merged
+            stats["unchanged"] += 1
+            continue
+
+        stats["changed" if previous else "new"] += 1
+        obj["object_id"] = f"obj_{next_number:04d}"
+        next_number += 1
+
+    stats["removed"] = len(previous_by_key)
+    return stats
+
+
+# ===== PROFILING (--profile) =====
+# Reporte JSON junto a parsing_validation.log (ver generate_manifest --profile)
+PROFILE_REPORT = EXTRACTED_DIR / "parsing_profile.json"
+PROFILE_THRESHOLD_MS = 50  # Objetos más lentos que esto se listan en el reporte
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    Memoria pico (RSS) del proceso, o de sus hijos, en MB (None si no disponible).
+
+    Es el máximo de toda la vida del proceso hasta el momento de la llamada, no el
+    de una fase. Con children=True, el mayor pico entre los workers ya terminados.
+    """
+    import sys
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss está en bytes en macOS y en KB en Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def build_profile_report(
+    all_objects: List[Dict],
+    step_results: Dict[int, Tuple[List[Dict], List[Dict]]],
+    step_metrics: Dict[int, Dict],
+    object_timings: List[Tuple[Dict, float]],
+    phase_seconds: Dict[str, float],
+    threshold_ms: float,
+) -> Dict:
+    """
+    Arma el reporte de --profile: tiempo por paso/archivo, objetos lentos y fallbacks.
+
+    Args:
+        all_objects: Objetos del manifest (con object_id definitivo)
+        step_results: {step_index: (objetos, errores)} de cada paso de MANIFEST_STEPS
+        step_metrics: {step_index: métricas} de los pasos parseados (no cacheados)
+        object_timings: (objeto, segundos) de cada objeto top-level parseado
+        phase_seconds: Segundos de cada fase de generate_manifest
+        threshold_ms: Umbral para listar un objeto en slow_objects
+
+    Returns:
+        Diccionario serializable a JSON
+    """
+    steps = []
+    for step_index, step in enumerate(MANIFEST_STEPS):
+        file_name, object_type = step[1], step[2]
+        file_path = EXTRACTED_DIR / file_name
+        file_bytes = file_path.stat().st_size if file_path.exists() else 0
+        object_count = len(step_results[step_index][0])
+        metrics = step_metrics.get(step_index)
+
+        entry = {
+            "step": step_index + 1,
+            "file": file_name,
+            "object_type": object_type,
+            "file_bytes": file_bytes,
+            "objects": object_count,
+            "cached": metrics is None,
+        }
+        if metrics:
+            seconds = metrics["seconds"]
+            entry["seconds"] = round(seconds, 4)
+            entry["objects_per_second"] = round(object_count / max(seconds, 1e-9), 1)
+            entry["mb_per_second"] = round(
+                file_bytes / (1024 * 1024) / max(seconds, 1e-9), 2
+            )
+        steps.append(entry)
+
+    def object_summary(obj: Dict) -> Dict:
+        return {
+            "object_id": obj["object_id"],
+            "object_name": obj["object_name"],
+            "object_type": obj["object_type"],
+            "source_file": obj.get("source_file"),
+            "line_start": obj.get("line_start"),
+            "line_end": obj.get("line_end"),
+            "parsing_method": obj.get("parsing_method"),
+        }
+
+    slow_objects = [
+        dict(object_summary(obj), parse_ms=round(seconds * 1000, 2))
+        for obj, seconds in sorted(object_timings, key=lambda t: t[1], reverse=True)
+        if seconds * 1000 >= threshold_ms
+    ]
+
+    # fallback_end_pos: find_object_end_robust no encontró END (corta en el siguiente
+    # objeto); fallback_named_end/fallback_last_end: scanner de packages desbalanceado
+    fallback_objects = [
+        object_summary(obj)
+        for obj in all_objects
+        if (obj.get("parsing_method") or "").startswith("fallback_")
+    ]
+    fallback_counts = {}
+    for obj in fallback_objects:
+        method = obj["parsing_method"]
+        fallback_counts[method] = fallback_counts.get(method, 0) + 1
+
+    total_seconds = sum(phase_seconds.values())
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "total_seconds": round(total_seconds, 4),
+        "total_objects": len(all_objects),
+        "objects_per_second": round(len(all_objects) / max(total_seconds, 1e-9), 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_children_mb": peak_rss_mb(children=True),
+        "phases": {name: round(sec, 4) for name, sec in phase_seconds.items()},
+        "steps": steps,
+        "slow_object_threshold_ms": threshold_ms,
+        "slow_objects": slow_objects,
+        "fallback_counts": fallback_counts,
+        "fallback_objects": fallback_objects,
+    }
+
+
+def print_profile_summary(report: Dict):
+    """Muestra los pasos más lentos, objetos lentos y fallbacks del reporte."""
+    print(f"\n{'=' * 80}")
+    print("⏱️  PROFILE")
+    print(f"{'=' * 80}")
+    print(
+        f"   Total: {report['total_seconds']:.2f}s "
+        f"({report['objects_per_second']:,.0f} objetos/s, "
+        f"pico RSS del proceso {report['peak_rss_mb']} MB)"
+    )
+    for name, seconds in report["phases"].items():
+        print(f"   {name:20s} {seconds:8.2f}s")
+
+    parsed_steps = [step for step in report["steps"] if not step["cached"]]
+    if parsed_steps:
+        print("\n   Archivos más lentos:")
+    for step in sorted(parsed_steps, key=lambda s: s["seconds"], reverse=True)[:5]:
+        print(
+            f"   {step['file']:25s} {step['seconds']:8.2f}s "
+            f"{step['objects_per_second']:>10,.0f} obj/s "
+            f"{step['mb_per_second']:>7.2f} MB/s"
+        )
+
+    print(
+        f"\n   Objetos > {report['slow_object_threshold_ms']} ms: "
+        f"{len(report['slow_objects'])}"
+    )
+    for obj in report["slow_objects"][:5]:
+        print(f"   - {obj['object_name']} ({obj['source_file']}): {obj['parse_ms']} ms")
+
+    if report["fallback_objects"]:
+        print(f"\n   ⚠️  Objetos con fallback: {len(report['fallback_objects'])}")
+        for method, count in report["fallback_counts"].items():
+            print(f"   - {method}: {count}")
+
+
+def generate_manifest(
+    dry_run: bool = False,
+    streaming: bool = False,
+    jobs: int = 1,
+    incremental: bool = False,
+    profile: bool = False,
+    profile_threshold_ms: float = PROFILE_THRESHOLD_MS,
+    layout: str = LAYOUT_MONOLITHIC,
+    extract_objects: bool = False,
+) -> Dict:
     """
     Genera manifest.json optimizado para migración a PostgreSQL.
 
     Args:
         dry_run: Si es True, solo valida sin guardar archivos
+        streaming: Si es True, lee los archivos por bloques (bajo consumo de memoria)
+        jobs: Número de procesos para parsear los archivos en paralelo (1 = secuencial)
+        incremental: Si es True, no re-parsea archivos sin cambios (manifest_cache.json)
+            y conserva object_id/status/análisis de los objetos sin cambios
+        profile: Si es True, guarda tiempos por paso/archivo/objeto, memoria pico y
+            objetos con fallback en parsing_profile.json (también en dry-run)
+        profile_threshold_ms: Objetos más lentos que esto se listan en el reporte
+        layout: "monolithic" (manifest.json), "sharded" (manifest/index.json + shards)
+            o "sqlite" (manifest.db) - ver manifest_store.py
+        extract_objects: Si es True, genera objects/objects.pack + index.json con el
+            código de cada objeto (ver object_source.py)
 
     ORDEN CORRECTO (V7.1 - SPEC como metadata):
     1. TYPES          → Tipos base
@@ -1688,117 +2975,106 @@ def generate_manifest(dry_run: bool = False) -> Dict:
     # ===== PROCESAMIENTO EN ORDEN DE COMPILACIÓN =====
     print("📝 Procesando objetos en ORDEN DE COMPILACIÓN de Oracle...\n")
 
-    all_objects = []
-
-    # 1. TYPES (tipos base)
-    print("1️⃣  TYPES (tipos de datos base)")
-    types = parse_reference_objects(EXTRACTED_DIR / "types.sql", "TYPE")
-    all_objects.extend(types)
-
-    # 2. SEQUENCES
-    print("\n2️⃣  SEQUENCES (secuencias)")
-    sequences = parse_reference_objects(EXTRACTED_DIR / "sequences.sql", "SEQUENCE")
-    all_objects.extend(sequences)
-
-    # 3. TABLES
-    print("\n3️⃣  TABLES (tablas)")
-    tables = parse_reference_objects(EXTRACTED_DIR / "tables.sql", "TABLE")
-    all_objects.extend(tables)
-
-    # 4. PRIMARY KEYS
-    print("\n4️⃣  PRIMARY KEYS")
-    pks = parse_reference_objects(EXTRACTED_DIR / "primary_keys.sql", "PRIMARY_KEY")
-    all_objects.extend(pks)
-
-    # 5. FOREIGN KEYS
-    print("\n5️⃣  FOREIGN KEYS")
-    fks = parse_reference_objects(EXTRACTED_DIR / "foreign_keys.sql", "FOREIGN_KEY")
-    all_objects.extend(fks)
-
-    # 6. DIRECTORIES (opcional)
-    print("\n6️⃣  DIRECTORIES (para UTL_FILE - contexto de análisis)")
-    directories = parse_reference_objects(
-        EXTRACTED_DIR / "directories.sql", "DIRECTORY"
-    )
-    if directories:
-        for d in directories:
-            d["note"] = (
-                "Contexto para UTL_FILE - PostgreSQL no usa DIRECTORIES (migrar a S3)"
+    # Tiempo de cada fase (reporte de --profile)
+    phase_seconds = {}
+    phase_started = time.perf_counter()
+
+    # Hash de cada archivo: con --incremental los pasos sin cambios no se parsean
+    step_hashes = [step_content_hash(i) for i in range(len(MANIFEST_STEPS))]
+    cached_steps = load_manifest_cache().get("steps", {}) if incremental else {}
+
+    step_results = {}
+    for step_index, step in enumerate(MANIFEST_STEPS):
+        cached = cached_steps.get(step[1])
+        if cached and cached["hash"] == step_hashes[step_index]:
+            step_results[step_index] = (cached["objects"], cached["parsing_errors"])
+    if step_results:
+        print(f"♻️  {len(step_results)} archivos sin cambios (no se re-parsean)\n")
+
+    phase_seconds["hash_files"] = time.perf_counter() - phase_started
+    phase_started = time.perf_counter()
+
+    steps_to_parse = [i for i in range(len(MANIFEST_STEPS)) if i not in step_results]
+    if jobs > 1:
+        print(f"⚡ Modo paralelo: {jobs} procesos\n")
+        parsed_steps = parse_manifest_steps_parallel(streaming, jobs, steps_to_parse)
+    else:
+        parsed_steps = {}
+        for step_index in steps_to_parse:
+            errors_before = len(parsing_errors)
+            objects, metrics = profile_manifest_step(step_index, streaming)
+            parsed_steps[step_index] = (
+                objects,
+                parsing_errors[errors_before:],
+                metrics,
             )
-        all_objects.extend(directories)
-
-    # 7. VIEWS (DOBLE PROPÓSITO: Referencia + Ejecutable)
-    print("\n7️⃣  VIEWS (referencia + ejecutable)")
-    views = parse_sql_file_robust(EXTRACTED_DIR / "views.sql", "VIEW")
-    for view in views:
-        view["category"] = "REFERENCE_AND_EXECUTABLE"
-        view["note"] = "Usado como contexto Y requiere análisis de lógica"
-    all_objects.extend(views)
-
-    # 8. MATERIALIZED VIEWS (DOBLE PROPÓSITO)
-    print("\n8️⃣  MATERIALIZED VIEWS (referencia + ejecutable)")
-    mviews = parse_sql_file_robust(EXTRACTED_DIR / "materialized_views.sql", "MVIEW")
-    for mview in mviews:
-        mview["category"] = "REFERENCE_AND_EXECUTABLE"
-        mview["note"] = "Usado como contexto Y requiere análisis de lógica"
-    all_objects.extend(mviews)
-
-    # 9. FUNCTIONS
-    print("\n9️⃣  FUNCTIONS")
-    functions = parse_sql_file_robust(EXTRACTED_DIR / "functions.sql", "FUNCTION")
-    for func in functions:
-        func["category"] = "EXECUTABLE"
-    all_objects.extend(functions)
-
-    # 10. PROCEDURES
-    print("\n🔟 PROCEDURES")
-    procedures = parse_sql_file_robust(EXTRACTED_DIR / "procedures.sql", "PROCEDURE")
-    for proc in procedures:
-        proc["category"] = "EXECUTABLE"
-    all_objects.extend(procedures)
-
-    # 11. PACKAGE BODIES (V7.0/V7.1: con soporte para SPEC como metadata)
-    # NOTA V7.1: PACKAGE_SPEC ya NO se agrega como objeto individual al manifest
-    # porque PostgreSQL no tiene concepto de SPEC/BODY. El SPEC se usa solo como
-    # metadata de contexto para extraer declaraciones públicas del package.
-    print("\n1️⃣1️⃣  PACKAGE BODIES (V7.1: SPEC como metadata, no como objeto)")
 
-    # Cargar contenido de packages_spec.sql para extraer declaraciones públicas
-    spec_file_path = EXTRACTED_DIR / "packages_spec.sql"
-    spec_content = None
-    if spec_file_path.exists():
-        print("   📖 Cargando packages_spec.sql para extraer declaraciones públicas...")
-        with open(spec_file_path, "r", encoding="utf-8") as f:
-            spec_content = f.read()
-        print(f"   ✅ SPEC cargado ({len(spec_content):,} caracteres)")
-    else:
+    phase_seconds["parse"] = time.perf_counter() - phase_started
+    phase_started = time.perf_counter()
+
+    step_metrics = {}
+    object_timings = []
+    for step_index, (objects, errors, metrics) in parsed_steps.items():
+        add_content_hashes(objects, EXTRACTED_DIR / MANIFEST_STEPS[step_index][1])
+        step_results[step_index] = (objects, errors)
+        step_metrics[step_index] = metrics
+        # parse_seconds solo se usa para el reporte de --profile (no va al manifest)
+        object_timings.extend(
+            (obj, obj.pop("parse_seconds")) for obj in objects if "parse_seconds" in obj
+        )
+
+    phase_seconds["content_hashes"] = time.perf_counter() - phase_started
+    phase_started = time.perf_counter()
+
+    # Cache para la próxima ejecución incremental (antes de category/object_id)
+    manifest_cache = {
+        "version": MANIFEST_CACHE_VERSION,
+        "parser_hash": file_content_hash(Path(__file__)),
+        "steps": {
+            MANIFEST_STEPS[i][1]: {
+                "hash": step_hashes[i],
+                "objects": [dict(obj) for obj in step_results[i][0]],
+                "parsing_errors": step_results[i][1],
+            }
+            for i in range(len(MANIFEST_STEPS))
+        },
+    }
+
+    # Merge en el orden de MANIFEST_STEPS (independiente del orden de término)
+    parsing_errors[:] = [
+        error for i in range(len(MANIFEST_STEPS)) for error in step_results[i][1]
+    ]
+    all_objects = []
+    for step_index in range(len(MANIFEST_STEPS)):
+        objects = step_results[step_index][0]
+        category, note = MANIFEST_STEPS[step_index][3:5]
+        for obj in objects:
+            if category:
+                obj["category"] = category
+            if note:
+                obj["note"] = note
+        all_objects.extend(objects)
+
+    if incremental and manifest_exists():
+        # Conservar object_id/status/análisis de los objetos sin cambios
+        # (antes, aplicar al manifest los eventos pendientes del journal de progreso)
+        if not dry_run:
+            compacted = compact_journal()
+            if compacted:
+                print(f"\n📝 Journal de progreso compactado: {compacted} eventos")
+        previous_objects = load_manifest().get("objects", [])
+        stats = assign_incremental_ids(all_objects, previous_objects)
         print(
-            "   ⚠️  packages_spec.sql no encontrado - solo se extraerán declaraciones privadas"
+            f"\n♻️  Incremental: {stats['unchanged']} sin cambios, "
+            f"{stats['changed']} modificados, {stats['new']} nuevos, "
+            f"{stats['removed']} eliminados"
         )
+    else:
+        # Re-numerar object_ids en orden procesado
+        for i, obj in enumerate(all_objects, start=1):
+            obj["object_id"] = f"obj_{i:04d}"
 
-    # Parsear PACKAGE_BODY con el contenido del SPEC
-    pkg_bodies = parse_sql_file_robust(
-        EXTRACTED_DIR / "packages_body.sql", "PACKAGE_BODY", spec_content=spec_content
-    )
-    for body in pkg_bodies:
-        body["category"] = "EXECUTABLE"
-    all_objects.extend(pkg_bodies)
-
-    # 12. TRIGGERS
-    print("\n1️⃣2️⃣  TRIGGERS")
-    triggers = parse_sql_file_robust(EXTRACTED_DIR / "triggers.sql", "TRIGGER")
-    for trigger in triggers:
-        trigger["category"] = "EXECUTABLE"
-    all_objects.extend(triggers)
-
-    # 13. JOBS
-    print("\n1️⃣3️⃣  JOBS (programación)")
-    jobs = parse_reference_objects(EXTRACTED_DIR / "jobs.sql", "JOB")
-    all_objects.extend(jobs)
-
-    # Re-numerar object_ids en orden procesado
     for i, obj in enumerate(all_objects, start=1):
-        obj["object_id"] = f"obj_{i:04d}"
         obj["processing_order"] = i
 
     # Estadísticas
@@ -1836,6 +3112,9 @@ def generate_manifest(dry_run: bool = False) -> Dict:
         "JOBS",
     ]
 
+    phase_seconds["merge_and_ids"] = time.perf_counter() - phase_started
+    phase_started = time.perf_counter()
+
     manifest = {
         "generated_at": datetime.now().isoformat(),
         "version": "4.0-granular",
@@ -1860,14 +3139,51 @@ def generate_manifest(dry_run: bool = False) -> Dict:
     }
 
     if not dry_run:
-        with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        manifest_path = save_manifest(manifest, layout)
+
+        # Sin --incremental los object_id se re-numeran: los eventos pendientes
+        # del journal apuntarían a otros objetos
+        if not incremental:
+            discarded = discard_journal()
+            if discarded:
+                print(f"\n⚠️  Journal de progreso descartado: {discarded} eventos")
+
+        with open(MANIFEST_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(manifest_cache, f, ensure_ascii=False)
 
         if parsing_errors:
             with open(VALIDATION_LOG, "w", encoding="utf-8") as f:
                 json.dump(parsing_errors, f, indent=2, ensure_ascii=False)
             print(f"\n⚠️  Log de parsing: {VALIDATION_LOG}")
 
+    phase_seconds["write_files"] = time.perf_counter() - phase_started
+
+    if extract_objects and not dry_run:
+        phase_started = time.perf_counter()
+        object_index = write_object_sources(all_objects)
+        phase_seconds["object_sources"] = time.perf_counter() - phase_started
+        print(
+            f"\n📦 Código por objeto: {object_index['total_entries']} entradas → "
+            f"{OBJECT_PACK_FILE} ({object_index['total_bytes'] / 1024 / 1024:.1f} MB)"
+        )
+    elif not dry_run and remove_object_sources():
+        # El pack anterior usa los object_id de otro manifest
+        print(f"\n⚠️  {OBJECT_PACK_FILE} eliminado: regenerar con --extract-objects")
+
+    if profile:
+        report = build_profile_report(
+            all_objects,
+            step_results,
+            step_metrics,
+            object_timings,
+            phase_seconds,
+            profile_threshold_ms,
+        )
+        with open(PROFILE_REPORT, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print_profile_summary(report)
+        print(f"\n⏱️  Reporte de profiling: {PROFILE_REPORT}")
+
     print(f"\n{'=' * 80}")
     print(f"📊 RESUMEN (v3 - ORDEN CORRECTO):")
     print(f"{'=' * 80}")
@@ -1885,7 +3201,7 @@ def generate_manifest(dry_run: bool = False) -> Dict:
     if dry_run:
         print(f"\n🔍 MODO DRY-RUN - Manifest NO guardado")
     else:
-        print(f"\n✅ Manifest generado: {MANIFEST_FILE}")
+        print(f"\n✅ Manifest generado: {manifest_path}")
 
     return manifest
 
@@ -1950,19 +3266,66 @@ def initialize_progress(manifest: Dict, force: bool = False) -> Dict:
         "batches": [],
     }
 
-    with open(PROGRESS_FILE, "w", encoding="utf-8") as f:
-        json.dump(progress, f, indent=2, ensure_ascii=False)
+    write_json_atomic(PROGRESS_FILE, progress)
 
     print(f"✅ Progress inicializado: {PROGRESS_FILE}")
     return progress
 
 
+def rebuild_incremental_progress(manifest: Dict) -> Dict:
+    """
+    Recalcula progress.json después de --incremental.
+
+    Los contadores salen del status conservado en cada objeto
+    (progress_from_objects); se mantiene la lista de batches, así el próximo
+    batch sigue la numeración de knowledge/json/ en lugar de volver a batch_001.
+    """
+    print("\n📊 Recalculando progreso (incremental)...\n")
+
+    with open(PROGRESS_FILE, "r", encoding="utf-8") as f:
+        progress = json.load(f)
+
+    # Un batch puede perder objetos (modificados → pending, o eliminados)
+    for batch in progress["batches"]:
+        batch["processed_count"] = 0
+    progress["total_objects"] = manifest["total_objects"]
+    progress["last_updated"] = datetime.now().isoformat()
+    progress_from_objects(progress, manifest["objects"], [])
+    if progress["processed_count"] == 0 and progress["pending_count"] > 0:
+        progress["status"] = "initialized" if not progress["batches"] else "in_progress"
+
+    write_json_atomic(PROGRESS_FILE, progress)
+
+    print(
+        f"✅ Progreso: {progress['processed_count']}/{progress['total_objects']}, "
+        f"último batch: {progress['current_batch']}"
+    )
+    return progress
+
+
 def main():
     """Función principal"""
     import sys
 
     force = "--force" in sys.argv
     dry_run = "--dry-run" in sys.argv
+    streaming = "--streaming" in sys.argv
+    incremental = "--incremental" in sys.argv
+    profile = "--profile" in sys.argv
+    extract_objects = "--extract-objects" in sys.argv
+    layout = LAYOUT_MONOLITHIC
+    if "--sharded" in sys.argv:
+        layout = LAYOUT_SHARDED
+    if "--sqlite" in sys.argv:
+        layout = LAYOUT_SQLITE
+    jobs = 1
+    if "--jobs" in sys.argv:
+        jobs = int(sys.argv[sys.argv.index("--jobs") + 1])
+    profile_threshold_ms = PROFILE_THRESHOLD_MS
+    if "--profile-threshold" in sys.argv:
+        profile_threshold_ms = float(
+            sys.argv[sys.argv.index("--profile-threshold") + 1]
+        )
 
     print("=" * 80)
     print("PREPARACIÓN MIGRACIÓN ORACLE → POSTGRESQL (v3 - ORDEN CORRECTO)")
@@ -1973,10 +3336,28 @@ def main():
         return
 
     create_directory_structure()
-    manifest = generate_manifest(dry_run=dry_run)
+    manifest = generate_manifest(
+        dry_run=dry_run,
+        streaming=streaming,
+        jobs=jobs,
+        incremental=incremental,
+        profile=profile,
+        profile_threshold_ms=profile_threshold_ms,
+        layout=layout,
+        extract_objects=extract_objects,
+    )
 
     if not dry_run:
-        initialize_progress(manifest, force=force)
+        if incremental and PROGRESS_FILE.exists():
+            progress = rebuild_incremental_progress(manifest)
+        else:
+            progress = initialize_progress(manifest, force=force)
+
+        # Batches por presupuesto de tokens para la Fase 1 (ver plan_batches.py)
+        print("\n📦 Planificando batches...\n")
+        plan = plan_batches(manifest["objects"], next_batch_number(progress))
+        save_batches(plan)
+        print_plan_summary(plan)
 
     print("\n" + "=" * 80)
     print("✅ PREPARACIÓN COMPLETADA (v3)")
@@ -1986,10 +3367,15 @@ def main():
         print("\n🔍 DRY-RUN: Parsing validado, manifest NO guardado")
     else:
         print(f"\nArchivos generados:")
-        print(f"  - {MANIFEST_FILE}")
+        print(f"  - {manifest_location()}")
         print(f"  - {PROGRESS_FILE}")
+        print(f"  - {BATCHES_FILE}")
         if parsing_errors:
             print(f"  - {VALIDATION_LOG}")
+        if profile:
+            print(f"  - {PROFILE_REPORT}")
+        if extract_objects:
+            print(f"  - {OBJECT_PACK_FILE}")
 
 
 if __name__ == "__main__":
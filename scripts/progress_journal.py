@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Journal append-only de progreso: eventos por objeto + compactación en snapshots.
+
+PROPÓSITO:
+    update_progress.py y los agentes registran eventos (processed, failed,
+    converted, compiled) agregando líneas a progress_journal.jsonl, en lugar de
+    reescribir manifest.json en cada batch.
+
+    Estado actual = snapshots (manifest + progress.json) + journal aplicado en
+    memoria (load_current_state). progress.json es chico: update_progress.py lo
+    reescribe en cada batch con el journal aplicado (write_progress_snapshot).
+    Cada JOURNAL_COMPACT_EVENTS eventos (o con update_progress.py --compact) el
+    journal se aplica también al manifest y se vacía.
+
+    update_progress.py --reconcile recalcula los snapshots desde cero a partir de
+    los outputs en knowledge/json/ (rebuild_snapshots).
+
+CONSISTENCIA:
+    - Append y compactación toman un lock exclusivo (fcntl.flock sobre
+      progress.lock). Un append son unas pocas líneas: 20 agentes registran en
+      paralelo sin esperar una reescritura del manifest.
+    - Los snapshots se escriben con temporal + os.replace (ver
+      manifest_store.atomic_write): un corte nunca deja un JSON truncado.
+    - Aplicar el mismo evento dos veces da el mismo resultado y progress.json se
+      deriva del status de los objetos. Si la compactación se corta antes de
+      vaciar el journal, la siguiente lo reaplica sin duplicar progreso.
+    - Una línea incompleta (append interrumpido) se ignora al leer.
+
+FORMATO (una línea JSON por evento):
+    {"ts": "2026-10-18T10:00:00", "event": "processed", "object_id": "obj_0001",
+     "batch_id": "batch_001"}
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene sql/extracted/
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from manifest_store import (
+    EXTRACTED_DIR,
+    load_manifest_index,
+    update_manifest_objects,
+    write_json_atomic,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
+JOURNAL_FILE = EXTRACTED_DIR / "progress_journal.jsonl"
+LOCK_FILE = EXTRACTED_DIR / "progress.lock"
+PROGRESS_FILE = EXTRACTED_DIR / "progress.json"
+
+# Eventos pendientes a partir de los cuales update_progress.py compacta
+JOURNAL_COMPACT_EVENTS = 1000
+
+# Evento → status que deja en el objeto
+EVENT_STATUS = {
+    "processed": "processed",
+    "failed": "failed",
+    "converted": "converted",
+    "compiled": "compiled",
+    "compile_failed": "compile_failed",
+    "tested": "tested",
+    "test_failed": "test_failed",
+}
+
+# Status que cuentan como analizados (Fase 1) en progress.json
+COMPLETED_STATUSES = {
+    "processed",
+    "converted",
+    "compiled",
+    "compile_failed",
+    "tested",
+    "test_failed",
+}
+
+
+@contextmanager
+def journal_lock(blocking: bool = True):
+    """
+    Lock exclusivo entre procesos sobre progress.lock.
+
+    No es reentrante: no anidar dentro del mismo proceso.
+
+    Yields:
+        True si se obtuvo el lock (con blocking=False, False si otro proceso lo tiene)
+    """
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "a") as lock:
+        if fcntl is None:
+            yield True
+            return
+
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def append_events(
+    object_ids: Iterable[str],
+    event: str,
+    batch_id: Optional[str] = None,
+    detail: Optional[str] = None,
+) -> int:
+    """
+    Agrega un evento por objeto al journal (una sola escritura bajo lock).
+
+    Args:
+        object_ids: Objetos afectados
+        event: Una clave de EVENT_STATUS (processed, failed, converted, compiled, ...)
+        batch_id: Batch en el que se procesaron (opcional)
+        detail: Texto libre (p. ej. motivo de un failed)
+
+    Returns:
+        Cantidad de eventos agregados
+    """
+    if event not in EVENT_STATUS:
+        raise ValueError(
+            f"Evento desconocido: {event} (válidos: {', '.join(EVENT_STATUS)})"
+        )
+
+    timestamp = datetime.now().isoformat()
+    records = []
+    for object_id in object_ids:
+        record = {"ts": timestamp, "event": event, "object_id": object_id}
+        if batch_id:
+            record["batch_id"] = batch_id
+        if detail:
+            record["detail"] = detail
+        records.append(record)
+
+    return append_records(records)
+
+
+def append_records(records: List[Dict]) -> int:
+    """
+    Agrega eventos ya armados (ts, event, object_id, ...) al journal.
+
+    Una sola escritura con fsync bajo el lock, sin importar cuántos eventos sean.
+
+    Returns:
+        Cantidad de eventos agregados
+    """
+    if not records:
+        return 0
+
+    with journal_lock():
+        return write_records(records)
+
+
+def write_records(records: List[Dict]) -> int:
+    """Escribe eventos al final del journal (llamar con el lock tomado)."""
+    lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+    if not lines:
+        return 0
+
+    with open(JOURNAL_FILE, "a+b") as f:
+        # Si un append anterior se cortó a mitad de línea, empezar en una nueva
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                lines.insert(0, "\n")
+        f.write("".join(lines).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+    return len(records)
+
+
+def read_events() -> List[Dict]:
+    """Eventos del journal en orden (ignora líneas incompletas o inválidas)."""
+    return read_events_from(0)[0]
+
+
+def read_events_from(offset: int) -> Tuple[List[Dict], int]:
+    """
+    Eventos del journal desde el byte offset (lo agregado desde una lectura previa).
+
+    Returns:
+        (eventos en orden, offset del final del journal para la próxima lectura)
+    """
+    if not JOURNAL_FILE.exists():
+        return [], 0
+
+    events = []
+    with open(JOURNAL_FILE, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            try:
+                event = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if event.get("event") in EVENT_STATUS and event.get("object_id"):
+                events.append(event)
+        return events, f.tell()
+
+
+def apply_events(objects: List[Dict], events: List[Dict]) -> Dict[str, Dict]:
+    """
+    Aplica eventos a los objetos del manifest (o del índice) en memoria.
+
+    "processed" solo cambia objetos en pending (re-ejecutar un batch no pisa
+    processed_at ni un status posterior); el resto de eventos siempre aplica.
+
+    Returns:
+        {object_id: campos modificados} para update_manifest_objects
+    """
+    by_id = {obj["object_id"]: obj for obj in objects}
+    updates = {}
+
+    for event in events:
+        obj = by_id.get(event["object_id"])
+        name = event["event"]
+        if obj is None or (name == "processed" and obj.get("status") != "pending"):
+            continue
+
+        changes = {"status": EVENT_STATUS[name], f"{name}_at": event["ts"]}
+        if name == "processed" and event.get("batch_id"):
+            changes["batch_id"] = event["batch_id"]
+        if event.get("detail"):
+            changes[f"{name}_detail"] = event["detail"]
+
+        obj.update(changes)
+        updates.setdefault(obj["object_id"], {}).update(changes)
+
+    return updates
+
+
+def batch_entry(progress: Dict, batch_id: str) -> Dict:
+    """Entrada de progress["batches"] para batch_id (la crea si no existe)."""
+    for batch in progress["batches"]:
+        if batch["batch_id"] == batch_id:
+            return batch
+
+    batch = {"batch_id": batch_id, "processed_count": 0, "completed_at": None}
+    progress["batches"].append(batch)
+    return batch
+
+
+def progress_from_objects(
+    progress: Dict, objects: List[Dict], events: List[Dict]
+) -> Dict:
+    """
+    Recalcula progress.json desde el status de los objetos (ya con eventos aplicados).
+
+    Contadores y processed_count por batch se derivan del manifest en lugar de
+    sumarse, así reaplicar el journal no duplica progreso.
+    """
+    by_status = {}
+    batch_counts = {}
+    for obj in objects:
+        status = obj.get("status")
+        by_status[status] = by_status.get(status, 0) + 1
+        if status in COMPLETED_STATUSES and obj.get("batch_id"):
+            batch_counts[obj["batch_id"]] = batch_counts.get(obj["batch_id"], 0) + 1
+
+    progress["by_status"] = by_status
+    progress["processed_count"] = sum(
+        count for status, count in by_status.items() if status in COMPLETED_STATUSES
+    )
+    for batch_id in sorted(batch_counts):
+        batch_entry(progress, batch_id)["processed_count"] = batch_counts[batch_id]
+
+    return finish_progress(progress, events)
+
+
+def apply_progress_delta(
+    progress: Dict, transitions: List[Tuple[Optional[str], Optional[str], Dict]], events
+) -> Dict:
+    """
+    Actualiza progress.json solo con los objetos que cambiaron (modo --watch).
+
+    Da el mismo resultado que progress_from_objects sin recorrer todo el manifest.
+
+    Args:
+        transitions: [(status anterior, batch_id anterior, objeto ya actualizado)]
+        events: Eventos que produjeron los cambios
+    """
+    by_status = progress.setdefault("by_status", {})
+
+    for old_status, old_batch, obj in transitions:
+        new_status = obj.get("status")
+        by_status[old_status] = by_status.get(old_status, 0) - 1
+        if by_status[old_status] <= 0:
+            del by_status[old_status]
+        by_status[new_status] = by_status.get(new_status, 0) + 1
+
+        if old_status in COMPLETED_STATUSES:
+            progress["processed_count"] -= 1
+            if old_batch:
+                batch_entry(progress, old_batch)["processed_count"] -= 1
+        if new_status in COMPLETED_STATUSES:
+            progress["processed_count"] += 1
+            if obj.get("batch_id"):
+                batch_entry(progress, obj["batch_id"])["processed_count"] += 1
+
+    return finish_progress(progress, events)
+
+
+def finish_progress(progress: Dict, events: List[Dict]) -> Dict:
+    """Pendientes, fechas de batches, batch actual y status general de progress."""
+    progress["pending_count"] = progress["total_objects"] - progress["processed_count"]
+
+    batch_times = {}
+    for event in events:
+        if event["event"] == "processed" and event.get("batch_id"):
+            batch_times[event["batch_id"]] = event["ts"]
+            progress["last_object_processed"] = event["object_id"]
+
+    for batch_id in sorted(batch_times):
+        batch = batch_entry(progress, batch_id)
+        batch["completed_at"] = max(batch["completed_at"] or "", batch_times[batch_id])
+
+    if progress["batches"]:
+        progress["current_batch"] = max(
+            (batch["batch_id"] for batch in progress["batches"]),
+            key=lambda batch_id: (len(batch_id), batch_id),
+        )
+    if events:
+        progress["last_updated"] = max(
+            progress.get("last_updated") or "", max(event["ts"] for event in events)
+        )
+
+    if progress["pending_count"] == 0:
+        progress["status"] = "completed"
+    elif progress["processed_count"] > 0:
+        progress["status"] = "in_progress"
+
+    return progress
+
+
+def load_progress_snapshot() -> Dict:
+    """Carga progress.json (sin aplicar el journal)."""
+    with open(PROGRESS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_current_state() -> Tuple[Dict, Dict, List[Dict]]:
+    """
+    Estado actual sin escribir nada: snapshots + journal aplicado en memoria.
+
+    Returns:
+        (índice del manifest, progress, eventos pendientes de compactar)
+    """
+    manifest = load_manifest_index()
+    progress = load_progress_snapshot()
+    events = read_events()
+    apply_events(manifest["objects"], events)
+    progress_from_objects(progress, manifest["objects"], events)
+    return manifest, progress, events
+
+
+def write_progress_snapshot() -> Tuple[Dict, Dict, List[Dict]]:
+    """
+    Escribe progress.json con el journal aplicado, sin tocar el manifest ni el journal.
+
+    Aplicar el journal de nuevo sobre este snapshot da el mismo resultado
+    (progress_from_objects deriva los contadores del status de los objetos).
+
+    Returns:
+        Lo mismo que load_current_state
+    """
+    with journal_lock():
+        manifest, progress, events = load_current_state()
+        write_json_atomic(PROGRESS_FILE, progress)
+    return manifest, progress, events
+
+
+def compact_journal(blocking: bool = True) -> Optional[int]:
+    """
+    Aplica el journal a los snapshots (manifest + progress.json) y lo vacía.
+
+    Orden: manifest → progress.json → truncar journal. Un corte en cualquier
+    punto deja el journal intacto y la siguiente compactación lo reaplica.
+
+    Returns:
+        Eventos compactados, o None si otro proceso tiene el lock (blocking=False)
+    """
+    with journal_lock(blocking) as locked:
+        if not locked:
+            return None
+
+        events = read_events()
+        if not events:
+            return 0
+
+        manifest = load_manifest_index()
+        updates = apply_events(manifest["objects"], events)
+        if updates:
+            update_manifest_objects(updates)
+
+        progress = progress_from_objects(
+            load_progress_snapshot(), manifest["objects"], events
+        )
+        write_json_atomic(PROGRESS_FILE, progress)
+        truncate_journal()
+
+        return len(events)
+
+
+def truncate_journal():
+    """Vacía el journal (llamar con el lock tomado, después de escribir snapshots)."""
+    with open(JOURNAL_FILE, "w", encoding="utf-8") as f:
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def reconcile_objects(
+    objects: List[Dict], output_batches: Dict[str, str]
+) -> Dict[str, Dict]:
+    """
+    Ajusta el status de Fase 1 a los outputs encontrados (en memoria).
+
+    - pending/failed con output → processed (batch_id = batch del output)
+    - processed con output en otro batch → batch_id corregido
+    - processed sin output → pending (vuelve a planificarse)
+
+    converted/compiled y reference_only no se tocan.
+
+    Args:
+        objects: Objetos del manifest (o del índice)
+        output_batches: {object_id: batch_id del directorio con su output}
+
+    Returns:
+        {object_id: campos modificados} para update_manifest_objects
+    """
+    timestamp = datetime.now().isoformat()
+    updates = {}
+
+    for obj in objects:
+        status = obj.get("status")
+        batch_id = output_batches.get(obj["object_id"])
+
+        if status in ("pending", "failed") and batch_id:
+            changes = {
+                "status": "processed",
+                "processed_at": timestamp,
+                "batch_id": batch_id,
+            }
+        elif status == "processed" and batch_id and obj.get("batch_id") != batch_id:
+            changes = {"batch_id": batch_id}
+        elif status == "processed" and not batch_id:
+            changes = {"status": "pending", "processed_at": None, "batch_id": None}
+        else:
+            continue
+
+        obj.update(changes)
+        updates[obj["object_id"]] = changes
+
+    return updates
+
+
+def rebuild_snapshots(output_batches: Dict[str, str]) -> Tuple[Dict, Dict, Dict]:
+    """
+    Recalcula manifest y progress.json desde cero a partir de los outputs.
+
+    Bajo el lock del journal: aplica los eventos pendientes, reconcilia con los
+    outputs (reconcile_objects), recalcula los contadores de cada batch desde el
+    status de los objetos y vacía el journal.
+
+    Returns:
+        (índice del manifest, progress, updates aplicados)
+    """
+    with journal_lock():
+        events = read_events()
+        manifest = load_manifest_index()
+        updates = apply_events(manifest["objects"], events)
+        for object_id, changes in reconcile_objects(
+            manifest["objects"], output_batches
+        ).items():
+            updates.setdefault(object_id, {}).update(changes)
+        if updates:
+            update_manifest_objects(updates)
+
+        progress = load_progress_snapshot()
+        progress["status"] = "initialized"
+        for batch in progress["batches"]:
+            batch["processed_count"] = 0
+        progress_from_objects(progress, manifest["objects"], events)
+        write_json_atomic(PROGRESS_FILE, progress)
+        truncate_journal()
+
+    return manifest, progress, updates
+
+
+def discard_journal() -> int:
+    """
+    Elimina el journal sin aplicarlo (el manifest se regeneró con IDs nuevos).
+
+    Returns:
+        Eventos descartados
+    """
+    with journal_lock():
+        events = read_events()
+        if JOURNAL_FILE.exists():
+            JOURNAL_FILE.unlink()
+        return len(events)
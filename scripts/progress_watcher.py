@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Modo watch de update_progress.py: aplica al progreso cada output apenas aparece.
+
+PROPÓSITO:
+    Sin watch, alguien tiene que correr update_progress.py batch_XXX después de
+    cada batch y /migrate-status queda desactualizado entre ejecuciones. El modo
+    watch sigue los directorios de outputs de los agentes y, por cada archivo
+    nuevo o modificado, registra un evento en el journal y actualiza
+    progress.json solo con ese delta (sin re-escanear directorios).
+
+CONCURRENCIA:
+    Otros procesos escriben al mismo journal mientras el watch corre
+    (update_progress.py --record, --reconcile, --compact). Cada delta toma el
+    lock, aplica primero los eventos ajenos agregados desde el delta anterior
+    (read_events_from) y recién después escribe progress.json. Si progress.json
+    cambió (compactación o reconciliación de otro proceso), recarga todo.
+
+DIRECTORIOS Y EVENTOS:
+    knowledge/json/<batch_id>/obj_XXXX_*.json → processed (batch_id del directorio)
+    migrated/<schema|standalone|...>/*.sql    → converted
+    compilation/success/*.log                 → compiled
+    compilation/errors/*.log                  → compile_failed
+    shadow_tests/results/*                    → tested
+    shadow_tests/mismatches|discrepancies/*   → test_failed
+
+    El objeto se identifica por el object_id del nombre (obj_XXXX) o, si no
+    tiene, por object_name (y el directorio del package si hay homónimos).
+
+DETECCIÓN DE CAMBIOS:
+    - inotify (Linux, vía ctypes): IN_CLOSE_WRITE / IN_MOVED_TO por archivo; los
+      subdirectorios nuevos (p. ej. knowledge/json/batch_012/) se agregan al vuelo
+    - Sin inotify (macOS, Windows) o con --polling: compara mtime/tamaño cada
+      POLL_INTERVAL segundos
+
+    Al arrancar se hace un único escaneo para registrar los outputs que
+    aparecieron mientras el watch no corría (en orden de mtime).
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene sql/extracted/ y knowledge/
+"""
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from manifest_store import BASE_DIR, write_json_atomic
+from progress_journal import (
+    EVENT_STATUS,
+    JOURNAL_COMPACT_EVENTS,
+    JOURNAL_FILE,
+    PROGRESS_FILE,
+    apply_events,
+    apply_progress_delta,
+    compact_journal,
+    journal_lock,
+    load_current_state,
+    read_events_from,
+    write_records,
+)
+
+# Directorios observados (relativos a BASE_DIR)
+WATCH_ROOTS = ("knowledge/json", "migrated", "compilation", "shadow_tests")
+
+# Directorio de output → evento
+OUTPUT_EVENTS = {
+    ("compilation", "success"): "compiled",
+    ("compilation", "errors"): "compile_failed",
+    ("shadow_tests", "results"): "tested",
+    ("shadow_tests", "mismatches"): "test_failed",
+    ("shadow_tests", "discrepancies"): "test_failed",
+}
+
+OBJECT_ID_PATTERN = re.compile(r"(?:^|_)(obj_\d+)")
+
+POLL_INTERVAL = 2.0  # Segundos entre escaneos en modo polling
+DEBOUNCE_SECONDS = 0.5  # Espera para agrupar outputs que llegan juntos
+
+# inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def output_event(relative: Path) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Evento que corresponde a un archivo de output.
+
+    Returns:
+        (evento, batch_id) o None si el archivo no es un output de un agente
+    """
+    parts = relative.parts
+    if parts[:2] == ("knowledge", "json") and len(parts) == 4:
+        return ("processed", parts[2]) if relative.suffix == ".json" else None
+    if parts[0] == "migrated" and len(parts) >= 3:
+        # _create_schema.sql y otros auxiliares del package empiezan con "_"
+        if relative.suffix == ".sql" and not relative.name.startswith("_"):
+            return ("converted", None)
+        return None
+    if len(parts) == 3 and parts[:2] in OUTPUT_EVENTS:
+        return (OUTPUT_EVENTS[parts[:2]], None)
+    return None
+
+
+def build_name_index(objects: List[Dict]) -> Dict[str, List[Dict]]:
+    """
+    object_name (en minúsculas) → objetos con ese nombre.
+
+    Los hijos de packages ("PKG.PROC") se indexan también por el nombre corto:
+    plsql-converter los escribe como migrated/{schema}/{proc}.sql.
+    """
+    by_name = {}
+    for obj in objects:
+        name = obj["object_name"].lower()
+        by_name.setdefault(name, []).append(obj)
+        if "." in name:
+            by_name.setdefault(name.rsplit(".", 1)[1], []).append(obj)
+    return by_name
+
+
+def resolve_object(
+    relative: Path, by_id: Dict[str, Dict], by_name: Dict[str, List[Dict]]
+) -> Optional[Dict]:
+    """
+    Objeto del manifest al que pertenece un output (None si no se puede saber).
+
+    Primero por object_id en el nombre; si no, por object_name. Con homónimos se
+    usa el directorio: migrated/{package}/ elige el hijo de ese package y
+    cualquier otro directorio el objeto sin package (standalone).
+    """
+    match = OBJECT_ID_PATTERN.search(relative.stem)
+    if match:
+        return by_id.get(match.group(1))
+    if relative.parts[:2] == ("knowledge", "json"):
+        return None
+
+    candidates = by_name.get(relative.stem.lower(), [])
+    if len(candidates) > 1:
+        directory = relative.parent.name.lower()
+        in_package = [
+            obj
+            for obj in candidates
+            if (obj.get("parent_package") or "").lower() == directory
+        ]
+        candidates = in_package or [
+            obj for obj in candidates if not obj.get("parent_package")
+        ]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def scan_outputs(base_dir: Path = BASE_DIR) -> Dict[Path, os.stat_result]:
+    """Todos los archivos bajo WATCH_ROOTS con su stat (escaneo inicial y polling)."""
+    files = {}
+    for root in WATCH_ROOTS:
+        for dirpath, _, filenames in os.walk(base_dir / root):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                try:
+                    files[path.relative_to(base_dir)] = path.stat()
+                except FileNotFoundError:
+                    continue
+    return files
+
+
+def load_libc_inotify():
+    """libc con inotify_init1/inotify_add_watch, o None si no está disponible."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def by_mtime(files: Dict[Path, os.stat_result]) -> List[Path]:
+    """Archivos en el orden en que se escribieron."""
+    return sorted(files, key=lambda relative: files[relative].st_mtime_ns)
+
+
+def polling_changes(base_dir: Path, interval: float) -> Iterator[List[Path]]:
+    """
+    Archivos nuevos o modificados (mtime/tamaño) en cada escaneo.
+
+    El primer lote son todos los archivos existentes, en orden de mtime.
+    """
+    files = scan_outputs(base_dir)
+    known = {
+        relative: (stat.st_mtime_ns, stat.st_size) for relative, stat in files.items()
+    }
+    yield by_mtime(files)
+
+    while True:
+        time.sleep(interval)
+        changed = []
+        for relative, stat in scan_outputs(base_dir).items():
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if known.get(relative) != signature:
+                known[relative] = signature
+                changed.append(relative)
+        if changed:
+            yield changed
+
+
+def inotify_changes(base_dir: Path, libc, interval: float) -> Iterator[List[Path]]:
+    """
+    Archivos escritos o movidos bajo WATCH_ROOTS, agrupados por DEBOUNCE_SECONDS.
+
+    El primer lote son todos los archivos existentes en orden de mtime, leídos
+    después de instalar los watches (no se pierde nada escrito en el medio). Los
+    directorios creados después (batch nuevo, schema nuevo) se observan al
+    aparecer y se incluyen los archivos que ya tengan. Si la cola del kernel se
+    desborda (IN_Q_OVERFLOW) se re-emiten todos los archivos (el llamador descarta
+    los que no cambiaron).
+    """
+    fd = libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+
+    watches = {}  # wd → directorio absoluto
+
+    def add_tree(directory: Path) -> List[Path]:
+        """Observa directory y sus subdirectorios; retorna los archivos que ya tienen."""
+        existing = []
+        for dirpath, _, filenames in os.walk(directory):
+            wd = libc.inotify_add_watch(fd, os.fsencode(dirpath), INOTIFY_MASK)
+            if wd >= 0:
+                watches[wd] = Path(dirpath)
+            existing.extend(
+                (Path(dirpath) / name).relative_to(base_dir) for name in filenames
+            )
+        return existing
+
+    pending_roots = []
+    for root in WATCH_ROOTS:
+        if (base_dir / root).is_dir():
+            add_tree(base_dir / root)
+        else:
+            pending_roots.append(root)
+
+    try:
+        yield by_mtime(scan_outputs(base_dir))
+
+        while True:
+            changed = []
+
+            # Raíces que todavía no existían (p. ej. migrated/ antes de la Fase 2)
+            for root in list(pending_roots):
+                if (base_dir / root).is_dir():
+                    pending_roots.remove(root)
+                    changed.extend(add_tree(base_dir / root))
+
+            timeout = interval
+            while select.select([fd], [], [], timeout)[0]:
+                data = os.read(fd, 64 * 1024)
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                    name = data[
+                        offset
+                        + INOTIFY_EVENT.size : offset
+                        + INOTIFY_EVENT.size
+                        + length
+                    ]
+                    offset += INOTIFY_EVENT.size + length
+
+                    if mask & IN_Q_OVERFLOW:
+                        changed.extend(scan_outputs(base_dir))
+                        continue
+                    if wd not in watches:
+                        continue
+
+                    path = watches[wd] / os.fsdecode(name.rstrip(b"\0"))
+                    if mask & IN_ISDIR:
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            changed.extend(add_tree(path))
+                    elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                        changed.append(path.relative_to(base_dir))
+                timeout = DEBOUNCE_SECONDS
+
+            if changed:
+                yield list(dict.fromkeys(changed))
+    finally:
+        os.close(fd)
+
+
+def output_records(
+    paths: List[Path],
+    base_dir: Path,
+    seen: Dict[Path, Tuple[int, int]],
+    by_id: Dict[str, Dict],
+    by_name: Dict[str, List[Dict]],
+    transitions: List[Tuple[Optional[str], Optional[str], Dict]],
+) -> Tuple[List[Dict], int]:
+    """
+    Convierte outputs nuevos o modificados en eventos y los aplica en memoria.
+
+    Se omiten los archivos ya vistos con el mismo mtime/tamaño y los eventos que no
+    cambian el objeto (p. ej. processed de un objeto que ya no está en pending).
+    Dentro de un mismo lote solo cuenta el último output de Fase 2-4 de cada objeto
+    (al re-arrancar, el .sql convertido no pisa el .log compilado más reciente);
+    processed siempre se aplica porque es el que asigna el batch_id.
+
+    Returns:
+        (eventos para el journal, outputs sin objeto identificable)
+    """
+    outputs = []
+    unresolved = 0
+
+    for relative in paths:
+        event = output_event(relative)
+        if event is None:
+            continue
+        try:
+            stat = (base_dir / relative).stat()
+        except FileNotFoundError:
+            continue
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if seen.get(relative) == signature:
+            continue
+        seen[relative] = signature
+
+        obj = resolve_object(relative, by_id, by_name)
+        if obj is None:
+            unresolved += 1
+            continue
+        outputs.append((relative, event, obj))
+
+    last_output = {
+        obj["object_id"]: position
+        for position, (_, (name, _), obj) in enumerate(outputs)
+        if name != "processed"
+    }
+
+    records = []
+    for position, (relative, (name, batch_id), obj) in enumerate(outputs):
+        if name == "processed" and obj.get("status") != "pending":
+            continue
+        if name != "processed" and (
+            last_output[obj["object_id"]] != position
+            or obj.get("status") == EVENT_STATUS[name]
+        ):
+            continue
+
+        record = {
+            "ts": datetime.now().isoformat(),
+            "event": name,
+            "object_id": obj["object_id"],
+            "detail": relative.as_posix(),
+        }
+        if batch_id:
+            record["batch_id"] = batch_id
+
+        before = (obj.get("status"), obj.get("batch_id"))
+        apply_events([obj], [record])
+        transitions.append((before[0], before[1], obj))
+        records.append(record)
+
+    return records, unresolved
+
+
+def file_size(path: Path) -> int:
+    """Tamaño de un archivo (0 si no existe)."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime, tamaño): cambia con cada write_json_atomic de otro proceso."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def watch_progress(
+    base_dir: Path = BASE_DIR, interval: float = POLL_INTERVAL, polling: bool = False
+):
+    """
+    Sigue los outputs de los agentes y mantiene el progreso al día hasta Ctrl+C.
+
+    Cada delta, bajo el lock del journal: aplicar lo que otros procesos
+    registraron desde el delta anterior (update_progress.py --record, otro
+    --reconcile...), agregar los eventos nuevos y escribir progress.json (atomic).
+    Así progress.json nunca pisa progreso ajeno con la copia en memoria. El
+    journal se compacta cada JOURNAL_COMPACT_EVENTS eventos, igual que en
+    update_progress.py.
+    """
+    state = {}
+    seen = {}
+
+    def reload_state():
+        """Snapshots + journal completos (al arrancar o si cambió progress.json)."""
+        manifest, progress, events = load_current_state()
+        state.update(
+            progress=progress,
+            by_id={obj["object_id"]: obj for obj in manifest["objects"]},
+            by_name=build_name_index(manifest["objects"]),
+            journal_events=len(events),
+            journal_offset=file_size(JOURNAL_FILE),
+            snapshot=file_signature(PROGRESS_FILE),
+        )
+
+    def refresh_state():
+        """Aplica lo que otros procesos agregaron al journal (con el lock tomado)."""
+        if (
+            file_signature(PROGRESS_FILE) != state["snapshot"]
+            or file_size(JOURNAL_FILE) < state["journal_offset"]
+        ):
+            # Compactación, --reconcile o manifest regenerado: releer todo
+            reload_state()
+            return
+
+        events, state["journal_offset"] = read_events_from(state["journal_offset"])
+        if not events:
+            return
+        transitions = []
+        for event in events:
+            obj = state["by_id"].get(event["object_id"])
+            if obj is None:
+                continue
+            before = (obj.get("status"), obj.get("batch_id"))
+            if apply_events([obj], [event]):
+                transitions.append((before[0], before[1], obj))
+        apply_progress_delta(state["progress"], transitions, events)
+        state["journal_events"] += len(events)
+
+    with journal_lock():
+        reload_state()
+    progress = state["progress"]
+
+    libc = None if polling else load_libc_inotify()
+    backend = "inotify" if libc else f"polling cada {interval:g}s"
+    print(f"👀 Observando {', '.join(WATCH_ROOTS)} ({backend})")
+    print("   Ctrl+C para terminar\n")
+
+    def apply_delta(paths: List[Path]):
+        nonlocal progress
+        transitions = []
+        with journal_lock():
+            refresh_state()
+            progress = state["progress"]
+            records, unresolved = output_records(
+                paths, base_dir, seen, state["by_id"], state["by_name"], transitions
+            )
+            if records:
+                write_records(records)
+                apply_progress_delta(progress, transitions, records)
+                write_json_atomic(PROGRESS_FILE, progress)
+                state["journal_events"] += len(records)
+                state["journal_offset"] = file_size(JOURNAL_FILE)
+                state["snapshot"] = file_signature(PROGRESS_FILE)
+
+        if unresolved:
+            print(f"  ⚠️  {unresolved} outputs sin objeto identificable en el manifest")
+        if not records:
+            return
+
+        if state["journal_events"] >= JOURNAL_COMPACT_EVENTS:
+            compact_journal(blocking=False)
+
+        counts = {}
+        for record in records:
+            counts[record["event"]] = counts.get(record["event"], 0) + 1
+        summary = ", ".join(f"{name} {count}" for name, count in counts.items())
+        print(
+            f"  🔄 {datetime.now():%H:%M:%S} +{len(records)} eventos ({summary}) → "
+            f"{progress['processed_count']}/{progress['total_objects']} analizados"
+        )
+
+    changes = (
+        inotify_changes(base_dir, libc, interval)
+        if libc
+        else polling_changes(base_dir, interval)
+    )
+    try:
+        # Primer lote: outputs que llegaron mientras el watch no corría
+        existing = next(changes)
+        apply_delta(existing)
+        print(
+            f"  ✅ {len(existing)} archivos existentes revisados, "
+            f"{progress['processed_count']}/{progress['total_objects']} analizados"
+        )
+
+        for paths in changes:
+            apply_delta(paths)
+    except KeyboardInterrupt:
+        print(f"\n✅ Watch terminado: {progress['processed_count']} analizados")
+        by_status = ", ".join(
+            f"{status} {count}"
+            for status, count in sorted(progress["by_status"].items())
+        )
+        print(f"   Por status: {by_status}")
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Scheduler por camino crítico sobre dependency_graph.json (conversión/compilación).
+
+PROPÓSITO:
+    migration_order.json agrupa los objetos en niveles y plpgsql-validator
+    compila nivel por nivel: un objeto lento del nivel N frena todo el nivel N+1,
+    aunque la mayoría de esos objetos no dependa de él. Este scheduler libera cada
+    objeto apenas terminan SUS dependencias y simula N agentes en paralelo para
+    producir una cola por agente y el makespan estimado.
+
+MODELO DE COSTO (segundos estimados por objeto):
+    costo = BASE_SECONDS + code_length / 1000 * SECONDS_PER_KCHAR
+
+PRIORIDAD:
+    Camino más largo hacia abajo (bottom level): costo del objeto + el mayor
+    bottom level de los objetos que dependen de él. Se atiende primero lo que
+    alarga el camino crítico.
+
+LOCALIDAD POR PACKAGE:
+    El PACKAGE_BODY y sus procedures/functions se ejecutan en el mismo agente: el
+    primero del package que se asigna fija el agente y el resto del package solo
+    se asigna a ese agente (comparte contexto y el orden de compilación interno).
+
+CICLOS:
+    Se programa el grafo de condensación: cada componente fuertemente conexa
+    (build_dependency_graph.find_strongly_connected_components, las mismas SCCs
+    de circular_groups) es una unidad. Los objetos de un ciclo se ejecutan
+    seguidos en el mismo agente (se compilan juntos con forward declarations) y
+    se marcan "circular" en la salida. Si un ciclo cruza packages, esos packages
+    comparten agente.
+
+ENTRADA:
+    - dependency_graph.json (build_dependency_graph.py)
+    - Manifest (code_length, parent_package; cualquier layout)
+
+SALIDA:
+    - migration_schedule.json: cola por agente (object_id, inicio, fin estimados),
+      makespan estimado y comparación con la ejecución nivel por nivel
+
+USO:
+    python scripts/schedule_migration.py [--workers N] [--base-seconds S]
+                                         [--seconds-per-kchar S]
+
+IMPORTANTE: Usa Path.cwd() igual que el resto de scripts: debe ejecutarse desde el
+            directorio que contiene dependency_graph.json y sql/extracted/
+"""
+
+import heapq
+import json
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from build_dependency_graph import (
+    DEPENDENCY_GRAPH_FILE,
+    find_strongly_connected_components,
+)
+from manifest_store import (
+    BASE_DIR,
+    load_manifest_index,
+    manifest_exists,
+    write_json_atomic,
+)
+
+SCHEDULE_FILE = BASE_DIR / "migration_schedule.json"
+
+DEFAULT_WORKERS = 20
+BASE_SECONDS = 30.0  # Costo fijo por objeto (lectura, prompt, compilación)
+SECONDS_PER_KCHAR = 10.0  # Costo por cada 1,000 caracteres de código
+
+
+def object_costs(
+    graph: Dict[str, Dict],
+    manifest_objects: List[Dict],
+    base_seconds: float,
+    seconds_per_kchar: float,
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    """
+    Costo estimado y package de cada objeto del grafo.
+
+    Returns:
+        ({object_id: segundos}, {object_id: nombre del package o None})
+    """
+    manifest_by_id = {obj["object_id"]: obj for obj in manifest_objects}
+    costs = {}
+    packages = {}
+
+    for object_id in graph:
+        obj = manifest_by_id.get(object_id, {})
+        costs[object_id] = (
+            base_seconds + obj.get("code_length", 0) / 1000 * seconds_per_kchar
+        )
+        if obj.get("parent_package"):
+            packages[object_id] = obj["parent_package"]
+        elif obj.get("object_type") == "PACKAGE_BODY":
+            packages[object_id] = obj["object_name"]
+        else:
+            packages[object_id] = None
+
+    return costs, packages
+
+
+def condensation(
+    graph: Dict[str, Dict],
+) -> Tuple[List[List[str]], Dict[int, List[int]]]:
+    """
+    Grafo de condensación: una unidad por SCC, en orden topológico.
+
+    Returns:
+        (miembros de cada unidad, {unidad: unidades de las que depende})
+    """
+    nodes = list(graph)
+    adj_list = {node: graph[node]["depends_on"] for node in nodes}
+    components = find_strongly_connected_components(nodes, adj_list)
+
+    unit_of = {}
+    for unit, members in enumerate(components):
+        for object_id in members:
+            unit_of[object_id] = unit
+
+    dependencies = {}
+    for unit, members in enumerate(components):
+        dependencies[unit] = sorted(
+            {
+                unit_of[dependency]
+                for object_id in members
+                for dependency in adj_list[object_id]
+                if dependency in unit_of and unit_of[dependency] != unit
+            }
+        )
+    return components, dependencies
+
+
+def unit_packages(
+    components: List[List[str]], packages: Dict[str, Optional[str]]
+) -> Dict[int, Optional[str]]:
+    """
+    Package de cada unidad; los packages unidos por un ciclo cuentan como uno.
+
+    Un ciclo entre PKG_A y PKG_B se ejecuta en un solo agente, así que ambos
+    packages deben fijarse a ese agente (se representan con el primero).
+    """
+    parent = {}
+
+    def find(package: str) -> str:
+        while parent.setdefault(package, package) != package:
+            parent[package] = parent[parent[package]]
+            package = parent[package]
+        return package
+
+    for members in components:
+        member_packages = [packages[m] for m in members if packages[m] is not None]
+        for package in member_packages[1:]:
+            parent[find(package)] = find(member_packages[0])
+
+    result = {}
+    for unit, members in enumerate(components):
+        package = next((packages[m] for m in members if packages[m] is not None), None)
+        result[unit] = find(package) if package is not None else None
+    return result
+
+
+def bottom_levels(
+    order: List[int], dependencies: Dict[int, List[int]], costs: Dict[int, float]
+) -> Dict[int, float]:
+    """Camino más largo (en segundos) desde cada unidad hasta el final del grafo."""
+    dependents = {unit: [] for unit in dependencies}
+    for unit, deps in dependencies.items():
+        for dependency in deps:
+            dependents[dependency].append(unit)
+
+    levels = {}
+    for unit in reversed(order):
+        levels[unit] = costs[unit] + max(
+            (levels[dependent] for dependent in dependents[unit]), default=0.0
+        )
+    return levels
+
+
+def simulate_schedule(
+    dependencies: Dict[int, List[int]],
+    costs: Dict[int, float],
+    packages: Dict[int, Optional[str]],
+    bottom: Dict[int, float],
+    workers: int,
+) -> Tuple[List[List[Dict]], float]:
+    """
+    Simula N agentes: cada uno toma la unidad lista de mayor prioridad.
+
+    Una unidad (un objeto, o un ciclo completo) está lista cuando terminaron
+    todas sus dependencias. Cada package se fija a un agente cuando su primera
+    unidad queda lista (el agente con menos trabajo de packages pendiente) y
+    todas sus unidades se ejecutan en ese agente: el package es una cadena, así
+    que su prioridad es el máximo entre el bottom level de la unidad y el trabajo
+    total del package.
+
+    Returns:
+        (cola por agente [{unit, start, finish}], makespan en segundos)
+    """
+    dependents = {unit: [] for unit in dependencies}
+    pending = {}
+    for unit, deps in dependencies.items():
+        pending[unit] = len(deps)
+        for dependency in deps:
+            dependents[dependency].append(unit)
+
+    package_work = {}
+    for unit, package in packages.items():
+        if package is not None:
+            package_work[package] = package_work.get(package, 0.0) + costs[unit]
+
+    package_worker = {}
+    package_backlog = [0.0] * workers  # Trabajo de packages fijado y sin empezar
+    shared_ready = []  # (-prioridad, -bottom level, unit) sin package
+    worker_ready = [[] for _ in range(workers)]
+
+    def release(unit: int):
+        package = packages[unit]
+        priority = max(bottom[unit], package_work.get(package, 0.0))
+        entry = (-priority, -bottom[unit], unit)
+        if package is None:
+            heapq.heappush(shared_ready, entry)
+            return
+
+        if package not in package_worker:
+            worker = min(range(workers), key=lambda w: package_backlog[w])
+            package_worker[package] = worker
+            package_backlog[worker] += package_work[package]
+        heapq.heappush(worker_ready[package_worker[package]], entry)
+
+    for unit, count in pending.items():
+        if count == 0:
+            release(unit)
+
+    queues = [[] for _ in range(workers)]
+    running = []  # (fin, agente, unit)
+    idle = set(range(workers))
+    now = 0.0
+
+    while True:
+        for worker in sorted(idle):
+            own = worker_ready[worker]
+            if own and (not shared_ready or own[0] <= shared_ready[0]):
+                unit = heapq.heappop(own)[2]
+                package_backlog[worker] -= costs[unit]
+            elif shared_ready:
+                unit = heapq.heappop(shared_ready)[2]
+            else:
+                continue
+
+            finish = now + costs[unit]
+            queues[worker].append({"unit": unit, "start": now, "finish": finish})
+            heapq.heappush(running, (finish, worker, unit))
+            idle.discard(worker)
+
+        if not running:
+            break
+
+        now = running[0][0]
+        while running and running[0][0] == now:
+            _, worker, unit = heapq.heappop(running)
+            idle.add(worker)
+            for dependent in dependents[unit]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    release(dependent)
+
+    return queues, now
+
+
+def level_barrier_makespan(
+    order: List[int],
+    dependencies: Dict[int, List[int]],
+    costs: Dict[int, float],
+    workers: int,
+) -> float:
+    """
+    Makespan estimado compilando nivel por nivel (como migration_order.json).
+
+    Cada nivel se reparte con LPT (el más largo primero al agente más libre) y el
+    siguiente nivel empieza cuando termina la última unidad del anterior.
+    """
+    levels = {}
+    for unit in order:
+        levels[unit] = 1 + max(
+            (levels[dependency] for dependency in dependencies[unit]), default=-1
+        )
+
+    by_level = {}
+    for unit, level in levels.items():
+        by_level.setdefault(level, []).append(costs[unit])
+
+    total = 0.0
+    for level in sorted(by_level):
+        loads = [0.0] * workers
+        for cost in sorted(by_level[level], reverse=True):
+            heapq.heapreplace(loads, loads[0] + cost)
+        total += max(loads)
+    return total
+
+
+def build_schedule(
+    graph: Dict[str, Dict],
+    manifest_objects: List[Dict],
+    workers: int = DEFAULT_WORKERS,
+    base_seconds: float = BASE_SECONDS,
+    seconds_per_kchar: float = SECONDS_PER_KCHAR,
+) -> Dict:
+    """
+    Genera el schedule completo (formato de migration_schedule.json).
+
+    Args:
+        graph: "graph" de dependency_graph.json
+        manifest_objects: Objetos (o índice) del manifest
+        workers: Agentes en paralelo
+    """
+    costs, packages = object_costs(
+        graph, manifest_objects, base_seconds, seconds_per_kchar
+    )
+    components, dependencies = condensation(graph)
+    order = list(range(len(components)))
+    unit_costs = {
+        unit: sum(costs[object_id] for object_id in components[unit]) for unit in order
+    }
+    bottom = bottom_levels(order, dependencies, unit_costs)
+
+    queues, makespan = simulate_schedule(
+        dependencies, unit_costs, unit_packages(components, packages), bottom, workers
+    )
+    barrier_makespan = level_barrier_makespan(order, dependencies, unit_costs, workers)
+    total_work = sum(costs.values())
+    critical_path = max(bottom.values(), default=0.0)
+
+    package_work = {}
+    for object_id, package in packages.items():
+        if package is not None:
+            package_work[package] = package_work.get(package, 0.0) + costs[object_id]
+    largest_package = max(package_work.values(), default=0.0)
+
+    # Ciclos: SCCs de más de un objeto o con dependencia a sí mismo
+    circular_units = [
+        members
+        for members in components
+        if len(members) > 1 or members[0] in graph[members[0]]["depends_on"]
+    ]
+    circular = {object_id for members in circular_units for object_id in members}
+
+    worker_queues = []
+    for worker, queue in enumerate(queues, start=1):
+        # Los objetos de una unidad se ejecutan seguidos en el agente
+        items = []
+        for item in queue:
+            members = components[item["unit"]]
+            start = item["start"]
+            for object_id in members:
+                items.append(
+                    {
+                        "object_id": object_id,
+                        "start": round(start, 1),
+                        "finish": round(start + costs[object_id], 1),
+                        "depends_on": [
+                            dependency
+                            for dependency in graph[object_id]["depends_on"]
+                            if dependency in graph and dependency not in members
+                        ],
+                        **({"circular": True} if object_id in circular else {}),
+                    }
+                )
+                start += costs[object_id]
+
+        worker_queues.append(
+            {
+                "worker": worker,
+                "objects": len(items),
+                "busy_seconds": round(sum(costs[i["object_id"]] for i in items)),
+                "packages": sorted(
+                    {
+                        packages[i["object_id"]]
+                        for i in items
+                        if packages[i["object_id"]]
+                    }
+                ),
+                "queue": items,
+            }
+        )
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "workers": workers,
+        "cost_model": {
+            "base_seconds": base_seconds,
+            "seconds_per_kchar": seconds_per_kchar,
+        },
+        "total_objects": len(graph),
+        "total_work_seconds": round(total_work),
+        "critical_path_seconds": round(critical_path),
+        "largest_package_seconds": round(largest_package),
+        "predicted_makespan_seconds": round(makespan),
+        "level_by_level_makespan_seconds": round(barrier_makespan),
+        "lower_bound_seconds": round(
+            max(total_work / workers, critical_path, largest_package)
+        ),
+        "circular_groups": len(circular_units),
+        "circular_objects": len(circular),
+        "worker_queues": worker_queues,
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """Segundos → "Hh MMm" (o "MMm SSs" si es menos de una hora)."""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m {seconds % 60:02d}s"
+
+
+def get_option(name: str) -> Optional[str]:
+    """Lee el valor de una opción --nombre VALOR de sys.argv."""
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return None
+
+
+def main():
+    """Función principal"""
+    workers = int(get_option("--workers") or DEFAULT_WORKERS)
+    base_seconds = float(get_option("--base-seconds") or BASE_SECONDS)
+    seconds_per_kchar = float(get_option("--seconds-per-kchar") or SECONDS_PER_KCHAR)
+
+    print("=" * 80)
+    print("SCHEDULER POR CAMINO CRÍTICO")
+    print("=" * 80)
+
+    if not DEPENDENCY_GRAPH_FILE.exists():
+        print(f"❌ Error: {DEPENDENCY_GRAPH_FILE} no existe")
+        print("   Ejecuta primero: python scripts/build_dependency_graph.py")
+        sys.exit(1)
+    if not manifest_exists():
+        print("❌ Error: manifest no existe")
+        print("   Ejecuta primero: python scripts/prepare_migration.py")
+        sys.exit(1)
+
+    with open(DEPENDENCY_GRAPH_FILE, "r", encoding="utf-8") as f:
+        dependency_graph = json.load(f)
+
+    print(f"\n📖 {len(dependency_graph['graph'])} objetos, {workers} agentes\n")
+    schedule = build_schedule(
+        dependency_graph["graph"],
+        load_manifest_index()["objects"],
+        workers,
+        base_seconds,
+        seconds_per_kchar,
+    )
+    write_json_atomic(SCHEDULE_FILE, schedule)
+
+    makespan = schedule["predicted_makespan_seconds"]
+    barrier = schedule["level_by_level_makespan_seconds"]
+    print(f"⏱️  Makespan estimado: {format_duration(makespan)}")
+    print(
+        f"   Nivel por nivel:   {format_duration(barrier)}"
+        + (f" ({1 - makespan / barrier:.0%} menos)" if barrier else "")
+    )
+    print(f"   Camino crítico:    {format_duration(schedule['critical_path_seconds'])}")
+    print(f"   Cota inferior:     {format_duration(schedule['lower_bound_seconds'])}")
+    if schedule["circular_groups"]:
+        print(
+            f"   ⚠️  {schedule['circular_groups']} ciclos "
+            f"({schedule['circular_objects']} objetos): cada uno en un solo agente "
+            f"(requieren forward declarations)"
+        )
+
+    busy = [queue["busy_seconds"] for queue in schedule["worker_queues"]]
+    if makespan:
+        print(
+            f"   Ocupación de agentes: promedio {sum(busy) / len(busy) / makespan:.0%}"
+        )
+
+    print(f"\n✅ Schedule guardado: {SCHEDULE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
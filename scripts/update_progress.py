@@ -4,9 +4,11 @@ Script para actualizar progreso de migración después de cada batch.
 
 Este script:
 1. Lee outputs generados por sub-agentes (knowledge/json/)
-2. Actualiza progress.json con objetos procesados
-3. Marca objetos como completados en manifest
-4. Genera instrucciones para próximo batch
+2. Registra los objetos procesados en el journal de progreso (progress_journal.jsonl)
+3. Escribe progress.json con el journal aplicado y compacta el journal en el
+   manifest cada JOURNAL_COMPACT_EVENTS eventos (ver progress_journal.py)
+4. Re-planifica los objetos pendientes en sql/extracted/batches.json (presupuesto de
+   tokens por agente, ver plan_batches.py) y genera instrucciones para el próximo batch
 
 Uso (desde el proyecto con datos, NO desde el plugin):
     cd /path/to/phantomx-nexus
@@ -16,49 +18,99 @@ Uso (desde el proyecto con datos, NO desde el plugin):
     cd /path/to/phantomx-nexus
     python ../oracle-postgres-migration/scripts/update_progress.py batch_001
 
+    Registrar eventos sueltos (p. ej. cada agente al terminar; no reescribe snapshots):
+    python scripts/update_progress.py --record obj_0001 obj_0002 [--event processed] [--batch batch_001]
+
+    Compactar el journal en manifest + progress.json:
+    python scripts/update_progress.py --compact
+
+    Reconciliar con todos los outputs de knowledge/json/ (duplicados, huérfanos,
+    faltantes) y recalcular el progreso desde cero:
+    python scripts/update_progress.py --reconcile [--dry-run]
+
+    Mantener el progreso al día mientras trabajan los agentes (inotify, o polling
+    donde no hay inotify; ver progress_watcher.py):
+    python scripts/update_progress.py --watch [--polling] [--interval 2]
+
 IMPORTANTE: El script usa Path.cwd() para detectar el directorio del proyecto.
             Debe ejecutarse desde el directorio que contiene sql/extracted/ y knowledge/
 
 Args:
     batch_id: ID del batch completado (ej: batch_001)
+
+Opciones:
+    --compact           Compactar el journal al terminar (sin esperar JOURNAL_COMPACT_EVENTS)
+    --token-budget N    Tokens estimados por agente para planificar batches.json (default: 80000)
+    --event EVENTO      Con --record: processed | failed | converted | compiled | compile_failed | tested | test_failed (default: processed)
+    --batch BATCH_ID    Con --record: batch del evento
+    --detail TEXTO      Con --record: detalle libre (p. ej. motivo de un failed)
+    --dry-run           Con --reconcile: solo reportar, sin modificar manifest ni progress
+    --polling           Con --watch: comparar mtime cada --interval segundos en lugar de inotify
+    --interval S        Con --watch --polling: segundos entre escaneos (default: 2)
 """
 
+import os
+import re
 import sys
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from manifest_store import (
+    MANIFEST_FILE,
+    manifest_exists,
+    manifest_location,
+    write_json_atomic,
+)
+from progress_journal import (
+    EVENT_STATUS,
+    JOURNAL_COMPACT_EVENTS,
+    JOURNAL_FILE,
+    PROGRESS_FILE,
+    append_events,
+    compact_journal,
+    load_current_state,
+    rebuild_snapshots,
+    write_progress_snapshot,
+)
+from progress_watcher import POLL_INTERVAL, watch_progress
+from plan_batches import (
+    AGENT_TOKEN_BUDGET,
+    BATCHES_FILE,
+    next_batch_number,
+    plan_batches,
+    save_batches,
+)
 
 # Directorio base del proyecto (usa CWD para compatibilidad con --plugin-dir)
 BASE_DIR = Path.cwd()
 EXTRACTED_DIR = BASE_DIR / "sql" / "extracted"
 KNOWLEDGE_DIR = BASE_DIR / "knowledge"
 JSON_DIR = KNOWLEDGE_DIR / "json"
-MANIFEST_FILE = EXTRACTED_DIR / "manifest.json"
-PROGRESS_FILE = EXTRACTED_DIR / "progress.json"
+RECONCILE_REPORT_FILE = EXTRACTED_DIR / "reconcile_report.json"
 
+# Outputs de plsql-analyzer: obj_0001_NOMBRE_OBJETO.json (o obj_0001.json)
+OUTPUT_ID_PATTERN = re.compile(r"^(obj_\d+)(?:_.*)?\.json$")
 
-def load_manifest() -> Dict:
-    """Carga manifest.json"""
-    if not MANIFEST_FILE.exists():
+# Directorios de batch escaneados en paralelo en --reconcile
+SCAN_WORKERS = 8
+
+# Ejemplos que se muestran por categoría en el reporte de --reconcile
+REPORT_EXAMPLES = 5
+
+
+def check_state_files():
+    """Verifica que existan el manifest (cualquier layout) y progress.json."""
+    if not manifest_exists():
         print(f"❌ Error: {MANIFEST_FILE} no existe")
         print("   Ejecuta primero: python scripts/prepare_migration.py")
         sys.exit(1)
 
-    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def load_progress() -> Dict:
-    """Carga progress.json"""
     if not PROGRESS_FILE.exists():
         print(f"❌ Error: {PROGRESS_FILE} no existe")
         print("   Ejecuta primero: python scripts/prepare_migration.py")
         sys.exit(1)
 
-    with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
 
 def detect_processed_objects(batch_id: str) -> List[str]:
     """
@@ -79,19 +131,14 @@ def detect_processed_objects(batch_id: str) -> List[str]:
         print(f"   No se encontraron outputs para {batch_id}")
         return []
 
-    # Buscar archivos JSON generados
-    json_files = list(batch_dir.glob("obj_*.json"))
-
-    processed_ids = []
-    for json_file in json_files:
-        # Extraer object_id del nombre de archivo
-        # Formato: obj_0001_NOMBRE_OBJETO.json
-        parts = json_file.stem.split('_', 2)  # Split máximo 2 veces
-        if len(parts) >= 2:
-            object_id = f"{parts[0]}_{parts[1]}"  # obj_0001
-            processed_ids.append(object_id)
-
-    processed_ids.sort()
+    # object_id desde el nombre de archivo (un objeto con varios outputs cuenta una vez)
+    processed_ids = sorted(
+        {
+            match.group(1)
+            for match in map(OUTPUT_ID_PATTERN.match, list_outputs(batch_dir))
+            if match
+        }
+    )
 
     print(f"  ✅ Encontrados {len(processed_ids)} objetos procesados")
     if processed_ids:
@@ -101,92 +148,238 @@ def detect_processed_objects(batch_id: str) -> List[str]:
     return processed_ids
 
 
-def update_manifest(manifest: Dict, processed_ids: List[str]) -> Dict:
-    """
-    Actualiza manifest marcando objetos como procesados.
+def list_outputs(batch_dir: Path) -> List[str]:
+    """Nombres de los archivos .json de un directorio de batch."""
+    with os.scandir(batch_dir) as entries:
+        return [
+            entry.name
+            for entry in entries
+            if entry.name.endswith(".json") and entry.is_file()
+        ]
 
-    Args:
-        manifest: Manifest actual
-        processed_ids: Lista de object_ids procesados
+
+def scan_outputs() -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Escanea todos los directorios de knowledge/json/ en paralelo (SCAN_WORKERS hilos).
 
     Returns:
-        Manifest actualizado
+        ({object_id: ["batch_001/obj_0001_X.json", ...]}, archivos sin object_id)
     """
-    print(f"\n📝 Actualizando manifest...\n")
+    if not JSON_DIR.exists():
+        return {}, []
+
+    batch_dirs = sorted(path for path in JSON_DIR.iterdir() if path.is_dir())
+    outputs = {}
+    unrecognized = []
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        for batch_dir, names in zip(batch_dirs, pool.map(list_outputs, batch_dirs)):
+            for name in sorted(names):
+                match = OUTPUT_ID_PATTERN.match(name)
+                relative = f"{batch_dir.name}/{name}"
+                if match:
+                    outputs.setdefault(match.group(1), []).append(relative)
+                else:
+                    unrecognized.append(relative)
+
+    return outputs, unrecognized
 
-    updated_count = 0
 
-    for obj in manifest["objects"]:
-        if obj["object_id"] in processed_ids and obj["status"] == "pending":
-            obj["status"] = "processed"
-            obj["processed_at"] = datetime.now().isoformat()
-            updated_count += 1
+def output_batch(obj: Dict, files: List[str]) -> str:
+    """Batch del output: el batch_id del objeto si tiene output ahí, o el primero."""
+    batches = [path.split("/", 1)[0] for path in files]
+    return obj.get("batch_id") if obj.get("batch_id") in batches else batches[0]
+
+
+def reconcile_report(
+    objects: List[Dict], outputs: Dict[str, List[str]], unrecognized: List[str]
+) -> Dict:
+    """
+    Compara los outputs con el manifest (una pasada por outputs y una por objetos).
+
+    Categorías:
+        duplicates:  objetos con más de un output (batch re-ejecutado o en dos batches)
+        orphans:     outputs con object_id fuera del manifest (o sin object_id)
+        misplaced:   outputs en un directorio distinto al batch_id del manifest
+        missing:     objetos processed en el manifest sin ningún output
+        unrecorded:  objetos pending/failed que ya tienen output
+    """
+    by_id = {obj["object_id"]: obj for obj in objects}
+    report = {
+        "output_files": sum(len(files) for files in outputs.values())
+        + len(unrecognized),
+        "objects_with_output": 0,
+        "duplicates": {},
+        "orphans": list(unrecognized),
+        "misplaced": {},
+        "missing": [],
+        "unrecorded": [],
+        "output_batches": {},
+    }
 
-    print(f"  ✅ Actualizados {updated_count} objetos en manifest")
+    for object_id, files in outputs.items():
+        obj = by_id.get(object_id)
+        if obj is None:
+            report["orphans"].extend(files)
+            continue
+
+        report["objects_with_output"] += 1
+        batch_id = output_batch(obj, files)
+        report["output_batches"][object_id] = batch_id
+        if len(files) > 1:
+            report["duplicates"][object_id] = files
+        if (
+            obj.get("status") == "processed"
+            and obj.get("batch_id")
+            and obj["batch_id"] != batch_id
+        ):
+            report["misplaced"][object_id] = {
+                "manifest_batch": obj["batch_id"],
+                "output_batch": batch_id,
+            }
+        if obj.get("status") in ("pending", "failed"):
+            report["unrecorded"].append(object_id)
+
+    report["missing"] = sorted(
+        object_id
+        for object_id, obj in by_id.items()
+        if obj.get("status") == "processed" and object_id not in outputs
+    )
+    report["unrecorded"].sort()
+    report["orphans"].sort()
+
+    return report
+
+
+def print_reconcile_report(report: Dict):
+    """Resumen del reporte de --reconcile con algunos ejemplos por categoría."""
+    print(
+        f"  📁 {report['output_files']} outputs, "
+        f"{report['objects_with_output']} objetos del manifest con output\n"
+    )
+
+    categories = [
+        ("duplicates", "🔁 Duplicados (más de un output)"),
+        ("orphans", "👻 Huérfanos (object_id fuera del manifest)"),
+        ("misplaced", "📂 En otro batch que el del manifest"),
+        ("missing", "❓ Faltantes (processed sin output)"),
+        ("unrecorded", "📝 Sin registrar (pending/failed con output)"),
+    ]
+    for key, label in categories:
+        items = report[key]
+        print(f"  {label}: {len(items)}")
+        for item in list(items)[:REPORT_EXAMPLES]:
+            detail = items[item] if isinstance(items, dict) else None
+            print(f"     - {item}" + (f": {detail}" if detail else ""))
+        if len(items) > REPORT_EXAMPLES:
+            print(f"     ... y {len(items) - REPORT_EXAMPLES} más")
+
+
+def reconcile_command():
+    """--reconcile: reporta outputs vs manifest y recalcula el progreso desde cero."""
+    dry_run = "--dry-run" in sys.argv
+
+    print("=" * 80)
+    print("RECONCILIAR PROGRESO CON OUTPUTS" + (" (dry-run)" if dry_run else ""))
+    print("=" * 80)
+
+    print(f"\n🔍 Escaneando {JSON_DIR}...\n")
+    outputs, unrecognized = scan_outputs()
+    manifest, progress, _ = load_current_state()
+    report = reconcile_report(manifest["objects"], outputs, unrecognized)
+    print_reconcile_report(report)
+
+    write_json_atomic(
+        RECONCILE_REPORT_FILE,
+        {key: value for key, value in report.items() if key != "output_batches"},
+    )
+    print(f"\n  ✅ Reporte completo: {RECONCILE_REPORT_FILE}")
+
+    if dry_run:
+        print(
+            f"\n⚠️  Dry-run: no se modificaron {manifest_location()} "
+            f"ni {PROGRESS_FILE.name}"
+        )
+        return
 
-    # Guardar manifest actualizado
-    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    print(f"\n📊 Recalculando progreso desde cero...\n")
+    manifest, progress, updates = rebuild_snapshots(report["output_batches"])
+    print(f"  ✅ {len(updates)} objetos actualizados en {manifest_location()}")
+    print(f"     Procesados: {progress['processed_count']}/{progress['total_objects']}")
+    print(f"     Pendientes: {progress['pending_count']}")
 
-    return manifest
+    token_budget = int(get_option("--token-budget") or AGENT_TOKEN_BUDGET)
+    generate_next_batch_instructions(manifest, progress, token_budget)
 
 
-def update_progress(progress: Dict, batch_id: str, processed_count: int, last_object_id: str) -> Dict:
+def record_processed(processed_ids: List[str], batch_id: str) -> int:
     """
-    Actualiza progress.json con información del batch completado.
+    Registra los objetos procesados en el journal (sin reescribir manifest ni progress).
 
     Args:
-        progress: Progress actual
+        processed_ids: Lista de object_ids procesados
         batch_id: ID del batch completado
-        processed_count: Cantidad de objetos procesados
-        last_object_id: ID del último objeto procesado
 
     Returns:
-        Progress actualizado
+        Cantidad de eventos registrados
     """
-    print(f"\n📊 Actualizando progreso...\n")
+    print(f"\n📝 Registrando objetos procesados...\n")
 
-    # Actualizar contadores
-    progress["processed_count"] += processed_count
-    progress["pending_count"] = progress["total_objects"] - progress["processed_count"]
-    progress["current_batch"] = batch_id
-    progress["last_object_processed"] = last_object_id
-    progress["last_updated"] = datetime.now().isoformat()
-
-    # Agregar batch a historial
-    batch_info = {
-        "batch_id": batch_id,
-        "processed_count": processed_count,
-        "completed_at": datetime.now().isoformat()
-    }
-    progress["batches"].append(batch_info)
+    recorded = append_events(processed_ids, "processed", batch_id)
+    print(f"  ✅ {recorded} eventos agregados a {JOURNAL_FILE.name}")
 
-    # Actualizar status
-    if progress["pending_count"] == 0:
-        progress["status"] = "completed"
-    else:
-        progress["status"] = "in_progress"
+    return recorded
 
-    # Guardar progress actualizado
-    with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(progress, f, indent=2, ensure_ascii=False)
 
-    print(f"  ✅ Progreso actualizado:")
+def update_progress(compact: bool = False) -> Tuple[Dict, Dict]:
+    """
+    Escribe progress.json al día (snapshots + journal) y compacta si corresponde.
+
+    El manifest solo se reescribe al compactar. La compactación no bloquea: si
+    otro proceso está compactando, se deja para la próxima ejecución.
+
+    Args:
+        compact: Compactar aunque no se haya llegado a JOURNAL_COMPACT_EVENTS
+
+    Returns:
+        (manifest, progress) con el journal aplicado
+    """
+    print(f"\n📊 Actualizando progreso...\n")
+
+    manifest, progress, events = write_progress_snapshot()
+
+    if compact or len(events) >= JOURNAL_COMPACT_EVENTS:
+        compacted = compact_journal(blocking=False)
+        if compacted is None:
+            print(f"  ⏳ Otro proceso está compactando el journal")
+        else:
+            print(
+                f"  ✅ Journal compactado: {compacted} eventos → "
+                f"{manifest_location()} + {PROGRESS_FILE.name}"
+            )
+    else:
+        print(
+            f"  ✅ {PROGRESS_FILE.name} actualizado, {len(events)} eventos en el "
+            f"journal (el manifest se compacta a partir de {JOURNAL_COMPACT_EVENTS})"
+        )
+
     print(f"     Procesados: {progress['processed_count']}/{progress['total_objects']}")
     print(f"     Pendientes: {progress['pending_count']}")
     print(f"     Porcentaje: {progress['processed_count']/progress['total_objects']*100:.1f}%")
 
-    return progress
+    return manifest, progress
 
 
-def generate_next_batch_instructions(manifest: Dict, progress: Dict, batch_size: int = 200):
+def generate_next_batch_instructions(
+    manifest: Dict, progress: Dict, token_budget: int = AGENT_TOKEN_BUDGET
+):
     """
-    Genera instrucciones para procesar próximo batch.
+    Planifica los batches pendientes (batches.json) e instrucciones para el próximo.
 
     Args:
         manifest: Manifest actualizado
         progress: Progress actualizado
-        batch_size: Objetos por batch (default: 200)
+        token_budget: Tokens estimados por agente (ver plan_batches.py)
     """
     print(f"\n{'='*80}")
     print("PRÓXIMO BATCH")
@@ -201,45 +394,50 @@ def generate_next_batch_instructions(manifest: Dict, progress: Dict, batch_size:
         print("  ```")
         return
 
-    # Obtener objetos pendientes
-    all_objects = manifest["objects"]
-    pending_objects = [obj for obj in all_objects if obj["status"] == "pending"]
+    # Re-planificar los pendientes por presupuesto de tokens (no por cantidad fija)
+    plan = plan_batches(manifest["objects"], next_batch_number(progress), token_budget)
+    save_batches(plan)
 
-    if not pending_objects:
+    if not plan["batches"]:
         print("⚠️  No hay objetos pendientes (pero status no es 'completed')")
         return
 
-    # Próximo batch
-    batch_num = int(progress["current_batch"].split('_')[1]) + 1
-    next_batch = f"batch_{batch_num:03d}"
-
-    batch_objects = pending_objects[:batch_size]
+    batch = plan["batches"][0]
+    next_batch = batch["batch_id"]
 
     print(f"📦 Próximo batch: {next_batch}")
-    print(f"   Objetos pendientes: {len(pending_objects)}")
-    print(f"   Objetos en este batch: {len(batch_objects)}")
-    print(f"   Progreso después: {progress['processed_count'] + len(batch_objects)}/{progress['total_objects']}")
+    print(f"   Objetos pendientes: {plan['pending_objects']}")
+    print(
+        f"   Objetos en este batch: {batch['objects']} "
+        f"({len(batch['agents'])} agentes, ~{batch['estimated_tokens']:,} tokens)"
+    )
+    processed_after = progress["processed_count"] + batch["objects"]
+    print(f"   Progreso después: {processed_after}/{progress['total_objects']}")
+    print(f"   Plan completo: {BATCHES_FILE} ({plan['total_batches']} batches)")
 
     print(f"\n{'='*80}")
     print("INSTRUCCIONES PARA CLAUDE CODE")
     print(f"{'='*80}\n")
 
-    print(f"Lanzar 20 agentes plsql-analyzer en paralelo para procesar {next_batch}:")
+    print(
+        f"Lanzar {len(batch['agents'])} agentes plsql-analyzer en paralelo "
+        f"para procesar {next_batch}:"
+    )
     print(f"\n```")
 
-    # Dividir batch en 20 sub-agentes (10 objetos cada uno)
-    objects_per_agent = 10
-    num_agents = (len(batch_objects) + objects_per_agent - 1) // objects_per_agent
-
-    for agent_idx in range(num_agents):
-        agent_start = agent_idx * objects_per_agent
-        agent_end = min(agent_start + objects_per_agent, len(batch_objects))
-        agent_objects = batch_objects[agent_start:agent_end]
-
-        obj_ids = [obj["object_id"] for obj in agent_objects]
-
-        print(f"# Agente {agent_idx + 1}: Objetos {obj_ids[0]} a {obj_ids[-1]}")
-        print(f"Task plsql-analyzer \"Analizar objetos {obj_ids[0]} a {obj_ids[-1]} del {next_batch}\"")
+    for agent in batch["agents"]:
+        obj_ids = agent["object_ids"]
+        packages = (
+            f" - packages: {', '.join(agent['packages'])}" if agent["packages"] else ""
+        )
+        print(
+            f"# Agente {agent['agent']}: {len(obj_ids)} objetos, "
+            f"~{agent['estimated_tokens']:,} tokens{packages}"
+        )
+        print(
+            f"Task plsql-analyzer \"Analizar objetos {', '.join(obj_ids)} "
+            f'del {next_batch}"'
+        )
         print()
 
     print(f"```\n")
@@ -250,24 +448,84 @@ def generate_next_batch_instructions(manifest: Dict, progress: Dict, batch_size:
     print(f"```\n")
 
 
+def get_option(name: str) -> Optional[str]:
+    """Lee el valor de una opción --nombre VALOR de sys.argv."""
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return None
+
+
+def record_events_command():
+    """--record: agrega eventos al journal y termina (uso concurrente, un agente)."""
+    object_ids = []
+    for arg in sys.argv[sys.argv.index("--record") + 1 :]:
+        if arg.startswith("--"):
+            break
+        object_ids.append(arg)
+
+    event = get_option("--event") or "processed"
+    if not object_ids or event not in EVENT_STATUS:
+        print("❌ Error: --record requiere object_ids y un evento válido")
+        print(f"   Eventos: {', '.join(EVENT_STATUS)}")
+        print("\nUso:")
+        print(
+            "  python scripts/update_progress.py --record obj_0001 [obj_0002 ...] "
+            "[--event processed] [--batch batch_001]"
+        )
+        sys.exit(1)
+
+    recorded = append_events(
+        object_ids, event, get_option("--batch"), get_option("--detail")
+    )
+    print(f"✅ {recorded} eventos '{event}' registrados en {JOURNAL_FILE.name}")
+
+
 def main():
     """Función principal"""
     if len(sys.argv) < 2:
         print("❌ Error: Falta argumento batch_id")
         print("\nUso:")
         print("  python scripts/update_progress.py batch_001")
+        print(
+            "  python scripts/update_progress.py --record obj_0001 "
+            "[--event processed] [--batch batch_001]"
+        )
+        print("  python scripts/update_progress.py --compact")
+        print("  python scripts/update_progress.py --reconcile [--dry-run]")
+        print("  python scripts/update_progress.py --watch [--polling] [--interval 2]")
         sys.exit(1)
 
+    check_state_files()
+
+    if "--record" in sys.argv:
+        record_events_command()
+        return
+
+    if "--reconcile" in sys.argv:
+        reconcile_command()
+        return
+
+    if "--watch" in sys.argv:
+        watch_progress(
+            interval=float(get_option("--interval") or POLL_INTERVAL),
+            polling="--polling" in sys.argv,
+        )
+        return
+
+    if sys.argv[1] == "--compact":
+        compacted = compact_journal()
+        print(
+            f"✅ Journal compactado: {compacted} eventos → "
+            f"{manifest_location()} + {PROGRESS_FILE.name}"
+        )
+        return
+
     batch_id = sys.argv[1]
 
     print("="*80)
     print(f"ACTUALIZAR PROGRESO - {batch_id}")
     print("="*80)
 
-    # Cargar archivos
-    manifest = load_manifest()
-    progress = load_progress()
-
     # Detectar objetos procesados
     processed_ids = detect_processed_objects(batch_id)
 
@@ -276,15 +534,15 @@ def main():
         print(f"   Verifica que los sub-agentes generaron outputs en knowledge/json/{batch_id}/")
         sys.exit(1)
 
-    # Actualizar manifest
-    manifest = update_manifest(manifest, processed_ids)
+    # Registrar en el journal (append; no reescribe manifest ni progress)
+    record_processed(processed_ids, batch_id)
 
-    # Actualizar progress
-    last_object_id = processed_ids[-1] if processed_ids else None
-    progress = update_progress(progress, batch_id, len(processed_ids), last_object_id)
+    # Progreso actual (snapshots + journal) y compactación periódica
+    manifest, progress = update_progress(compact="--compact" in sys.argv)
 
-    # Generar instrucciones para próximo batch
-    generate_next_batch_instructions(manifest, progress)
+    # Generar instrucciones para próximo batch (y batches.json)
+    token_budget = int(get_option("--token-budget") or AGENT_TOKEN_BUDGET)
+    generate_next_batch_instructions(manifest, progress, token_budget)
 
     print("\n" + "="*80)
     print("✅ PROGRESO ACTUALIZADO")